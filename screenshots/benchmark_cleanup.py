@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark the screenshot cleanup pipeline on a synthetic corpus.
+
+A deterministic generator renders task-like screenshots (prompt text in the
+top half, coloured stimulus shapes below) with a known ground truth: a
+chosen fraction of frames are near-duplicates of an earlier screen (small
+pixel noise, a cursor, a moved progress bar). Each benchmark run times the
+pipeline stages on one corpus size and records peak Python memory per stage:
+
+- ocr: extract_top_text on a sample of frames (skipped without tesseract)
+- image_features: decoding and thumbnail features for every frame
+- image_similarity / text_similarity: calculate_image_similarity and
+  calculate_text_similarity on random pairs
+- grouping: the ScreenshotGrouper loop used by analyze_screenshots
+
+Grouping quality is scored against the ground truth with pair-counting
+precision and recall. Results are written as JSON; pass --baseline with an
+earlier results file to print the per-stage speed ratio.
+"""
+
+import os
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from cleanup_screenshots_ocr import (ScreenshotGrouper, DEFAULT_HASH_RADIUS, calculate_image_similarity,
+                                     calculate_text_similarity, extract_image_features, extract_top_text,
+                                     make_screenshot_record)
+from feature_cache import file_content_hash
+from ocr_backends import get_backend
+
+WORDS = ("which picture shows more apples tap the shape that is bigger find the animal that can fly "
+         "how many stars do you see choose the word that rhymes with cat listen and pick the color "
+         "where is the red ball touch the one that is different what comes next in the pattern").split()
+COLORS = [(231, 76, 60), (46, 204, 113), (52, 152, 219), (241, 196, 15), (155, 89, 182),
+          (230, 126, 34), (26, 188, 156), (52, 73, 94)]
+BACKGROUNDS = [(255, 255, 255), (245, 245, 240), (235, 245, 255), (255, 248, 230)]
+
+def load_font(size: int) -> ImageFont.ImageFont:
+    """A scalable font if one is installed, else PIL's built-in bitmap font."""
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+def render_screen(rng: random.Random, width: int, height: int, font) -> Tuple[Image.Image, str, Dict]:
+    """Render one unique screen; returns the image, its prompt and how to redraw it."""
+    prompt = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))
+    spec = {
+        'prompt': prompt,
+        'background': rng.choice(BACKGROUNDS),
+        'shapes': [(rng.choice(('ellipse', 'rectangle')), rng.choice(COLORS),
+                    rng.randint(0, width - 120), rng.randint(height // 2, height - 120),
+                    rng.randint(40, 120), rng.randint(40, 120))
+                   for _ in range(rng.randint(1, 5))],
+        'progress': rng.random()
+    }
+    return draw_screen(spec, width, height, font), prompt, spec
+
+def draw_screen(spec: Dict, width: int, height: int, font) -> Image.Image:
+    img = Image.new('RGB', (width, height), spec['background'])
+    draw = ImageDraw.Draw(img)
+    draw.text((40, height // 8), spec['prompt'], fill=(20, 20, 20), font=font)
+    for kind, color, x, y, w, h in spec['shapes']:
+        getattr(draw, kind)([x, y, x + w, y + h], fill=color, outline=(0, 0, 0))
+    bar = int((width - 80) * spec['progress'])
+    draw.rectangle([40, height - 20, 40 + bar, height - 12], fill=(52, 152, 219))
+    return img
+
+def perturb_screen(spec: Dict, rng: random.Random, width: int, height: int, font) -> Image.Image:
+    """A near-duplicate: progress bar moved, a cursor drawn and some pixel noise."""
+    varied = dict(spec, progress=min(1.0, spec['progress'] + rng.uniform(0.0, 0.05)))
+    img = draw_screen(varied, width, height, font)
+    draw = ImageDraw.Draw(img)
+    cx, cy = rng.randint(0, width - 12), rng.randint(height // 2, height - 12)
+    draw.polygon([(cx, cy), (cx + 10, cy + 4), (cx + 4, cy + 10)], fill=(0, 0, 0))
+    for _ in range(width * height // 2000):
+        img.putpixel((rng.randrange(width), rng.randrange(height)), (rng.randrange(256),) * 3)
+    return img
+
+def generate_corpus(directory: str, size: int, duplicate_rate: float = 0.3, seed: int = 0,
+                    width: int = 800, height: int = 600) -> Dict:
+    """
+    Write size synthetic screenshots plus ground_truth.json, or reuse an existing corpus.
+
+    Frames are named in capture order; every duplicate follows its original
+    by a few frames, as repeated screens do in a real capture.
+
+    Returns:
+        Ground truth: {'frames': [{'name', 'screen', 'text'}], ...}
+    """
+    corpus = Path(directory)
+    truth_path = corpus / "ground_truth.json"
+    params = {'size': size, 'duplicate_rate': duplicate_rate, 'seed': seed, 'width': width, 'height': height}
+    if truth_path.exists():
+        with open(truth_path) as f:
+            truth = json.load(f)
+        if truth['params'] == params:
+            return truth
+
+    corpus.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    font = load_font(max(12, height // 25))
+    screens = []
+    frames = []
+    for i in range(size):
+        # Duplicate one of the last few screens, or render a new one
+        if screens and rng.random() < duplicate_rate:
+            screen_id = rng.randrange(max(0, len(screens) - 5), len(screens))
+            img = perturb_screen(screens[screen_id][1], rng, width, height, font)
+        else:
+            screen_id = len(screens)
+            img, prompt, spec = render_screen(rng, width, height, font)
+            screens.append((prompt, spec))
+        name = f"frame_{i:05d}.png"
+        img.save(corpus / name, compress_level=1)
+        frames.append({'name': name, 'screen': screen_id, 'text': screens[screen_id][0]})
+
+    truth = {'params': params, 'unique_screens': len(screens), 'frames': frames}
+    with open(truth_path, 'w') as f:
+        json.dump(truth, f, indent=2)
+    return truth
+
+def measure(stage: str, results: Dict, items: int, func, *args, **kwargs):
+    """Run func, recording wall time, per-item time and peak traced memory under stage."""
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    value = func(*args, **kwargs)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    results[stage] = {'seconds': round(seconds, 4), 'items': items,
+                      'per_item_ms': round(1000 * seconds / max(1, items), 4),
+                      'peak_mb': round(max(0, peak) / 1024 / 1024, 2)}
+    print(f"   ⏱️  {stage}: {seconds:.2f}s ({results[stage]['per_item_ms']:.2f}ms/item, "
+          f"peak {results[stage]['peak_mb']:.1f}MB)")
+    return value
+
+def pair_counts(labels: List[int]) -> int:
+    """Number of unordered pairs that share a label."""
+    counts = {}
+    for label in labels:
+        counts[label] = counts.get(label, 0) + 1
+    return sum(n * (n - 1) // 2 for n in counts.values())
+
+def grouping_quality(truth: List[int], predicted: List[int]) -> Dict:
+    """Pair-counting precision/recall/F1 of a predicted grouping against the ground truth."""
+    true_pairs = pair_counts(truth)
+    predicted_pairs = pair_counts(predicted)
+    both = pair_counts([t * (max(predicted) + 1) + p for t, p in zip(truth, predicted)])
+    precision = both / predicted_pairs if predicted_pairs else 1.0
+    recall = both / true_pairs if true_pairs else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4),
+            'true_groups': len(set(truth)), 'predicted_groups': len(set(predicted))}
+
+def benchmark_corpus(directory: str, truth: Dict, pairs: int = 2000, ocr_sample: int = 50,
+                     use_ocr: bool = True, seed: int = 0, window: Optional[int] = None) -> Dict:
+    """Time every stage on one corpus and score the grouping; returns the run's results."""
+    paths = [Path(directory) / f['name'] for f in truth['frames']]
+    rng = random.Random(seed)
+    stages = {}
+
+    if use_ocr:
+        sample = paths[:ocr_sample]
+        texts = measure('ocr', stages, len(sample), lambda: [extract_top_text(str(p)) for p in sample])
+    else:
+        texts = []
+
+    features = measure('image_features', stages, len(paths),
+                       lambda: [extract_image_features(str(p)) for p in paths])
+
+    pair_list = [(rng.randrange(len(paths)), rng.randrange(len(paths))) for _ in range(pairs)]
+    measure('image_similarity', stages, pairs,
+            lambda: [calculate_image_similarity(str(paths[a]), str(paths[b])) for a, b in pair_list])
+    frame_texts = [f['text'] for f in truth['frames']]
+    measure('text_similarity', stages, pairs,
+            lambda: [calculate_text_similarity(frame_texts[a], frame_texts[b]) for a, b in pair_list])
+
+    # Group with the ground-truth prompts so grouping is measured independently of OCR errors
+    def group():
+        grouper = ScreenshotGrouper(hash_radius=DEFAULT_HASH_RADIUS, window=window)
+        for path, frame, feature in zip(paths, truth['frames'], features):
+            result = {'text': frame['text'], 'features': feature, 'error': None}
+            record = make_screenshot_record(path, file_content_hash(str(path)), result)
+            grouper.add(record, feature)
+        return grouper
+
+    grouper = measure('grouping', stages, len(paths), group)
+
+    group_of = {}
+    for group_id, group_entry in enumerate(grouper.groups):
+        group_of[group_entry['representative']['name']] = group_id
+        for duplicate in group_entry['duplicates']:
+            group_of[duplicate['name']] = group_id
+    quality = grouping_quality([f['screen'] for f in truth['frames']],
+                               [group_of[f['name']] for f in truth['frames']])
+    if texts:
+        matched = sum(calculate_text_similarity(t, f['text']) for t, f in zip(texts, truth['frames']))
+        quality['ocr_text_similarity'] = round(matched / len(texts), 4)
+
+    analysis = grouper.analysis()
+    return {'size': len(paths), 'stages': stages, 'quality': quality,
+            'grouping': {'comparisons': analysis['comparisons'], 'cascade': analysis['cascade'],
+                         'text_prefilter': analysis['text_prefilter'], 'window': analysis['window']}}
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare_to_baseline(results: Dict, baseline_path: str) -> None:
+    """Print how much faster (>1) or slower (<1) each stage is than in a saved run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {run['size']: run for run in baseline['runs']}
+    print(f"\n📈 Compared to {baseline_path} ({baseline.get('revision') or 'unknown revision'}):")
+    for run in results['runs']:
+        old = previous.get(run['size'])
+        if not old:
+            continue
+        for stage, numbers in run['stages'].items():
+            if stage in old['stages'] and numbers['seconds'] > 0:
+                ratio = old['stages'][stage]['seconds'] / numbers['seconds']
+                print(f"   {run['size']:>6} {stage:<17} {ratio:5.2f}x "
+                      f"({old['stages'][stage]['seconds']:.2f}s → {numbers['seconds']:.2f}s)")
+        print(f"   {run['size']:>6} f1               {old['quality']['f1']:.3f} → {run['quality']['f1']:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the screenshot cleanup pipeline on synthetic screenshots")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000],
+                        help="Corpus sizes to benchmark, e.g. 100 1000 10000 (default: 100 1000)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.3,
+                        help="Fraction of frames that are near-duplicates (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0)")
+    parser.add_argument("--width", type=int, default=800, help="Screenshot width (default: 800)")
+    parser.add_argument("--height", type=int, default=600, help="Screenshot height (default: 600)")
+    parser.add_argument("--corpus-dir", default="bench_corpus",
+                        help="Where generated corpora are kept and reused (default: bench_corpus)")
+    parser.add_argument("--pairs", type=int, default=2000,
+                        help="Random pairs for the similarity micro-benchmarks (default: 2000)")
+    parser.add_argument("--ocr-sample", type=int, default=50,
+                        help="Frames to OCR per corpus (default: 50)")
+    parser.add_argument("--no-ocr", action="store_true", help="Skip the OCR stage")
+    parser.add_argument("--window", type=int, default=None, metavar="K",
+                        help="Group with a temporal window of K representatives (default: off)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON results file (default: benchmark_results.json)")
+    parser.add_argument("--baseline", default=None,
+                        help="Earlier results file to compare stage timings against")
+    args = parser.parse_args()
+
+    use_ocr = not args.no_ocr and get_backend().available()
+    if not args.no_ocr and not use_ocr:
+        print("⚠️  Tesseract not available, skipping the OCR stage")
+
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'params': {'duplicate_rate': args.duplicate_rate, 'seed': args.seed, 'width': args.width,
+                   'height': args.height, 'pairs': args.pairs,
+                   'ocr_sample': args.ocr_sample if use_ocr else 0, 'window': args.window},
+        'runs': []
+    }
+
+    tracemalloc.start()
+    for size in args.sizes:
+        directory = os.path.join(args.corpus_dir, f"n{size}_d{args.duplicate_rate}_s{args.seed}")
+        print(f"\n🧪 Corpus of {size} frames ({directory})")
+        started = time.perf_counter()
+        truth = generate_corpus(directory, size, args.duplicate_rate, args.seed, args.width, args.height)
+        print(f"   🖼️  ready in {time.perf_counter() - started:.1f}s, {truth['unique_screens']} unique screens")
+        run = benchmark_corpus(directory, truth, pairs=args.pairs, ocr_sample=args.ocr_sample,
+                               use_ocr=use_ocr, seed=args.seed, window=args.window)
+        quality = run['quality']
+        print(f"   🎯 precision {quality['precision']:.3f}, recall {quality['recall']:.3f}, "
+              f"groups {quality['predicted_groups']} (truth {quality['true_groups']})")
+        results['runs'].append(run)
+    tracemalloc.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results saved to: {args.output}")
+
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+BK-tree over integer perceptual hashes, shared by the screenshot cleanup and
+the video frame extractor. Standard library only.
+"""
+
+from typing import List
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """Number of differing bits between two integer hashes."""
+    return bin(hash1 ^ hash2).count('1')
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance.
+    
+    Lookups only descend into children whose edge distance lies within
+    the triangle-inequality bound, so a radius query touches a small part
+    of the tree instead of every stored hash.
+    """
+    
+    def __init__(self):
+        self.root = None
+        self.size = 0
+    
+    def add(self, hash_value: int, item) -> None:
+        """Insert an item under its hash."""
+        self.size += 1
+        node = [hash_value, [item], {}]
+        if self.root is None:
+            self.root = node
+            return
+        
+        current = self.root
+        while True:
+            distance = hamming_distance(hash_value, current[0])
+            if distance == 0:
+                current[1].append(item)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+    
+    def search(self, hash_value: int, radius: int) -> List:
+        """Return all items whose hash is within radius of hash_value."""
+        if self.root is None:
+            return []
+        
+        results = []
+        stack = [self.root]
+        while stack:
+            node_hash, items, children = stack.pop()
+            distance = hamming_distance(hash_value, node_hash)
+            if distance <= radius:
+                results.extend(items)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return results
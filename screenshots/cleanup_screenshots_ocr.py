@@ -7,15 +7,28 @@ Keeps screenshots that are unique in either text content OR visual content.
 import os
 import sys
 import argparse
+import cProfile
+import pstats
+import signal
+import threading
+import time
 from pathlib import Path
-from PIL import Image, ImageChops
-import pytesseract
+from collections import OrderedDict, deque
+from PIL import Image
 from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import hashlib
 import json
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import re
+import zlib
 import numpy as np
+from feature_cache import FeatureCache, file_content_hash, DEFAULT_CACHE_SIZE_MB
+from ocr_backends import BACKEND_NAMES, get_backend, resolve_backend_name
+from ocr_profiles import OCR_PROFILES, get_profile
+from instrumentation import Instrumentation
+from bktree import BKTree, hamming_distance
 
 def install_requirements():
     """Install required packages if not available."""
@@ -31,42 +44,384 @@ def install_requirements():
         print("  macOS: brew install tesseract")
         sys.exit(1)
 
-def extract_top_text(image_path: str, top_fraction: float = 0.5) -> str:
+# Console verbosity: QUIET prints only the summary, VERBOSE adds a line per
+# file and DEBUG a line per pairwise comparison
+QUIET, NORMAL, VERBOSE, DEBUG = 0, 1, 2, 3
+VERBOSITY = NORMAL
+
+def log(message: str = "", level: int = NORMAL) -> None:
+    """Print message if the current VERBOSITY includes level."""
+    if VERBOSITY >= level:
+        print(message)
+
+# OCR settings; they are part of the feature cache key
+OCR_CONFIG = '--psm 6'
+OCR_LANG = 'eng'
+
+def crop_top(img: Image.Image, top_fraction: float = 0.5) -> Image.Image:
+    """Crop an image to the top fraction of its height."""
+    width, height = img.size
+    return img.crop((0, 0, width, int(height * top_fraction)))
+
+def normalize_ocr_text(text: str) -> str:
+    """Clean and normalize raw OCR output."""
+    text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
+    text = re.sub(r'[^\w\s\.\,\!\?\-]', '', text)  # Remove special chars
+    return text.lower()  # Convert to lowercase
+
+def ocr_input(img: Image.Image, top_fraction: float = 0.5,
+              ocr_profile: Optional[str] = None) -> Tuple[Image.Image, str]:
+    """
+    Image and tesseract config to OCR for a screenshot.
+    
+    Without a profile this is the top fraction of the image with OCR_CONFIG;
+    a task profile (see ocr_profiles.OCR_PROFILES) supplies its own
+    preprocessed regions and psm instead.
+    """
+    profile = get_profile(ocr_profile)
+    if profile is None:
+        return crop_top(img, top_fraction), OCR_CONFIG
+    return profile.prepare(img), profile.config
+
+def ocr_top_text(img: Image.Image, top_fraction: float = 0.5, lang: str = OCR_LANG,
+                 ocr_backend: str = 'auto', ocr_profile: Optional[str] = None) -> str:
+    """
+    Run OCR on the top portion of an already opened image.
+    
+    Args:
+        img: Decoded image
+        top_fraction: Fraction of image height to analyze (0.5 = top half)
+        lang: Tesseract language (traineddata) to use
+        ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+        ocr_profile: Task whose OCR profile replaces the top-fraction crop
+    
+    Returns:
+        Extracted text, cleaned and normalized
+    """
+    backend = get_backend(ocr_backend)
+    crop, config = ocr_input(img, top_fraction, ocr_profile)
+    return normalize_ocr_text(backend.image_to_string(crop, lang, config))
+
+def extract_top_text(image_path: str, top_fraction: float = 0.5, lang: str = OCR_LANG,
+                     ocr_backend: str = 'auto', ocr_profile: Optional[str] = None) -> str:
     """
     Extract text from the top portion of an image using OCR.
     
     Args:
         image_path: Path to the image file
         top_fraction: Fraction of image height to analyze (0.5 = top half)
+        lang: Tesseract language (traineddata) to use
+        ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+        ocr_profile: Task whose OCR profile replaces the top-fraction crop
     
     Returns:
         Extracted text, cleaned and normalized
     """
     try:
         with Image.open(image_path) as img:
-            width, height = img.size
-            
-            # Crop to top portion
-            top_height = int(height * top_fraction)
-            top_img = img.crop((0, 0, width, top_height))
-            
-            # Extract text using OCR
-            text = pytesseract.image_to_string(top_img, config='--psm 6')
-            
-            # Clean and normalize text
-            text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
-            text = re.sub(r'[^\w\s\.\,\!\?\-]', '', text)  # Remove special chars
-            text = text.lower()  # Convert to lowercase
-            
-            return text
+            return ocr_top_text(img, top_fraction, lang, ocr_backend, ocr_profile)
             
     except Exception as e:
         print(f"Error processing {image_path}: {e}")
         return ""
 
+def image_thumbnail(img: Image.Image, resize_to: int = 64) -> Image.Image:
+    """Grayscale thumbnail shared by the correlation and hash features."""
+    return img.convert('L').resize((resize_to, resize_to))
+
+def thumbnail_vector(thumb: Image.Image) -> Tuple[np.ndarray, bool, float]:
+    """
+    Turn a grayscale thumbnail into a mean-centered, unit-length float32 vector.
+    
+    The dot product of two such vectors is their correlation coefficient.
+    
+    Returns:
+        Tuple of (vector, is_uniform, mean); uniform thumbnails have no
+        variation and get a zero vector.
+    """
+    arr = np.asarray(thumb, dtype=np.float32).ravel()
+    mean = float(arr.mean())
+    centered = arr - mean
+    norm = float(np.linalg.norm(centered))
+    if norm == 0.0:
+        return np.zeros_like(centered), True, mean
+    return centered / norm, False, mean
+
+def image_dhash(thumb: Image.Image) -> str:
+    """64-bit difference hash of a grayscale thumbnail, as a hex string."""
+    pixels = np.array(thumb.resize((9, 8)), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+def image_pixel_hash(img: Image.Image) -> str:
+    """Hash of the decoded pixels; equal for identical images saved differently."""
+    digest = hashlib.md5(f"{img.mode}{img.size}".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+# Blank/transition pre-filter
+BLANK_MAX_STD = 4.0  # Thumbnails above this have visible content and are never blank
+DARK_MAX_MEAN = 24.0  # Background shade of black fade/transition frames
+# Pixels away from the background shade allowed in a blank frame: about 13
+# pixels of a 1000x660 screenshot (a cursor or stray dot, not a single letter)
+BLANK_MAX_INK_FRACTION = 0.00002
+
+def classify_blank_frame(img: Image.Image, thumb: Image.Image) -> Optional[str]:
+    """
+    Recognize frames with nothing worth OCRing.
+    
+    The 0-255 grayscale thumbnail rejects almost every screenshot at once
+    (its standard deviation is too high). Frames that look flat at thumbnail
+    size are confirmed at full resolution: a 16-bin shade histogram gives
+    the background shade, and any more than BLANK_MAX_INK_FRACTION of the
+    pixels away from it (a line of text, a button) keeps the frame.
+    Thumbnails average sparse text away, so they cannot decide that alone.
+    
+    Returns:
+        'dark' for a black transition frame, 'blank' for any other
+        single-shade frame, or None for a regular screenshot
+    """
+    if float(np.asarray(thumb, dtype=np.float32).std()) >= BLANK_MAX_STD:
+        return None
+    pixels = np.asarray(img.convert('L'), dtype=np.uint8)
+    histogram = np.bincount((pixels >> 4).ravel(), minlength=16)
+    background = int(histogram.argmax())
+    # Neighbouring bins count as background (shade noise, compression)
+    near = int(histogram[max(0, background - 1):background + 2].sum())
+    if pixels.size - near > BLANK_MAX_INK_FRACTION * pixels.size:
+        return None
+    return 'dark' if background * 16 + 8 < DARK_MAX_MEAN else 'blank'
+
+def extract_image_features(image_path: str, resize_to: int = 64) -> Dict:
+    """
+    Decode an image once and compute its comparison features.
+    
+    Args:
+        image_path: Path to the image file
+        resize_to: Size of the grayscale thumbnail
+    
+    Returns:
+        Dictionary with 'vector', 'uniform', 'mean' and 'dhash'
+    """
+    with Image.open(image_path) as img:
+        thumb = image_thumbnail(img, resize_to)
+    vector, uniform, mean = thumbnail_vector(thumb)
+    return {'vector': vector, 'uniform': uniform, 'mean': mean, 'dhash': image_dhash(thumb)}
+
+def extract_screenshot_features_batch(image_paths: List[str], top_fraction: float = 0.5,
+                                      resize_to: int = 64, lang: str = OCR_LANG,
+                                      ocr_backend: str = 'auto',
+                                      ocr_profile: Optional[str] = None,
+                                      blank_filter: bool = False) -> List[Dict]:
+    """
+    Decode screenshots once and compute both their OCR text and image features.
+    
+    All crops of the batch go to the OCR backend in one call, which lets the
+    batch backend use a single tesseract invocation. Never raises, so it can
+    run inside a worker process; failures are returned in the 'error' field
+    instead of being printed.
+    
+    Args:
+        image_paths: Paths to the image files
+        top_fraction: Fraction of image height to OCR
+        resize_to: Size of the grayscale thumbnail
+        lang: Tesseract language (traineddata) to use
+        ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+        ocr_profile: Task whose OCR profile (regions, downscale, binarization,
+            psm) replaces the top-fraction crop
+        blank_filter: Skip OCR for blank and transition frames (see classify_blank_frame)
+    
+    Returns:
+        One dictionary per path with 'text', 'features' (as returned by
+        extract_image_features, or None if the image could not be decoded),
+        'error' (None on success), 'bucket' (classify_blank_frame label, or
+        None) and 'timings' (wall/CPU seconds spent on decoding and OCR of
+        this file)
+    """
+    results = []
+    crops = []
+    config = OCR_CONFIG
+    for image_path in image_paths:
+        result = {'text': "", 'features': None, 'error': None, 'bucket': None}
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            with Image.open(image_path) as img:
+                img.load()
+                thumb = image_thumbnail(img, resize_to)
+                vector, uniform, mean = thumbnail_vector(thumb)
+                result['features'] = {'vector': vector, 'uniform': uniform, 'mean': mean,
+                                      'dhash': image_dhash(thumb), 'pixel_hash': image_pixel_hash(img)}
+                if blank_filter:
+                    result['bucket'] = classify_blank_frame(img, thumb)
+                if result['bucket'] is None:
+                    crop, config = ocr_input(img, top_fraction, ocr_profile)
+                    crops.append((result, crop))
+        except Exception as e:
+            result['error'] = f"Could not decode image: {e}"
+        result['timings'] = {'decode': time.perf_counter() - wall, 'decode_cpu': time.process_time() - cpu}
+        results.append(result)
+    
+    if not crops:
+        return results
+    try:
+        backend = get_backend(ocr_backend)
+    except Exception as e:
+        for result, _ in crops:
+            result['error'] = f"OCR failed: {e}"
+        return results
+    
+    if backend.batched:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            texts = backend.batch_to_string([crop for _, crop in crops], lang, config)
+        except Exception:
+            texts = None  # Retried one by one below
+        if texts is not None:
+            # One invocation served the whole batch; attribute an equal share to each file
+            wall = (time.perf_counter() - wall) / len(crops)
+            cpu = (time.process_time() - cpu) / len(crops)
+            for (result, _), text in zip(crops, texts):
+                result['text'] = normalize_ocr_text(text)
+                result['timings'].update(ocr=wall, ocr_cpu=cpu)
+            return results
+    
+    # One by one, so a single bad crop does not fail the whole batch
+    for result, crop in crops:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            result['text'] = normalize_ocr_text(backend.image_to_string(crop, lang, config))
+        except Exception as e:
+            result['error'] = f"OCR failed: {e}"
+        result['timings'].update(ocr=time.perf_counter() - wall, ocr_cpu=time.process_time() - cpu)
+    return results
+
+def extract_screenshot_features(image_path: str, top_fraction: float = 0.5,
+                                resize_to: int = 64, lang: str = OCR_LANG,
+                                ocr_backend: str = 'auto', ocr_profile: Optional[str] = None,
+                                blank_filter: bool = False) -> Dict:
+    """Single-file version of extract_screenshot_features_batch."""
+    return extract_screenshot_features_batch([image_path], top_fraction, resize_to, lang, ocr_backend,
+                                             ocr_profile, blank_filter)[0]
+
+def feature_cache_params(top_fraction: float = 0.5, resize_to: int = 64, lang: str = OCR_LANG,
+                         ocr_backend: str = 'auto', ocr_profile: Optional[str] = None,
+                         blank_filter: bool = False) -> str:
+    """Describe every setting that affects extract_screenshot_features output."""
+    params = (f"v2|top={top_fraction}|config={OCR_CONFIG}|lang={lang}|thumb={resize_to}"
+              f"|ocr={resolve_backend_name(ocr_backend)}")
+    profile = get_profile(ocr_profile)
+    if profile is not None:
+        # The profile replaces the crop and config, so its settings are what count
+        params += f"|profile={ocr_profile}:{profile.key()}"
+    if blank_filter:
+        # Filtered frames have no OCR text
+        params += f"|blank={BLANK_MAX_STD},{DARK_MAX_MEAN},{BLANK_MAX_INK_FRACTION}"
+    return params
+
+def default_worker_count() -> int:
+    """Default number of feature-extraction processes (one per core)."""
+    return os.cpu_count() or 1
+
+def iter_screenshot_features(paths: List[str], workers: int = 1, top_fraction: float = 0.5,
+                             resize_to: int = 64, executor: Optional[ProcessPoolExecutor] = None,
+                             lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                             ocr_profile: Optional[str] = None, blank_filter: bool = False):
+    """
+    Yield extract_screenshot_features results for paths, in input order.
+    
+    Paths are processed in chunks so batching OCR backends see several crops
+    per call. With more than one worker the chunks are fanned out over a
+    process pool, where each worker keeps its OCR engine loaded; results are
+    still yielded in the order of paths so that grouping stays deterministic.
+    Pass an executor to reuse an already running pool instead of starting a
+    new one.
+    """
+    extract = partial(extract_screenshot_features_batch, top_fraction=top_fraction,
+                      resize_to=resize_to, lang=lang, ocr_backend=ocr_backend, ocr_profile=ocr_profile,
+                      blank_filter=blank_filter)
+    
+    # Moderate chunks keep IPC overhead low without starving workers at the tail
+    chunk_size = max(1, min(16, len(paths) // (max(1, workers) * 4)))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    
+    if executor is None and (workers <= 1 or len(chunks) <= 1):
+        for chunk in chunks:
+            yield from extract(chunk)
+        return
+    
+    if executor is not None:
+        for results in executor.map(extract, chunks):
+            yield from results
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for results in executor.map(extract, chunks):
+            yield from results
+
+def correlation_to_similarity(correlation: np.ndarray) -> np.ndarray:
+    """Map correlation coefficients (-1..1) to similarity scores (0..1)."""
+    return np.clip((correlation + 1) / 2, 0.0, 1.0)
+
+class ThumbnailMatrix:
+    """
+    Contiguous float32 matrix of normalized thumbnails, one row per image.
+    
+    Rows are appended as new representatives appear; the similarity of one
+    thumbnail against any subset of rows is a single matrix-vector product.
+    """
+    
+    def __init__(self, dimension: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.uniform = np.zeros(capacity, dtype=bool)
+        self.means = np.zeros(capacity, dtype=np.float32)
+        self.count = 0
+    
+    @classmethod
+    def from_arrays(cls, vectors: np.ndarray, uniform: np.ndarray, means: np.ndarray) -> 'ThumbnailMatrix':
+        """Wrap existing arrays (e.g. a memory-mapped index) without copying them."""
+        matrix = cls(vectors.shape[1], capacity=0)
+        matrix.vectors = vectors
+        matrix.uniform = np.asarray(uniform, dtype=bool)
+        matrix.means = np.asarray(means, dtype=np.float32)
+        matrix.count = len(vectors)
+        return matrix
+    
+    def add(self, vector: np.ndarray, uniform: bool, mean: float) -> int:
+        """Append a thumbnail and return its row index."""
+        if self.count == len(self.vectors):
+            capacity = 2 * len(self.vectors)
+            self.vectors = np.resize(self.vectors, (capacity, self.vectors.shape[1]))
+            self.uniform = np.resize(self.uniform, capacity)
+            self.means = np.resize(self.means, capacity)
+        row = self.count
+        self.vectors[row] = vector
+        self.uniform[row] = uniform
+        self.means[row] = mean
+        self.count += 1
+        return row
+    
+    def similarities(self, vector: np.ndarray, uniform: bool, mean: float,
+                     rows: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Similarity (0..1) of one thumbnail against the given rows (default: all).
+        
+        Uniform thumbnails have no defined correlation; like the pairwise
+        version they only match another uniform thumbnail of the same shade.
+        """
+        index = np.arange(self.count) if rows is None else np.asarray(rows, dtype=np.intp)
+        scores = correlation_to_similarity(self.vectors[index] @ vector)
+        row_uniform = self.uniform[index]
+        if uniform or row_uniform.any():
+            either = row_uniform | uniform
+            same_shade = row_uniform & uniform & np.isclose(self.means[index], mean)
+            scores = np.where(either, same_shade.astype(np.float32), scores)
+        return scores
+
 def calculate_image_similarity(image_path1: str, image_path2: str, resize_to: int = 64) -> float:
     """
-    Calculate visual similarity between two images using perceptual hashing.
+    Calculate visual similarity between two images using thumbnail correlation.
     
     Args:
         image_path1: Path to first image
@@ -77,35 +432,12 @@ def calculate_image_similarity(image_path1: str, image_path2: str, resize_to: in
         Similarity score between 0.0 and 1.0 (1.0 = identical)
     """
     try:
-        with Image.open(image_path1) as img1, Image.open(image_path2) as img2:
-            # Convert to grayscale and resize for faster comparison
-            img1_small = img1.convert('L').resize((resize_to, resize_to))
-            img2_small = img2.convert('L').resize((resize_to, resize_to))
-            
-            # Convert to numpy arrays
-            arr1 = np.array(img1_small)
-            arr2 = np.array(img2_small)
-            
-            # Calculate normalized cross-correlation
-            # Flatten arrays
-            arr1_flat = arr1.flatten().astype(float)
-            arr2_flat = arr2.flatten().astype(float)
-            
-            # Normalize to mean 0
-            arr1_norm = arr1_flat - np.mean(arr1_flat)
-            arr2_norm = arr2_flat - np.mean(arr2_flat)
-            
-            # Calculate correlation coefficient
-            correlation = np.corrcoef(arr1_norm, arr2_norm)[0, 1]
-            
-            # Handle NaN (when std dev is 0)
-            if np.isnan(correlation):
-                # If both images are uniform (no variation), check if they're the same
-                return 1.0 if np.allclose(arr1_flat, arr2_flat) else 0.0
-            
-            # Convert correlation to similarity (0 to 1)
-            similarity = (correlation + 1) / 2
-            return max(0.0, min(1.0, similarity))
+        features1 = extract_image_features(image_path1, resize_to)
+        features2 = extract_image_features(image_path2, resize_to)
+        
+        matrix = ThumbnailMatrix(resize_to * resize_to, capacity=1)
+        matrix.add(features1['vector'], features1['uniform'], features1['mean'])
+        return float(matrix.similarities(features2['vector'], features2['uniform'], features2['mean'])[0])
             
     except Exception as e:
         print(f"Error comparing images {image_path1} and {image_path2}: {e}")
@@ -129,16 +461,682 @@ def get_text_hash(text: str) -> str:
     """Generate a hash for text content."""
     return hashlib.md5(text.encode()).hexdigest()[:8]
 
+class MinHashLSH:
+    """
+    MinHash signatures over character shingles, bucketed by LSH bands.
+    
+    Texts that share a band bucket with the query are returned as candidates.
+    This is an approximate filter: pairs with low shingle overlap are skipped
+    even though their SequenceMatcher ratio is not strictly bounded by it.
+    """
+    
+    _PRIME = (1 << 61) - 1
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        self.buckets = [{} for _ in range(bands)]
+        self.short_items = set()  # Too short to shingle; always candidates
+    
+    def _signature(self, text: str) -> Optional[np.ndarray]:
+        k = self.shingle_size
+        if len(text) < k:
+            return None
+        shingles = {zlib.crc32(text[j:j + k].encode()) for j in range(len(text) - k + 1)}
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # (a * x + b) mod p for every permutation and shingle at once; inputs
+        # are < 2**32 and a < 2**31, so the products stay below 2**63
+        hashed = (np.outer(self.a, values) + self.b[:, None]) % np.uint64(self._PRIME)
+        return hashed.min(axis=1)
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def add(self, item, text: str) -> None:
+        """Index text under item."""
+        signature = self._signature(text)
+        if signature is None:
+            self.short_items.add(item)
+            return
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(item)
+    
+    def candidates(self, text: str) -> Optional[set]:
+        """Items sharing at least one band with text (None if text is too short to filter)."""
+        signature = self._signature(text)
+        if signature is None:
+            return None
+        found = set(self.short_items)
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            found.update(bucket.get(key, ()))
+        return found
+
+class TextSimilarityEngine:
+    """
+    Decides whether OCR texts reach the similarity threshold, pruning cheaply first.
+    
+    Bounds are applied from cheapest to most expensive, and the full
+    SequenceMatcher ratio only runs for pairs that survive all of them:
+    
+    1. length ratio: ratio <= 2 * min(len) / (len_a + len_b)
+    2. quick_ratio: multiset character overlap, also an upper bound on ratio
+    3. optional MinHash/LSH over character shingles (approximate, opt-in)
+    
+    Representative texts are registered with add() so their SequenceMatcher
+    state is built once and reused for every comparison against them.
+    """
+    
+    def __init__(self, threshold: float, use_lsh: bool = False):
+        self.threshold = threshold
+        self.matchers = {}
+        self.lsh = MinHashLSH() if use_lsh else None
+        self.stats = {
+            'pairs': 0,
+            'pruned_by_length': 0,
+            'pruned_by_quick_ratio': 0,
+            'pruned_by_lsh': 0,
+            'exact_comparisons': 0
+        }
+    
+    def add(self, item, text: str) -> None:
+        """Register a representative text."""
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(text)  # seq2 holds the expensive lookup tables
+        self.matchers[item] = matcher
+        if self.lsh is not None:
+            self.lsh.add(item, text)
+    
+    def lsh_candidates(self, text: str) -> Optional[set]:
+        """Representatives that may be similar to text (None means no LSH filtering)."""
+        return self.lsh.candidates(text) if self.lsh is not None else None
+    
+    def compare(self, text: str, item, candidates: Optional[set] = None) -> Optional[float]:
+        """
+        Similarity of text against a registered representative.
+        
+        Args:
+            text: Text of the screenshot being classified
+            item: Representative registered with add()
+            candidates: Result of lsh_candidates(text) for the same text
+        
+        Returns:
+            The exact calculate_text_similarity value, or None when a bound
+            shows it is below the threshold
+        """
+        self.stats['pairs'] += 1
+        matcher = self.matchers[item]
+        other = matcher.b
+        
+        # Empty texts are decided by calculate_text_similarity's special cases
+        if not text or not other:
+            self.stats['exact_comparisons'] += 1
+            return calculate_text_similarity(text, other)
+        
+        if 2.0 * min(len(text), len(other)) / (len(text) + len(other)) < self.threshold:
+            self.stats['pruned_by_length'] += 1
+            return None
+        
+        matcher.set_seq1(text)
+        if matcher.quick_ratio() < self.threshold:
+            self.stats['pruned_by_quick_ratio'] += 1
+            return None
+        
+        if candidates is not None and item not in candidates:
+            self.stats['pruned_by_lsh'] += 1
+            return None
+        
+        self.stats['exact_comparisons'] += 1
+        return matcher.ratio()
+
+# Hamming radius used to pull candidate representatives out of the hash index.
+# None (the default) compares every screenshot with every representative, so
+# the grouping is exactly that of the similarity thresholds. dHash distance is
+# not bounded by thumbnail correlation: near-identical thumbnails of flat
+# screens (correlation above 0.999) can differ in 24 or more bits, because
+# tiny gradients decide their bits. A radius is therefore only a speedup that
+# may miss true duplicates; FAST_HASH_RADIUS is a reasonable value for it.
+DEFAULT_HASH_RADIUS = None
+FAST_HASH_RADIUS = 20
+
+def calculate_dhash(image_path: str, resize_to: int = 64) -> str:
+    """
+    Calculate a 64-bit difference hash (dHash) for an image.
+    
+    The hash is computed from the same grayscale thumbnail used by
+    calculate_image_similarity, so visually similar screenshots end up
+    a small Hamming distance apart.
+    
+    Args:
+        image_path: Path to the image file
+        resize_to: Size of the intermediate grayscale thumbnail
+    
+    Returns:
+        Hash as a 16-character hex string (empty string on error)
+    """
+    try:
+        with Image.open(image_path) as img:
+            return image_dhash(image_thumbnail(img, resize_to))
+    except Exception as e:
+        print(f"Error hashing {image_path}: {e}")
+        return ""
+
+class RepresentativeRecord:
+    """What the grouper keeps about a group's representative to classify later screenshots."""
+    __slots__ = ('name', 'text', 'text_hash', 'dhash', 'duplicates')
+    
+    def __init__(self, name: str, text: str, text_hash: str, dhash: Optional[int]):
+        self.name = name
+        self.text = text
+        self.text_hash = text_hash
+        self.dhash = dhash
+        self.duplicates = 0
+
+class ScreenshotGrouper:
+    """
+    Incremental grouping of screenshots by BOTH text and image similarity.
+    
+    Screenshots are classified one at a time with add(): a screenshot joins the
+    first existing group (in creation order) whose representative is similar
+    in both text and image, otherwise it starts a new group. All indexes live
+    in memory, so the same grouper serves a whole directory or a live capture.
+    
+    With keep_records=False the full per-screenshot records are not kept:
+    representatives are remembered as RepresentativeRecord objects plus their
+    rows in the BK-tree, thumbnail matrix, text index and exact-match index
+    (duplicates' file/pixel hashes are not indexed), so memory grows with the
+    number of groups only. add() returns every decision, for the
+    caller to write out as it is made (see stream_screenshots).
+    
+    With a window of K, a screenshot is first compared only with the group
+    of the screenshot before it and the K newest representatives, newest
+    first; the hash-indexed search over all groups is the fallback when none
+    of those match. Sequential captures put near-duplicates next to each
+    other, so most duplicates are settled by a handful of comparisons. A
+    screenshot that matches a recent group joins it even if an older group
+    would also have matched.
+    
+    Records carrying a 'bucket' label (blank or dark frames found by
+    classify_blank_frame) bypass the comparisons: the first frame of each
+    label starts a group of its own and every later one joins it. Those
+    groups are never candidates for regular screenshots and, like the
+    placeholder groups of undecodable files, do not take a window slot.
+    
+    Each decision is made by the cheapest check that can settle it:
+    byte/pixel-identical screenshots are duplicates straight away, the
+    precomputed image score rejects before any text work, identical OCR text
+    skips SequenceMatcher, and only the remaining pairs get a text comparison.
+    """
+    
+    def __init__(self, text_similarity_threshold: float = 0.8,
+                 image_similarity_threshold: float = 0.95,
+                 hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                 resize_to: int = 64, text_lsh: bool = False,
+                 instrumentation: Optional[Instrumentation] = None,
+                 keep_records: bool = True, window: Optional[int] = None):
+        self.text_similarity_threshold = text_similarity_threshold
+        self.image_similarity_threshold = image_similarity_threshold
+        self.hash_radius = hash_radius
+        self.resize_to = resize_to
+        self.keep_records = keep_records
+        self.groups = []  # Full group dicts, only with keep_records
+        self.duplicates = []
+        self.screenshots = []
+        self.group_records = []  # RepresentativeRecord per group id
+        self.classified = 0
+        self.duplicate_count = 0
+        self.errors = []
+        self.comparisons = 0
+        self.hash_index = BKTree()
+        self.representatives = ThumbnailMatrix(resize_to * resize_to)  # Row i belongs to group i
+        self.text_engine = TextSimilarityEngine(text_similarity_threshold, use_lsh=text_lsh)
+        self.exact_index = {}  # content/pixel hash -> group id
+        self.instrumentation = instrumentation or Instrumentation()
+        self.window = window
+        # The window newest groups a screenshot can match (no blank or placeholder groups)
+        self.recent_groups = deque(maxlen=window) if window is not None else None
+        self.last_group = None  # Group the previous screenshot ended up in
+        self.window_stats = {'window_matches': 0, 'fallback_searches': 0, 'fallback_matches': 0}
+        self.bucket_groups = {}  # classify_blank_frame label -> group id
+        # How often each tier of the comparison cascade made the decision
+        self.cascade = {
+            'exact_match': 0,
+            'rejected_by_image': 0,
+            'matched_by_text_hash': 0,
+            'matched_by_text_compare': 0,
+            'rejected_by_text': 0,
+            'blank_frame': 0,
+            'unique': 0
+        }
+    
+    def add(self, current: Dict, features: Optional[Dict]) -> Dict:
+        """
+        Classify one screenshot record.
+        
+        Args:
+            current: Record built by make_screenshot_record
+            features: Image features of the screenshot (None if it could not be decoded)
+        
+        Returns:
+            Decision dict with name, path, status ('unique' or 'duplicate'),
+            group (id), duplicate_of, text_similarity, image_similarity and
+            tier (the cascade tier that decided)
+        """
+        self.classified += 1
+        if self.keep_records:
+            self.screenshots.append(current)
+        if current.get('error'):
+            self.errors.append({'name': current['name'], 'error': current['error']})
+        
+        # Blank and transition frames only need to be grouped by their label
+        bucket = current.get('bucket')
+        if bucket:
+            group_id = self.bucket_groups.get(bucket)
+            if group_id is None:
+                self.bucket_groups[bucket] = len(self.group_records)
+                log(f"    → UNIQUE ({bucket} frame)", DEBUG)
+                return self._new_group(current, None, [], 'blank_frame')
+            self.cascade['blank_frame'] += 1
+            log(f"    → DUPLICATE ({bucket} frame)", DEBUG)
+            return self._add_duplicate(current, group_id, None, None, [], 'blank_frame', track=False)
+        
+        # Tier 0: byte-identical or pixel-identical to something already classified.
+        # Identical screenshots always get the same decision, so no comparison is needed.
+        exact_keys = self._exact_keys(current, features)
+        for key in exact_keys:
+            group_id = self.exact_index.get(key)
+            if group_id is not None:
+                self.cascade['exact_match'] += 1
+                log(f"    → DUPLICATE (identical to a screenshot in group of {self.group_records[group_id].name})", DEBUG)
+                return self._add_duplicate(current, group_id, 1.0, 1.0, exact_keys, 'exact_match')
+        
+        text_candidates = None
+        if features is not None and self.group_records and self.text_engine.lsh is not None:
+            with self.instrumentation.stage('text_compare'):
+                text_candidates = self.text_engine.lsh_candidates(current['text'])
+        
+        # Temporal window: the predecessor's group and the newest representatives first
+        window_ids = []
+        if self.window is not None and features is not None:
+            window_ids = self._window_ids(int(current['dhash'], 16))
+            decision = self._match(current, features, window_ids, exact_keys, text_candidates)
+            if decision is not None:
+                self.window_stats['window_matches'] += 1
+                decision['search'] = 'window'
+                return decision
+            self.window_stats['fallback_searches'] += 1
+        
+        # Only look at representatives that are close in hash space, in group order
+        if features is None:
+            candidate_ids = []  # Undecodable images never match anything
+        elif self.hash_radius is None:
+            candidate_ids = list(range(len(self.group_records)))
+        else:
+            candidate_ids = sorted(self.hash_index.search(int(current['dhash'], 16), self.hash_radius))
+        if window_ids:
+            checked = set(window_ids)
+            candidate_ids = [group_id for group_id in candidate_ids if group_id not in checked]
+        
+        decision = self._match(current, features, candidate_ids, exact_keys, text_candidates)
+        if decision is not None:
+            if self.window is not None:
+                self.window_stats['fallback_matches'] += 1
+                decision['search'] = 'global'
+            return decision
+        
+        # This is unique, create new group
+        self.cascade['unique'] += 1
+        log(f"    → UNIQUE", DEBUG)
+        decision = self._new_group(current, features, exact_keys, 'unique')
+        if self.window is not None and features is not None:
+            decision['search'] = 'global'
+        return decision
+    
+    def _new_group(self, current: Dict, features: Optional[Dict], exact_keys: List[str], tier: str) -> Dict:
+        """
+        Start a group with current as its representative.
+        
+        Without features the group gets a placeholder row and no hash or text
+        index entries, so no later screenshot is ever compared into it.
+        """
+        group_id = len(self.group_records)
+        dhash = int(current['dhash'], 16) if current['dhash'] and features is not None else None
+        self.group_records.append(RepresentativeRecord(current['name'], current['text'], current['text_hash'],
+                                                       dhash))
+        if self.keep_records:
+            self.groups.append({
+                'representative': current,
+                'duplicates': [],
+                'bucket': current.get('bucket')
+            })
+        if features is None:
+            # Placeholder row that never matches (NaN shade is never "close")
+            self.representatives.add(np.zeros(self.resize_to * self.resize_to, dtype=np.float32),
+                                     True, float('nan'))
+        else:
+            self.representatives.add(features['vector'], features['uniform'], features['mean'])
+        if dhash is not None:
+            self.hash_index.add(dhash, group_id)
+        if tier != 'blank_frame':
+            self.text_engine.add(group_id, current['text'])
+        if tier != 'blank_frame' and features is not None:
+            self.last_group = group_id
+            if self.recent_groups is not None:
+                self.recent_groups.append(group_id)
+        for key in exact_keys:
+            self.exact_index[key] = group_id
+        return self._decision(current, 'unique', group_id, None, None, None, tier)
+    
+    def _window_ids(self, dhash: int) -> List[int]:
+        """
+        Group of the previous screenshot, then the last window representatives,
+        newest first; like the global search, limited to hash_radius.
+        """
+        ids = list(reversed(self.recent_groups))
+        if self.last_group is not None:
+            if self.last_group in ids:
+                ids.remove(self.last_group)
+            ids.insert(0, self.last_group)
+        if self.hash_radius is None:
+            return ids
+        return [group_id for group_id in ids if self.group_records[group_id].dhash is not None and
+                hamming_distance(dhash, self.group_records[group_id].dhash) <= self.hash_radius]
+    
+    def _match(self, current: Dict, features: Dict, candidate_ids: List[int], exact_keys: List[str],
+               text_candidates: Optional[set]) -> Optional[Dict]:
+        """
+        Run the comparison cascade against candidate groups, in the given order.
+        
+        Returns:
+            The duplicate decision for the first group that matches, or None
+        """
+        if not candidate_ids:
+            return None
+        
+        # Image similarity against every candidate in one matrix-vector product
+        with self.instrumentation.stage('image_compare'):
+            image_similarities = self.representatives.similarities(
+                features['vector'], features['uniform'], features['mean'], candidate_ids)
+        
+        for position, group_id in enumerate(candidate_ids):
+            self.comparisons += 1
+            representative = self.group_records[group_id]
+            
+            # Tier 1: the image score is already computed, so it rejects first
+            image_similarity = float(image_similarities[position])
+            if image_similarity < self.image_similarity_threshold:
+                self.cascade['rejected_by_image'] += 1
+                log(f"  vs {representative.name}: text=skipped, image={image_similarity:.3f}", DEBUG)
+                continue
+            
+            # Tier 2: identical OCR text needs no SequenceMatcher
+            if (current['text_hash'] == representative.text_hash and
+                    current['text'] == representative.text):
+                self.cascade['matched_by_text_hash'] += 1
+                log(f"  vs {representative.name}: text=identical, image={image_similarity:.3f}", DEBUG)
+                log(f"    → DUPLICATE (both text and image similar)", DEBUG)
+                return self._add_duplicate(current, group_id, 1.0, image_similarity, exact_keys,
+                                           'matched_by_text_hash')
+            
+            # Tier 3: bounded text comparison (None = text provably below threshold)
+            with self.instrumentation.stage('text_compare'):
+                text_similarity = self.text_engine.compare(current['text'], group_id, text_candidates)
+            
+            if VERBOSITY >= DEBUG:
+                text_label = "pruned" if text_similarity is None else f"{text_similarity:.3f}"
+                print(f"  vs {representative.name}: text={text_label}, image={image_similarity:.3f}")
+            
+            # Consider duplicate only if BOTH text AND image are highly similar
+            if text_similarity is not None and text_similarity >= self.text_similarity_threshold:
+                self.cascade['matched_by_text_compare'] += 1
+                log(f"    → DUPLICATE (both text and image similar)", DEBUG)
+                return self._add_duplicate(current, group_id, text_similarity, image_similarity, exact_keys,
+                                           'matched_by_text_compare')
+            self.cascade['rejected_by_text'] += 1
+        return None
+    
+    @staticmethod
+    def _exact_keys(current: Dict, features: Optional[Dict]) -> List[str]:
+        """Keys under which identical screenshots are found (none if extraction failed)."""
+        if current.get('error') or features is None:
+            return []
+        keys = []
+        if current.get('content_hash'):
+            keys.append('file:' + current['content_hash'])
+        if features.get('pixel_hash'):
+            keys.append('pixels:' + features['pixel_hash'])
+        return keys
+    
+    def _add_duplicate(self, current: Dict, group_id: int, text_similarity: Optional[float],
+                       image_similarity: Optional[float], exact_keys: List[str], tier: str,
+                       track: bool = True) -> Dict:
+        """
+        Record current as a duplicate of the given group.
+        
+        With track=False the group does not become the window's predecessor
+        (blank frames between two screens must not break up their sequence).
+        """
+        representative = self.group_records[group_id]
+        representative.duplicates += 1
+        self.duplicate_count += 1
+        if track:
+            self.last_group = group_id
+        current['text_similarity'] = text_similarity
+        current['image_similarity'] = image_similarity
+        current['duplicate_of'] = representative.name
+        if self.keep_records:
+            self.groups[group_id]['duplicates'].append(current)
+            self.duplicates.append(current)
+        if self.keep_records:
+            # Bounded-memory groupers only index representatives; a later copy of
+            # this duplicate reaches the same group through the cascade instead
+            for key in exact_keys:
+                self.exact_index.setdefault(key, group_id)
+        return self._decision(current, 'duplicate', group_id, representative.name,
+                              text_similarity, image_similarity, tier)
+    
+    @staticmethod
+    def _decision(current: Dict, status: str, group_id: int, duplicate_of: Optional[str],
+                  text_similarity: Optional[float], image_similarity: Optional[float], tier: str) -> Dict:
+        return {
+            'name': current['name'],
+            'path': current['path'],
+            'status': status,
+            'group': group_id,
+            'duplicate_of': duplicate_of,
+            'text_similarity': text_similarity,
+            'image_similarity': image_similarity,
+            'tier': tier
+        }
+    
+    def blank_frame_counts(self) -> Dict[str, int]:
+        """Screenshots per blank-frame label (representative included)."""
+        return {bucket: self.group_records[group_id].duplicates + 1
+                for bucket, group_id in self.bucket_groups.items()}
+    
+    def instrumentation_summary(self) -> Dict:
+        """Instrumentation summary including the grouper's own counters."""
+        self.instrumentation.counters['screenshots_classified'] = self.classified
+        self.instrumentation.counters['pairs_compared'] = self.comparisons
+        self.instrumentation.counters['text_comparisons'] = self.text_engine.stats['exact_comparisons']
+        return self.instrumentation.summary()
+    
+    def analysis(self) -> Dict:
+        """
+        Analysis results in the format returned by analyze_screenshots.
+        
+        Without keep_records, 'groups' and 'all_screenshots' are empty.
+        """
+        return {
+            'total_screenshots': self.classified,
+            'unique_groups': len(self.group_records),
+            'total_duplicates': self.duplicate_count,
+            'groups': self.groups,
+            'all_screenshots': self.screenshots,
+            'errors': self.errors,
+            'comparisons': self.comparisons,
+            'text_prefilter': self.text_engine.stats,
+            'cascade': self.cascade,
+            'blank_frames': self.blank_frame_counts(),
+            'window': dict(self.window_stats, size=self.window) if self.window is not None else None,
+            'instrumentation': self.instrumentation_summary(),
+            'thresholds': {
+                'text_similarity': self.text_similarity_threshold,
+                'image_similarity': self.image_similarity_threshold,
+                'hash_radius': self.hash_radius
+            }
+        }
+
+def make_screenshot_record(png_file: Path, content_hash: str, result: Dict) -> Dict:
+    """Build the per-screenshot record stored in groups and the report."""
+    text, features = result['text'], result['features']
+    return {
+        'path': str(png_file),
+        'name': png_file.name,
+        'text': text,
+        'text_hash': get_text_hash(text),
+        'dhash': features['dhash'] if features else "",
+        'content_hash': content_hash,
+        'file_size': png_file.stat().st_size,
+        'text_length': len(text),
+        'error': result['error'],
+        'bucket': result.get('bucket')
+    }
+
+# Files hashed, looked up and extracted together by iter_cached_features;
+# bounds how many extraction results are held in memory at once
+FEATURE_WINDOW = 256
+
+def iter_cached_features(png_files: List[Path], workers: int = 1, resize_to: int = 64,
+                         cache: Optional[FeatureCache] = None,
+                         executor: Optional[ProcessPoolExecutor] = None,
+                         lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                         instrumentation: Optional[Instrumentation] = None,
+                         window: int = FEATURE_WINDOW, ocr_profile: Optional[str] = None,
+                         content_hashes: Optional[List[str]] = None, blank_filter: bool = False):
+    """
+    Yield (png_file, content_hash, extraction result) for each file, in input order.
+    
+    Files are handled in windows of window files: each window is hashed,
+    looked up in the cache and extracted before the next one is read, and
+    its new results are written back to the cache when it is done. Memory
+    therefore stays bounded however many files there are, and an interrupted
+    run keeps everything extracted so far. Files whose content is already in
+    the cache are not decoded again, and byte-identical files close to each
+    other are only extracted once. Hashing, cache and extraction time, and
+    the workers' decode/OCR timings, are recorded in instrumentation if given.
+    Pass content_hashes if the files were already hashed.
+    """
+    instrumentation = instrumentation or Instrumentation()
+    known_hashes = content_hashes
+    cache_params = feature_cache_params(resize_to=resize_to, lang=lang, ocr_backend=ocr_backend,
+                                        ocr_profile=ocr_profile, blank_filter=blank_filter)
+    owns_executor = executor is None and workers > 1 and len(png_files) > window
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)  # One pool for all windows
+    recent = OrderedDict()  # content hash -> result of the last few distinct files
+    cache_hits = 0
+    
+    try:
+        for start in range(0, len(png_files), window):
+            files = png_files[start:start + window]
+            if known_hashes is not None:
+                content_hashes = known_hashes[start:start + window]
+            else:
+                with instrumentation.stage('hash'):
+                    content_hashes = [file_content_hash(str(f)) for f in files]
+            # Reuse features of files whose content was already processed with these settings
+            lookup = [h for h in dict.fromkeys(content_hashes) if h not in recent]
+            with instrumentation.stage('cache'):
+                cached = cache.get_many(lookup, cache_params) if cache and lookup else {}
+            cache_hits += len(cached)
+            first_paths = {}  # Identical files are only extracted once
+            for png_file, content_hash in zip(files, content_hashes):
+                if content_hash not in recent and content_hash not in cached:
+                    first_paths.setdefault(content_hash, str(png_file))
+            extracted = iter_screenshot_features(list(first_paths.values()), workers=workers,
+                                                 resize_to=resize_to, executor=executor,
+                                                 lang=lang, ocr_backend=ocr_backend,
+                                                 ocr_profile=ocr_profile, blank_filter=blank_filter)
+            fresh = {}
+            
+            for png_file, content_hash in zip(files, content_hashes):
+                if content_hash in recent:
+                    result = recent[content_hash]
+                    recent.move_to_end(content_hash)
+                    instrumentation.count('identical_files')
+                elif content_hash in cached:
+                    result = cached[content_hash]
+                    instrumentation.count('cache_hits')
+                else:
+                    with instrumentation.stage('extract'):  # Time spent waiting for the workers
+                        result = next(extracted)
+                    fresh[content_hash] = result
+                    instrumentation.record_extraction(result.get('timings'))
+                    if result.get('bucket'):
+                        instrumentation.count('ocr_skipped_blank')
+                    instrumentation.count('images_decoded' if result['features'] is not None else 'decode_failures')
+                recent[content_hash] = result
+                if len(recent) > window:
+                    recent.popitem(last=False)
+                yield png_file, content_hash, result
+            
+            if cache and fresh:
+                with instrumentation.stage('cache'):
+                    cache.put_many(fresh, cache_params)
+    finally:
+        if owns_executor:
+            executor.shutdown()
+    if cache:
+        log(f"Feature cache: {cache_hits} files already processed")
+
 def analyze_screenshots(directory: str, text_similarity_threshold: float = 0.8, 
-                       image_similarity_threshold: float = 0.95) -> Dict:
+                       image_similarity_threshold: float = 0.95,
+                       hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                       resize_to: int = 64, workers: Optional[int] = None,
+                       cache: Optional[FeatureCache] = None, text_lsh: bool = False,
+                       lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                       executor: Optional[ProcessPoolExecutor] = None,
+                       instrumentation: Optional[Instrumentation] = None,
+                       ocr_profile: Optional[str] = None, window: Optional[int] = None,
+                       blank_filter: bool = False, stop_event: Optional[threading.Event] = None) -> Dict:
     """
     Analyze screenshots and group by BOTH text and image similarity.
     A screenshot is considered a duplicate only if BOTH text AND image are similar.
     
+    Each file is decoded once into OCR text and a normalized thumbnail.
+    The image similarity of a screenshot to all candidate representatives is
+    computed with one matrix-vector product. Representatives are also kept in
+    a BK-tree keyed by dHash: with a hash_radius, only those within that many
+    bits are candidates (faster, but may miss duplicates, see
+    DEFAULT_HASH_RADIUS).
+    
     Args:
         directory: Directory containing screenshots
         text_similarity_threshold: Threshold for text similarity (0.8 = 80% similar)
         image_similarity_threshold: Threshold for image similarity (0.95 = 95% similar)
+        hash_radius: Hamming radius for candidate lookup (None compares against all groups)
+        resize_to: Thumbnail size used for image similarity
+        workers: Number of processes for OCR and feature extraction (None = one per core)
+        cache: Persistent feature cache; files whose content is already cached skip OCR
+        text_lsh: Also skip text comparisons that a MinHash/LSH index deems dissimilar
+        lang: Tesseract language (traineddata) used for OCR
+        ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+        executor: Already running process pool to extract features with
+        instrumentation: Collects stage timings and counters (a new one if None)
+        ocr_profile: Task name whose OCR profile (see ocr_profiles.OCR_PROFILES)
+            is used instead of the top-half crop
+        window: Compare each screenshot with its predecessor's group and the
+            last window representatives before searching all groups
+            (see ScreenshotGrouper; None always searches all groups)
+        blank_filter: Put blank and dark frames into one group per
+            kind without OCR (see classify_blank_frame)
+        stop_event: Abandons the analysis when set; an empty result is returned
     
     Returns:
         Dictionary with analysis results
@@ -154,105 +1152,428 @@ def analyze_screenshots(directory: str, text_similarity_threshold: float = 0.8,
         print(f"No PNG files found in {directory}")
         return {}
     
-    print(f"Found {len(png_files)} screenshots to analyze...")
+    log(f"Found {len(png_files)} screenshots to analyze...")
+    if workers is None:
+        workers = default_worker_count()
+    if workers > 1:
+        log(f"Extracting features with {workers} worker processes...")
+    instrumentation = instrumentation or Instrumentation()
     
-    # Extract text from all screenshots
+    # Decode every screenshot once: OCR text plus thumbnail features
     screenshot_data = []
-    for i, png_file in enumerate(png_files):
-        print(f"Processing {i+1}/{len(png_files)}: {png_file.name}")
-        
-        text = extract_top_text(str(png_file))
-        file_size = png_file.stat().st_size
-        
-        screenshot_data.append({
-            'path': str(png_file),
-            'name': png_file.name,
-            'text': text,
-            'text_hash': get_text_hash(text),
-            'file_size': file_size,
-            'text_length': len(text)
-        })
+    image_features = []
+    extracted = iter_cached_features(png_files, workers=workers, resize_to=resize_to, cache=cache,
+                                     executor=executor, lang=lang, ocr_backend=ocr_backend,
+                                     instrumentation=instrumentation, ocr_profile=ocr_profile,
+                                     blank_filter=blank_filter)
+    for i, (png_file, content_hash, result) in enumerate(extracted):
+        if stop_event is not None and stop_event.is_set():
+            return {}
+        log(f"Processing {i+1}/{len(png_files)}: {png_file.name}", VERBOSE)
+        screenshot_data.append(make_screenshot_record(png_file, content_hash, result))
+        image_features.append(result['features'])
     
     # Group by BOTH text and image similarity
-    unique_groups = []
-    duplicates = []
+    grouper = ScreenshotGrouper(text_similarity_threshold, image_similarity_threshold,
+                                hash_radius=hash_radius, resize_to=resize_to, text_lsh=text_lsh,
+                                instrumentation=instrumentation, window=window)
     
-    print(f"\nComparing images for visual similarity...")
+    log(f"\nComparing images for visual similarity...")
     
-    for i, current in enumerate(screenshot_data):
-        print(f"Analyzing {i+1}/{len(screenshot_data)}: {current['name']}")
-        
-        # Check if this screenshot is similar to any existing group
-        is_duplicate = False
-        
-        for group in unique_groups:
-            representative = group['representative']
+    with instrumentation.stage('grouping'):
+        for i, current in enumerate(screenshot_data):
+            if stop_event is not None and stop_event.is_set():
+                return {}
+            log(f"Analyzing {i+1}/{len(screenshot_data)}: {current['name']}", VERBOSE)
+            grouper.add(current, image_features[i])
+    
+    return grouper.analysis()
+
+# File that ends watch mode when it appears in the watched directory; whoever
+# drives the capture creates it once the last screenshot is written (nothing
+# in this folder writes it, e.g. `touch <dir>/.capture_complete` after Cypress)
+DEFAULT_SENTINEL = ".capture_complete"
+
+def watch_screenshots(directory: str, text_similarity_threshold: float = 0.8,
+                      image_similarity_threshold: float = 0.95,
+                      hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                      resize_to: int = 64, workers: Optional[int] = None,
+                      cache: Optional[FeatureCache] = None, text_lsh: bool = False,
+                      sentinel: str = DEFAULT_SENTINEL, poll_interval: float = 1.0,
+                      lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                      executor: Optional[ProcessPoolExecutor] = None,
+                      instrumentation: Optional[Instrumentation] = None,
+                      ocr_profile: Optional[str] = None, window: Optional[int] = None,
+                      blank_filter: bool = False, stop_event: Optional[threading.Event] = None) -> Dict:
+    """
+    Classify screenshots as they land in a directory that is still being written to.
+    
+    The directory is polled for new PNG files; a file is processed once its
+    size has been stable for one poll, so half-written screenshots are never
+    decoded. Watching ends when the sentinel file appears in the directory,
+    when stop_event is set or on SIGINT/SIGTERM, after one last scan for
+    remaining files. Signal handlers are only installed when called from the
+    main thread; other threads stop through the sentinel or stop_event.
+    
+    Args:
+        directory: Directory the capture writes screenshots into (created if missing)
+        sentinel: File name that marks the end of the capture
+        poll_interval: Seconds between directory scans
+        stop_event: Event another thread can set to end watching
+        (other arguments as for analyze_screenshots)
+    
+    Returns:
+        Dictionary with analysis results, as returned by analyze_screenshots
+    """
+    screenshot_dir = Path(directory)
+    screenshot_dir.mkdir(parents=True, exist_ok=True)
+    sentinel_path = screenshot_dir / sentinel
+    if workers is None:
+        workers = default_worker_count()
+    
+    instrumentation = instrumentation or Instrumentation()
+    grouper = ScreenshotGrouper(text_similarity_threshold, image_similarity_threshold,
+                                hash_radius=hash_radius, resize_to=resize_to, text_lsh=text_lsh,
+                                instrumentation=instrumentation, window=window)
+    stop_requested = stop_event or threading.Event()
+    
+    def request_stop(signum, frame):
+        print(f"\n🛑 Received signal {signum}, finalizing...")
+        stop_requested.set()
+    
+    previous_handlers = {}
+    if threading.current_thread() is threading.main_thread():
+        # signal.signal raises ValueError anywhere else
+        previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    owns_executor = executor is None and workers > 1
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    seen = set()
+    pending_sizes = {}  # name -> size at previous scan
+    
+    print(f"👀 Watching {directory} (finish by creating {sentinel_path.name} or pressing Ctrl+C)...")
+    try:
+        while True:
+            finishing = stop_requested.is_set() or sentinel_path.exists()
             
-            # Calculate both text and image similarity
-            text_similarity = calculate_text_similarity(current['text'], representative['text'])
-            image_similarity = calculate_image_similarity(current['path'], representative['path'])
+            # Pick up files whose size did not change since the previous scan
+            ready = []
+            with os.scandir(screenshot_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.png') or entry.name in seen or not entry.is_file():
+                        continue
+                    size = entry.stat().st_size
+                    if size > 0 and (finishing or pending_sizes.get(entry.name) == size):
+                        ready.append(Path(entry.path))
+                    else:
+                        pending_sizes[entry.name] = size
             
-            print(f"  vs {representative['name']}: text={text_similarity:.3f}, image={image_similarity:.3f}")
+            ready.sort()
+            extracted = iter_cached_features(ready, workers=workers, resize_to=resize_to,
+                                             cache=cache, executor=executor, lang=lang,
+                                             ocr_backend=ocr_backend, instrumentation=instrumentation,
+                                             ocr_profile=ocr_profile,
+                                             blank_filter=blank_filter) if ready else ()
+            for png_file, content_hash, result in extracted:
+                seen.add(png_file.name)
+                pending_sizes.pop(png_file.name, None)
+                log(f"Analyzing {len(seen)}: {png_file.name}", VERBOSE)
+                with instrumentation.stage('grouping'):
+                    grouper.add(make_screenshot_record(png_file, content_hash, result), result['features'])
             
-            # Consider duplicate only if BOTH text AND image are highly similar
-            if (text_similarity >= text_similarity_threshold and 
-                image_similarity >= image_similarity_threshold):
-                
-                # This is a duplicate
-                current['text_similarity'] = text_similarity
-                current['image_similarity'] = image_similarity
-                current['duplicate_of'] = representative['name']
-                
-                group['duplicates'].append(current)
-                duplicates.append(current)
-                is_duplicate = True
-                print(f"    → DUPLICATE (both text and image similar)")
+            if finishing:
                 break
-        
-        if not is_duplicate:
-            # This is unique, create new group
-            unique_groups.append({
-                'representative': current,
-                'duplicates': []
-            })
-            print(f"    → UNIQUE")
+            stop_requested.wait(poll_interval)
+    finally:
+        if owns_executor:
+            executor.shutdown()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
     
-    return {
-        'total_screenshots': len(screenshot_data),
-        'unique_groups': len(unique_groups),
-        'total_duplicates': len(duplicates),
-        'groups': unique_groups,
-        'all_screenshots': screenshot_data,
-        'thresholds': {
-            'text_similarity': text_similarity_threshold,
-            'image_similarity': image_similarity_threshold
-        }
-    }
+    if not seen:
+        print(f"No PNG files arrived in {directory}")
+        return {}
+    
+    log(f"✅ Capture finished: classified {len(seen)} screenshots")
+    return grouper.analysis()
 
-def cleanup_screenshots(directory: str, text_similarity_threshold: float = 0.8,
+# JSONL report written by stream_screenshots, one line per decision
+STREAM_REPORT = "cleanup_report.jsonl"
+
+def write_jsonl(report, entry: Dict) -> None:
+    """Append one JSON line and flush it, so it survives if the run dies."""
+    report.write(json.dumps(entry) + "\n")
+    report.flush()
+
+def stream_screenshots(directory: str, text_similarity_threshold: float = 0.8,
                        image_similarity_threshold: float = 0.95,
-                       dry_run: bool = True, backup: bool = True) -> None:
+                       hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                       resize_to: int = 64, workers: Optional[int] = None,
+                       cache: Optional[FeatureCache] = None, text_lsh: bool = False,
+                       lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                       executor: Optional[ProcessPoolExecutor] = None,
+                       instrumentation: Optional[Instrumentation] = None,
+                       report_path: Optional[str] = None, execute: bool = False,
+                       backup: bool = True, ocr_profile: Optional[str] = None,
+                       window: Optional[int] = None, blank_filter: bool = False,
+                       stop_event: Optional[threading.Event] = None) -> Dict:
     """
-    Clean up screenshots by removing duplicates based on BOTH text and image similarity.
+    Classify the screenshots of a directory in one pass with bounded memory.
+    
+    Files flow through iter_cached_features one at a time and are classified
+    by a grouper that keeps only compact representative records. Every
+    decision is appended to a JSONL report as soon as it is made: a "start"
+    line, one "screenshot" line per file (record, decision and action) and a
+    final "summary" line with the analysis counters. A run that dies leaves a
+    report of everything decided so far. With execute, each duplicate is
+    removed right after its decision; duplicates never become
+    representatives, so no later screenshot is compared against them.
     
     Args:
-        directory: Directory containing screenshots
-        text_similarity_threshold: Threshold for text similarity
-        image_similarity_threshold: Threshold for image similarity
-        dry_run: If True, only show what would be deleted
-        backup: If True, move duplicates to backup folder instead of deleting
+        report_path: JSONL report to write (default: <directory>/cleanup_report.jsonl)
+        execute: Remove duplicates while streaming; otherwise only report them
+        backup: If True, move duplicates to duplicates_backup/ instead of deleting
+        stop_event: Stops the pass when set; no further file is removed and
+            the summary is marked 'cancelled'
+        (other arguments as for analyze_screenshots)
+    
+    Returns:
+        Dictionary with analysis results as returned by analyze_screenshots,
+        without 'groups'/'all_screenshots' contents, plus 'report' (its path),
+        'removed' (duplicates removed) and 'cancelled'
     """
-    analysis = analyze_screenshots(directory, text_similarity_threshold, image_similarity_threshold)
+    screenshot_dir = Path(directory)
+    if not screenshot_dir.exists():
+        print(f"Directory {directory} does not exist!")
+        return {}
     
-    if not analysis:
-        return
+    png_files = sorted(screenshot_dir.glob("*.png"))
+    if not png_files:
+        print(f"No PNG files found in {directory}")
+        return {}
+    
+    log(f"Streaming {len(png_files)} screenshots...")
+    if workers is None:
+        workers = default_worker_count()
+    instrumentation = instrumentation or Instrumentation()
+    grouper = ScreenshotGrouper(text_similarity_threshold, image_similarity_threshold,
+                                hash_radius=hash_radius, resize_to=resize_to, text_lsh=text_lsh,
+                                instrumentation=instrumentation, keep_records=False, window=window)
+    report_path = Path(report_path) if report_path else screenshot_dir / STREAM_REPORT
+    backup_dir = None
+    if execute and backup:
+        backup_dir = screenshot_dir / "duplicates_backup"
+        backup_dir.mkdir(exist_ok=True)
+        log(f"📁 Backup directory: {backup_dir}")
+    removed = 0
+    cancelled = False
+    
+    extracted = iter_cached_features(png_files, workers=workers, resize_to=resize_to, cache=cache,
+                                     executor=executor, lang=lang, ocr_backend=ocr_backend,
+                                     instrumentation=instrumentation, ocr_profile=ocr_profile,
+                                     blank_filter=blank_filter)
+    with open(report_path, 'w') as report:
+        write_jsonl(report, {'type': 'start', 'directory': str(directory), 'files': len(png_files),
+                             'execute': execute, 'ocr_profile': ocr_profile, 'window': window,
+                             'blank_filter': blank_filter,
+                             'started': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        for i, (png_file, content_hash, result) in enumerate(extracted):
+            if stop_event is not None and stop_event.is_set():
+                cancelled = True
+                break
+            log(f"Analyzing {i+1}/{len(png_files)}: {png_file.name}", VERBOSE)
+            current = make_screenshot_record(png_file, content_hash, result)
+            with instrumentation.stage('grouping'):
+                decision = grouper.add(current, result['features'])
+            action = None
+            if execute and decision['status'] == 'duplicate':
+                with instrumentation.stage('file_moves'):
+                    action = remove_duplicate(png_file, backup_dir)
+                removed += 1
+            write_jsonl(report, {'type': 'screenshot', **current, **decision, 'action': action})
+        
+        if execute:
+            instrumentation.count('files_moved' if backup else 'files_deleted', removed)
+        analysis = grouper.analysis()
+        summary = {key: value for key, value in analysis.items() if key not in ('groups', 'all_screenshots')}
+        write_jsonl(report, {'type': 'summary', **summary, 'removed': removed, 'cancelled': cancelled})
+    
+    analysis['report'] = str(report_path)
+    analysis['removed'] = removed
+    analysis['cancelled'] = cancelled
+    return analysis
+
+def hash_files(paths: List[Path], threads: int = 8) -> List[str]:
+    """Content hashes of many files, read in a thread pool (hashing releases the GIL)."""
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        return list(pool.map(lambda path: file_content_hash(str(path)), paths))
+
+def analyze_directories(directories: List[str], text_similarity_threshold: float = 0.8,
+                        image_similarity_threshold: float = 0.95,
+                        hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                        resize_to: int = 64, workers: Optional[int] = None,
+                        cache: Optional[FeatureCache] = None, text_lsh: bool = False,
+                        lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                        executor: Optional[ProcessPoolExecutor] = None,
+                        instrumentation: Optional[Instrumentation] = None,
+                        ocr_profile: Optional[str] = None, window: Optional[int] = None,
+                        cross_task: bool = False, blank_filter: bool = False) -> Dict:
+    """
+    Analyze several directories with one shared extraction stream.
+    
+    The files of all directories are hashed up front and fed, as one list,
+    through a single worker pool, so work is balanced by file count
+    instead of by directory. Small folders no longer leave cores idle
+    while a big one finishes. Byte-identical files are extracted (and OCRed)
+    once however many directories contain them. Each directory is still
+    grouped on its own, exactly as analyze_screenshots would group it.
+    
+    With cross_task, all screenshots are also classified by one extra
+    grouper, and every group that spans several directories is reported as
+    a shared screen (intro, instructions, fullscreen prompt, ...).
+    
+    Args:
+        directories: Directories containing screenshots
+        cross_task: Also report screens shared across directories
+        (other arguments as for analyze_screenshots)
+    
+    Returns:
+        Dictionary with 'directories' (directory -> analysis as returned by
+        analyze_screenshots), 'total_screenshots', 'extracted' (distinct
+        files decoded or read from the cache), 'shared_screens' (None
+        without cross_task) and 'instrumentation'
+    """
+    roots = []
+    for directory in directories:
+        png_files = sorted(Path(directory).glob("*.png")) if Path(directory).is_dir() else []
+        if png_files:
+            roots.append((directory, png_files))
+        else:
+            print(f"⚠️  Skipping {directory}: no PNG files found")
+    if not roots:
+        return {}
+    
+    if workers is None:
+        workers = default_worker_count()
+    instrumentation = instrumentation or Instrumentation()
+    files = [(directory, png_file) for directory, png_files in roots for png_file in png_files]
+    with instrumentation.stage('hash'):
+        content_hashes = hash_files([png_file for _, png_file in files], threads=max(4, workers))
     
+    # Extract each distinct file once, in order of first appearance
+    first_paths = {}
+    for (_, png_file), content_hash in zip(files, content_hashes):
+        first_paths.setdefault(content_hash, png_file)
+    remaining = {}  # content hash -> files still to classify
+    for content_hash in content_hashes:
+        remaining[content_hash] = remaining.get(content_hash, 0) + 1
+    log(f"Found {len(files)} screenshots in {len(roots)} directories "
+        f"({len(files) - len(first_paths)} identical copies are extracted only once)")
+    extracted = iter_cached_features(list(first_paths.values()), workers=workers, resize_to=resize_to,
+                                     cache=cache, executor=executor, lang=lang, ocr_backend=ocr_backend,
+                                     instrumentation=instrumentation, ocr_profile=ocr_profile,
+                                     content_hashes=list(first_paths), blank_filter=blank_filter)
+    
+    grouper_options = dict(hash_radius=hash_radius, resize_to=resize_to, text_lsh=text_lsh, window=window)
+    groupers = {directory: ScreenshotGrouper(text_similarity_threshold, image_similarity_threshold,
+                                             instrumentation=Instrumentation(), **grouper_options)
+                for directory, _ in roots}
+    shared = None
+    members = {}  # shared group id -> [(directory, name)]
+    if cross_task:
+        shared = ScreenshotGrouper(text_similarity_threshold, image_similarity_threshold,
+                                   instrumentation=instrumentation, keep_records=False, **grouper_options)
+    held = {}  # Results of files with identical copies still to come
+    
+    for i, ((directory, png_file), content_hash) in enumerate(zip(files, content_hashes)):
+        if content_hash in held:
+            result = held[content_hash]
+            instrumentation.count('identical_files')
+        else:
+            _, _, result = next(extracted)
+        remaining[content_hash] -= 1
+        if remaining[content_hash]:
+            held[content_hash] = result
+        else:
+            held.pop(content_hash, None)
+        
+        log(f"Analyzing {i+1}/{len(files)}: {Path(directory).name}/{png_file.name}", VERBOSE)
+        record = make_screenshot_record(png_file, content_hash, result)
+        with instrumentation.stage('grouping'):
+            if shared is not None and not record['bucket']:  # Blank frames are not shared screens
+                decision = shared.add(dict(record), result['features'])
+                members.setdefault(decision['group'], []).append((str(directory), png_file.name))
+            groupers[directory].add(record, result['features'])
+    
+    shared_screens = None
+    if shared is not None:
+        shared_screens = []
+        for group_id, entries in members.items():
+            spanned = sorted({directory for directory, _ in entries})
+            if len(spanned) > 1:
+                shared_screens.append({
+                    'representative': f"{entries[0][0]}/{entries[0][1]}",
+                    'text': shared.group_records[group_id].text,
+                    'directories': spanned,
+                    'files': [f"{directory}/{name}" for directory, name in entries]
+                })
+        shared_screens.sort(key=lambda screen: (-len(screen['directories']), -len(screen['files'])))
+    
+    return {
+        'directories': {directory: grouper.analysis() for directory, grouper in groupers.items()},
+        'total_screenshots': len(files),
+        'extracted': len(first_paths),
+        'shared_screens': shared_screens,
+        'instrumentation': instrumentation.summary()
+    }
+
+def print_shared_screens(shared_screens: List[Dict], limit: int = 10) -> None:
+    """Print the screens found in more than one directory."""
+    print(f"\n🔗 Screens shared across directories: {len(shared_screens)}")
+    for screen in shared_screens[:limit]:
+        text_preview = screen['text'][:60] + "..." if len(screen['text']) > 60 else screen['text']
+        print(f"   {screen['representative']}: {len(screen['files'])} files in "
+              f"{len(screen['directories'])} directories")
+        print(f"             Text: '{text_preview}'")
+    if len(shared_screens) > limit:
+        print(f"   ... and {len(shared_screens) - limit} more")
+
+def print_analysis(analysis: Dict) -> None:
+    """Print the summary and the per-group breakdown of an analysis."""
     print(f"\n📊 Analysis Results:")
     print(f"   Total screenshots: {analysis['total_screenshots']}")
     print(f"   Unique groups: {analysis['unique_groups']}")
     print(f"   Duplicates to remove: {analysis['total_duplicates']}")
     print(f"   Retention rate: {analysis['unique_groups']}/{analysis['total_screenshots']} ({100*analysis['unique_groups']/analysis['total_screenshots']:.1f}%)")
     print(f"   Thresholds: text≥{analysis['thresholds']['text_similarity']:.2f}, image≥{analysis['thresholds']['image_similarity']:.2f}")
+    print(f"   Pairwise comparisons: {analysis['comparisons']}")
+    cascade = analysis['cascade']
+    print(f"   Decided by: identical file/pixels {cascade['exact_match']}, "
+          f"image reject {cascade['rejected_by_image']}, identical text {cascade['matched_by_text_hash']}, "
+          f"text compare {cascade['matched_by_text_compare'] + cascade['rejected_by_text']}, "
+          f"blank frame {cascade['blank_frame']}")
+    if analysis.get('blank_frames'):
+        print(f"   Blank/transition frames (not OCRed): " +
+              ", ".join(f"{bucket} {count}" for bucket, count in sorted(analysis['blank_frames'].items())))
+    window = analysis.get('window')
+    if window:
+        print(f"   Window of {window['size']}: {window['window_matches']} matched in the window, "
+              f"{window['fallback_searches']} fell back to all groups "
+              f"({window['fallback_matches']} matched there)")
+    prefilter = analysis['text_prefilter']
+    print(f"   Exact text comparisons: {prefilter['exact_comparisons']} "
+          f"(saved: length {prefilter['pruned_by_length']}, quick_ratio {prefilter['pruned_by_quick_ratio']}, "
+          f"LSH {prefilter['pruned_by_lsh']})")
+    if analysis['errors']:
+        print(f"   ⚠️  Files with errors: {len(analysis['errors'])}")
+        for error in analysis['errors'][:5]:
+            print(f"      - {error['name']}: {error['error']}")
+        if len(analysis['errors']) > 5:
+            print(f"      ... and {len(analysis['errors'])-5} more")
+    print_instrumentation(analysis.get('instrumentation'))
+    
+    if VERBOSITY < NORMAL or not analysis['groups']:
+        return  # Streamed analyses keep no group breakdown
     
     # Show detailed analysis
     print(f"\n📋 Unique Groups:")
@@ -272,34 +1593,68 @@ def cleanup_screenshots(directory: str, text_similarity_threshold: float = 0.8,
             if len(group['duplicates']) > 3:
                 print(f"               ... and {len(group['duplicates'])-3} more")
         print()
-    
-    if dry_run:
-        print("🔍 DRY RUN - No files will be modified")
-        print("   Use --execute to actually perform cleanup")
+
+def print_instrumentation(summary: Optional[Dict]) -> None:
+    """Print stage timings and OCR latency from an Instrumentation summary."""
+    if not summary:
         return
+    total = summary['total']
+    print(f"   ⏱️  Time: {total['wall']:.2f}s wall, {total['cpu']:.2f}s CPU in this process")
+    for name, stage in summary['stages'].items():
+        # decode/ocr are summed over worker processes; grouping includes the compare stages
+        print(f"      {name:<14} {stage['wall']:8.3f}s wall {stage['cpu']:8.3f}s CPU  ({stage['calls']} calls)")
+    latency = summary['ocr_latency']
+    if latency['files']:
+        print(f"   🔤 OCR: {latency['files']} files, mean {latency['mean_ms']:.0f}ms, max {latency['max_ms']:.0f}ms")
+
+def remove_duplicate(src_path: Path, backup_dir: Optional[Path] = None) -> str:
+    """Move a duplicate into backup_dir, or delete it if there is none; returns the action."""
+    if backup_dir is not None:
+        # Move to backup directory
+        src_path.rename(backup_dir / src_path.name)
+        log(f"   Moved: {src_path.name} → duplicates_backup/", VERBOSE)
+        return 'moved'
+    # Delete file
+    src_path.unlink()
+    log(f"   Deleted: {src_path.name}", VERBOSE)
+    return 'deleted'
+
+def apply_cleanup(directory: str, analysis: Dict, backup: bool = True,
+                  instrumentation: Optional[Instrumentation] = None,
+                  stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Move (or delete) every duplicate found by an analysis and save the report.
     
-    # Perform cleanup
+    Args:
+        directory: Directory the analysis was made for
+        analysis: Result of analyze_screenshots or watch_screenshots
+        backup: If True, move duplicates to duplicates_backup/ instead of deleting
+        instrumentation: The run's instrumentation; the file moves are timed
+            and its final summary replaces analysis['instrumentation']
+        stop_event: Stops removing files when set; the report is then not written
+    
+    Returns:
+        Number of duplicate files removed from the directory
+    """
+    stats = instrumentation or Instrumentation()
     backup_dir = None
     if backup:
         backup_dir = Path(directory) / "duplicates_backup"
         backup_dir.mkdir(exist_ok=True)
-        print(f"📁 Backup directory: {backup_dir}")
+        log(f"📁 Backup directory: {backup_dir}")
     
     files_processed = 0
-    for group in analysis['groups']:
-        for duplicate in group['duplicates']:
-            files_processed += 1
-            src_path = Path(duplicate['path'])
-            
-            if backup:
-                # Move to backup directory
-                dst_path = backup_dir / src_path.name
-                src_path.rename(dst_path)
-                print(f"   Moved: {src_path.name} → duplicates_backup/")
-            else:
-                # Delete file
-                src_path.unlink()
-                print(f"   Deleted: {src_path.name}")
+    with stats.stage('file_moves'):
+        for group in analysis['groups']:
+            for duplicate in group['duplicates']:
+                if stop_event is not None and stop_event.is_set():
+                    print(f"🛑 Cleanup stopped after {files_processed} duplicates")
+                    return files_processed
+                files_processed += 1
+                remove_duplicate(Path(duplicate['path']), backup_dir)
+    stats.count('files_moved' if backup else 'files_deleted', files_processed)
+    if instrumentation is not None:
+        analysis['instrumentation'] = instrumentation.summary()
     
     print(f"\n✅ Cleanup complete!")
     print(f"   Processed: {files_processed} duplicates")
@@ -310,10 +1665,336 @@ def cleanup_screenshots(directory: str, text_similarity_threshold: float = 0.8,
     with open(report_path, 'w') as f:
         json.dump(analysis, f, indent=2)
     print(f"   Report saved: {report_path}")
+    return files_processed
+
+class CleanupEngine:
+    """
+    Reusable in-process screenshot cleanup.
+    
+    The engine owns the settings, the feature cache and a process pool that
+    is started on first use and kept alive until close(), so cleaning many
+    directories in one process pays for interpreter start-up, imports and
+    OCR engine initialisation only once. run() may be called from several
+    threads at once; they share the pool and the cache.
+    
+    Example:
+        with CleanupEngine(cache=FeatureCache()) as engine:
+            for directory in directories:
+                result = engine.run(directory, execute=True)
+                print(result['unique'], result['removed'])
+    """
+    
+    def __init__(self, text_similarity_threshold: float = 0.8,
+                 image_similarity_threshold: float = 0.95,
+                 hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                 resize_to: int = 64, workers: Optional[int] = None,
+                 cache: Optional[FeatureCache] = None, text_lsh: bool = False,
+                 lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                 ocr_profile: Optional[str] = None, window: Optional[int] = None,
+                 blank_filter: bool = False):
+        """
+        Args:
+            text_similarity_threshold: Threshold for text similarity
+            image_similarity_threshold: Threshold for image similarity
+            hash_radius: Hamming radius for candidate lookup (None compares against all groups)
+            resize_to: Thumbnail size used for image similarity
+            workers: Number of processes for OCR and feature extraction (None = one per core)
+            cache: Persistent feature cache; closed together with the engine
+            text_lsh: Skip text comparisons rejected by the approximate MinHash/LSH index
+            lang: Tesseract language (traineddata) used for OCR
+            ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+            ocr_profile: Default task OCR profile; run() can pick another per directory
+            window: Temporal window for sequential captures (see ScreenshotGrouper)
+            blank_filter: Group blank/transition frames without OCR (see classify_blank_frame)
+        """
+        get_profile(ocr_profile)  # Fail early on unknown names
+        self.text_similarity_threshold = text_similarity_threshold
+        self.image_similarity_threshold = image_similarity_threshold
+        self.hash_radius = hash_radius
+        self.resize_to = resize_to
+        self.workers = max(1, workers if workers is not None else default_worker_count())
+        self.cache = cache
+        self.text_lsh = text_lsh
+        self.lang = lang
+        self.ocr_backend = ocr_backend
+        self.ocr_profile = ocr_profile
+        self.window = window
+        self.blank_filter = blank_filter
+        self.executor = None
+        # Threads calling run() at once must not each start a pool
+        self.executor_lock = threading.Lock()
+        self.runs = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        """The shared process pool, started on first use."""
+        with self.executor_lock:
+            if self.executor is None and self.workers > 1:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor
+    
+    def iter_features(self, png_files: List[Path], ocr_profile: Optional[str] = None):
+        """Yield (png_file, content_hash, result) for files, using the engine's pool and cache."""
+        return iter_cached_features(png_files, workers=self.workers, resize_to=self.resize_to,
+                                    cache=self.cache, executor=self._executor(),
+                                    lang=self.lang, ocr_backend=self.ocr_backend,
+                                    ocr_profile=ocr_profile or self.ocr_profile,
+                                    blank_filter=self.blank_filter)
+    
+    def analyze(self, directory: str, watch: bool = False, sentinel: str = DEFAULT_SENTINEL,
+                poll_interval: float = 1.0, instrumentation: Optional[Instrumentation] = None,
+                ocr_profile: Optional[str] = None, stop_event: Optional[threading.Event] = None) -> Dict:
+        """Group the screenshots in a directory (see analyze_screenshots / watch_screenshots)."""
+        options = dict(hash_radius=self.hash_radius, resize_to=self.resize_to, workers=self.workers,
+                       cache=self.cache, text_lsh=self.text_lsh, lang=self.lang,
+                       ocr_backend=self.ocr_backend, executor=self._executor(),
+                       instrumentation=instrumentation, ocr_profile=ocr_profile or self.ocr_profile,
+                       window=self.window, blank_filter=self.blank_filter)
+        if watch:
+            return watch_screenshots(directory, self.text_similarity_threshold,
+                                     self.image_similarity_threshold, sentinel=sentinel,
+                                     poll_interval=poll_interval, stop_event=stop_event, **options)
+        return analyze_screenshots(directory, self.text_similarity_threshold,
+                                   self.image_similarity_threshold, stop_event=stop_event, **options)
+    
+    def stream(self, directory: str, execute: bool = False, backup: bool = True,
+               instrumentation: Optional[Instrumentation] = None, ocr_profile: Optional[str] = None,
+               stop_event: Optional[threading.Event] = None) -> Dict:
+        """Classify a directory in one bounded-memory pass (see stream_screenshots)."""
+        return stream_screenshots(directory, self.text_similarity_threshold, self.image_similarity_threshold,
+                                  hash_radius=self.hash_radius, resize_to=self.resize_to,
+                                  workers=self.workers, cache=self.cache, text_lsh=self.text_lsh,
+                                  lang=self.lang, ocr_backend=self.ocr_backend,
+                                  executor=self._executor(), instrumentation=instrumentation,
+                                  execute=execute, backup=backup,
+                                  ocr_profile=ocr_profile or self.ocr_profile, window=self.window,
+                                  blank_filter=self.blank_filter, stop_event=stop_event)
+    
+    def run(self, directory: str, execute: bool = False, backup: bool = True, watch: bool = False,
+            sentinel: str = DEFAULT_SENTINEL, poll_interval: float = 1.0, verbose: bool = True,
+            stream: bool = False, ocr_profile: Optional[str] = None,
+            stop_event: Optional[threading.Event] = None) -> Dict:
+        """
+        Analyze a directory and, if execute is set, remove its duplicates.
+        
+        Args:
+            directory: Directory containing screenshots
+            execute: Move/delete duplicates; otherwise this is a dry run
+            backup: If True, move duplicates to a backup folder instead of deleting
+            watch: Classify screenshots while the capture is still writing them
+            sentinel: File name that ends watch mode
+            poll_interval: Seconds between directory scans in watch mode
+            verbose: Print the analysis summary and group breakdown
+            stream: Classify in one bounded-memory pass, writing each decision to
+                cleanup_report.jsonl and removing duplicates as they are found
+            ocr_profile: Task OCR profile for this directory (default: the engine's)
+            stop_event: Ends watch mode when set (signals only reach the main
+                thread); otherwise cancels the run: the analysis is abandoned
+                and no further file is removed
+        
+        Returns:
+            Dictionary with status ('success', 'no_screenshots' or 'cancelled'), directory,
+            total, unique, duplicates, removed, errors, dry_run, report_path
+            and the full analysis
+        """
+        if stream and watch:
+            raise ValueError("stream and watch cannot be combined")
+        self.runs += 1
+        instrumentation = Instrumentation()
+        if stream:
+            analysis = self.stream(directory, execute=execute, backup=backup, instrumentation=instrumentation,
+                                   ocr_profile=ocr_profile, stop_event=stop_event)
+        else:
+            analysis = self.analyze(directory, watch=watch, sentinel=sentinel, poll_interval=poll_interval,
+                                    instrumentation=instrumentation, ocr_profile=ocr_profile,
+                                    stop_event=stop_event)
+        result = self._result(directory, analysis, execute)
+        # In watch mode the event only ends the watch; the cleanup still runs
+        cancel_event = None if watch else stop_event
+        if cancel_event is not None and cancel_event.is_set() and not stream:
+            result['status'] = 'cancelled'
+            print("🛑 Cleanup cancelled before any file was removed")
+            return result
+        if not analysis:
+            return result
+        
+        if verbose:
+            print_analysis(analysis)
+        
+        if stream:
+            result['removed'] = analysis['removed']
+            result['report_path'] = analysis['report']
+            print(f"   Report saved: {analysis['report']}")
+            if analysis['cancelled']:
+                result['status'] = 'cancelled'
+                print(f"🛑 Cleanup cancelled after removing {result['removed']} duplicates")
+                return result
+        
+        if not execute:
+            print("🔍 DRY RUN - No files will be modified")
+            print("   Use --execute to actually perform cleanup")
+            return result
+        if stream:
+            print(f"\n✅ Cleanup complete! Removed {result['removed']} duplicates while streaming")
+            return result
+        
+        result['removed'] = apply_cleanup(directory, analysis, backup=backup, instrumentation=instrumentation,
+                                          stop_event=cancel_event)
+        if result['removed'] < analysis['total_duplicates']:
+            result['status'] = 'cancelled'
+            return result
+        result['report_path'] = str(Path(directory) / "cleanup_report.json")
+        return result
+    
+    @staticmethod
+    def _result(directory: str, analysis: Dict, execute: bool) -> Dict:
+        return {
+            'status': 'success' if analysis else 'no_screenshots',
+            'directory': str(directory),
+            'total': analysis.get('total_screenshots', 0),
+            'unique': analysis.get('unique_groups', 0),
+            'duplicates': analysis.get('total_duplicates', 0),
+            'removed': 0,
+            'errors': len(analysis.get('errors', [])),
+            'dry_run': not execute,
+            'report_path': None,
+            'analysis': analysis
+        }
+    
+    def run_many(self, directories: List[str], execute: bool = False, backup: bool = True,
+                 verbose: bool = True, cross_task: bool = False,
+                 shared_report: Optional[str] = None, ocr_profile: Optional[str] = None) -> Dict:
+        """
+        Analyze several directories through the shared pool and clean each of them.
+        
+        Args:
+            directories: Directories containing screenshots
+            execute: Move/delete duplicates; otherwise this is a dry run
+            backup: If True, move duplicates to a backup folder instead of deleting
+            verbose: Print every directory's analysis summary
+            cross_task: Report screens shared across directories (see analyze_directories)
+            shared_report: JSON file to write the shared screens to
+            ocr_profile: Task OCR profile for all directories (default: the engine's)
+        
+        Returns:
+            Dictionary with status, 'directories' (directory -> result as
+            returned by run), total, unique, removed, extracted,
+            shared_screens and instrumentation
+        """
+        self.runs += 1
+        instrumentation = Instrumentation()
+        batch = analyze_directories(directories, self.text_similarity_threshold,
+                                    self.image_similarity_threshold, hash_radius=self.hash_radius,
+                                    resize_to=self.resize_to, workers=self.workers, cache=self.cache,
+                                    text_lsh=self.text_lsh, lang=self.lang, ocr_backend=self.ocr_backend,
+                                    executor=self._executor(), instrumentation=instrumentation,
+                                    ocr_profile=ocr_profile or self.ocr_profile, window=self.window,
+                                    cross_task=cross_task, blank_filter=self.blank_filter)
+        summary = {'status': 'success' if batch else 'no_screenshots', 'directories': {},
+                   'total': batch.get('total_screenshots', 0), 'unique': 0, 'removed': 0,
+                   'extracted': batch.get('extracted', 0), 'shared_screens': batch.get('shared_screens'),
+                   'instrumentation': batch.get('instrumentation')}
+        if not batch:
+            return summary
+        
+        for directory, analysis in batch['directories'].items():
+            result = self._result(directory, analysis, execute)
+            if verbose:
+                print(f"\n📁 {directory}")
+                print_analysis(analysis)
+            if execute:
+                result['removed'] = apply_cleanup(directory, analysis, backup=backup)
+                result['report_path'] = str(Path(directory) / "cleanup_report.json")
+            summary['directories'][str(directory)] = result
+            summary['unique'] += result['unique']
+            summary['removed'] += result['removed']
+        
+        print(f"\n📦 {len(summary['directories'])} directories: {summary['unique']} unique of "
+              f"{summary['total']} screenshots, {summary['total'] - summary['extracted']} identical "
+              f"copies extracted once")
+        print_instrumentation(summary['instrumentation'])
+        if summary['shared_screens'] is not None:
+            print_shared_screens(summary['shared_screens'])
+            if shared_report:
+                with open(shared_report, 'w') as f:
+                    json.dump(summary['shared_screens'], f, indent=2)
+                print(f"   Shared screens saved: {shared_report}")
+        if not execute:
+            print("🔍 DRY RUN - No files will be modified")
+            print("   Use --execute to actually perform cleanup")
+        return summary
+    
+    def close(self) -> None:
+        """Stop the process pool and close the feature cache."""
+        with self.executor_lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+def cleanup_screenshots(directory: str, text_similarity_threshold: float = 0.8,
+                       image_similarity_threshold: float = 0.95,
+                       dry_run: bool = True, backup: bool = True,
+                       hash_radius: Optional[int] = DEFAULT_HASH_RADIUS,
+                       workers: Optional[int] = None,
+                       cache: Optional[FeatureCache] = None,
+                       text_lsh: bool = False, watch: bool = False,
+                       sentinel: str = DEFAULT_SENTINEL, poll_interval: float = 1.0,
+                       lang: str = OCR_LANG, ocr_backend: str = 'auto',
+                       stream: bool = False, ocr_profile: Optional[str] = None,
+                       window: Optional[int] = None, blank_filter: bool = False) -> Dict:
+    """
+    Clean up screenshots by removing duplicates based on BOTH text and image similarity.
+    
+    One-shot wrapper around CleanupEngine; use the engine directly to clean
+    several directories with a warm worker pool.
+    
+    Args:
+        directory: Directory containing screenshots
+        text_similarity_threshold: Threshold for text similarity
+        image_similarity_threshold: Threshold for image similarity
+        dry_run: If True, only show what would be deleted
+        backup: If True, move duplicates to backup folder instead of deleting
+        hash_radius: Hamming radius for candidate lookup (None compares against all groups)
+        workers: Number of processes for OCR and feature extraction (None = one per core)
+        cache: Persistent feature cache shared across runs (None disables caching)
+        text_lsh: Skip text comparisons rejected by the approximate MinHash/LSH index
+        watch: Classify screenshots while the capture is still writing them (see watch_screenshots)
+        sentinel: File name that ends watch mode
+        poll_interval: Seconds between directory scans in watch mode
+        lang: Tesseract language (traineddata) used for OCR
+        ocr_backend: Name of the OCR backend (see ocr_backends.BACKEND_NAMES)
+        stream: Bounded-memory pass with a JSONL report (see stream_screenshots)
+        ocr_profile: Task whose OCR profile replaces the top-half crop
+        window: Compare with the last window representatives first (see ScreenshotGrouper)
+        blank_filter: Group blank/transition frames without OCR (see classify_blank_frame)
+    
+    Returns:
+        Result dictionary as returned by CleanupEngine.run
+    """
+    engine = CleanupEngine(text_similarity_threshold, image_similarity_threshold,
+                           hash_radius=hash_radius, workers=workers, cache=cache,
+                           text_lsh=text_lsh, lang=lang, ocr_backend=ocr_backend, ocr_profile=ocr_profile,
+                           window=window, blank_filter=blank_filter)
+    try:
+        return engine.run(directory, execute=not dry_run, backup=backup, watch=watch,
+                          sentinel=sentinel, poll_interval=poll_interval, stream=stream)
+    finally:
+        engine.cache = None  # Owned by the caller
+        engine.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Clean up screenshots using OCR text similarity AND image similarity")
-    parser.add_argument("directory", help="Directory containing screenshots")
+    parser.add_argument("directories", nargs="+", metavar="directory",
+                       help="Directory containing screenshots; with several (e.g. golden-runs/*) all "
+                            "files share one worker pool and each directory is cleaned on its own")
     parser.add_argument("--text-similarity", type=float, default=0.8, 
                        help="Text similarity threshold (0.0-1.0, default: 0.8)")
     parser.add_argument("--image-similarity", type=float, default=0.95, 
@@ -322,31 +2003,138 @@ def main():
                        help="Actually perform cleanup (default is dry run)")
     parser.add_argument("--no-backup", action="store_true", 
                        help="Delete duplicates instead of moving to backup")
+    parser.add_argument("--hash-radius", type=int, default=None,
+                       help=f"Only compare with groups within this dHash Hamming distance, e.g. "
+                            f"{FAST_HASH_RADIUS}; faster on large directories but may miss duplicates "
+                            f"of flat screens (default: compare against every group)")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                       help="Processes used for OCR and feature extraction "
+                            "(default: number of CPU cores, 1 disables the pool)")
+    parser.add_argument("--ocr-backend", choices=BACKEND_NAMES, default="auto",
+                       help="OCR engine: tesserocr keeps traineddata loaded per worker, batch sends "
+                            "many crops to one tesseract run, pytesseract spawns one process per "
+                            "image (default: auto = tesserocr if installed, else pytesseract)")
+    parser.add_argument("--lang", default=OCR_LANG,
+                       help=f"Tesseract language(s), e.g. 'deu' or 'eng+spa' (default: {OCR_LANG})")
+    parser.add_argument("--task", choices=sorted(OCR_PROFILES), default=None,
+                       help="OCR the regions of this task's profile, downscaled and binarized, "
+                            "instead of the whole top half (default: top half, --psm 6)")
+    parser.add_argument("--text-lsh", action="store_true",
+                       help="Prune text comparisons with an approximate MinHash/LSH index "
+                            "(faster on long OCR text, may miss borderline duplicates)")
+    parser.add_argument("--window", type=int, default=None, metavar="K",
+                       help="Compare each screenshot with the previous one's group and the last K "
+                            "representatives first, searching all groups only when none match "
+                            "(near-linear for long sequential captures)")
+    parser.add_argument("--blank-filter", action="store_true",
+                       help="Group blank and black transition frames (one shade, no text or "
+                            "buttons) without OCR")
+    parser.add_argument("--watch", action="store_true",
+                       help="Classify screenshots as they are written, until the sentinel file "
+                            "appears or the process receives SIGINT/SIGTERM")
+    parser.add_argument("--sentinel", default=DEFAULT_SENTINEL,
+                       help=f"File name that ends --watch mode (default: {DEFAULT_SENTINEL})")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                       help="Seconds between directory scans in --watch mode (default: 1.0)")
+    parser.add_argument("--stream", action="store_true",
+                       help=f"Classify in one bounded-memory pass, appending each decision to "
+                            f"{STREAM_REPORT} as it is made (for very large directories)")
+    parser.add_argument("--cross-task", action="store_true",
+                       help="With several directories, report screens shared between them "
+                            "(intro, instructions, fullscreen prompts)")
+    parser.add_argument("--shared-report", default="shared_screens.json",
+                       help="Where --cross-task writes the shared screens (default: shared_screens.json)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Do not read or write the persistent OCR/feature cache")
+    parser.add_argument("--rebuild-cache", action="store_true",
+                       help="Ignore cached entries and refresh them with new results")
+    parser.add_argument("--cache-dir", default=None,
+                       help="Directory for the feature cache (default: ~/.cache/levante-screenshots)")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_CACHE_SIZE_MB,
+                       help=f"Maximum cache size before LRU eviction (default: {DEFAULT_CACHE_SIZE_MB})")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                       help="More output: -v prints a line per file, -vv also every pairwise comparison")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                       help="Only print the summary")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                       help="Write cProfile statistics of this process to FILE "
+                            "(use --workers 1 to include OCR and decoding)")
     parser.add_argument("--install-deps", action="store_true",
                        help="Install required dependencies")
     
     args = parser.parse_args()
+    if args.window is not None and args.window < 0:
+        parser.error("--window must be 0 or more")
+    if args.stream and args.watch:
+        parser.error("--stream cannot be combined with --watch")
+    multi = len(args.directories) > 1 or args.cross_task
+    if multi and (args.stream or args.watch):
+        parser.error("--stream and --watch take a single directory")
+    
+    global VERBOSITY
+    VERBOSITY = QUIET if args.quiet else NORMAL + args.verbose
     
     if args.install_deps:
         install_requirements()
         return
     
-    # Check if tesseract is available
-    try:
-        pytesseract.get_tesseract_version()
-    except Exception:
-        print("❌ Tesseract OCR not found!")
+    # Check if the OCR engine is available
+    if not get_backend(args.ocr_backend).available():
+        print(f"❌ Tesseract OCR not found (backend: {resolve_backend_name(args.ocr_backend)})!")
         print("   Install with: sudo apt-get install tesseract-ocr")
         print("   Or use --install-deps flag")
         sys.exit(1)
     
-    cleanup_screenshots(
-        directory=args.directory,
-        text_similarity_threshold=args.text_similarity,
-        image_similarity_threshold=args.image_similarity,
-        dry_run=not args.execute,
-        backup=not args.no_backup
-    )
+    cache = None
+    if not args.no_cache:
+        cache = FeatureCache(args.cache_dir, max_size_mb=args.cache_size_mb, rebuild=args.rebuild_cache)
+    
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    
+    if multi:
+        engine = CleanupEngine(args.text_similarity, args.image_similarity,
+                               hash_radius=args.hash_radius if args.hash_radius is not None and args.hash_radius >= 0 else None,
+                               workers=max(1, args.workers), cache=cache, text_lsh=args.text_lsh,
+                               lang=args.lang, ocr_backend=args.ocr_backend, ocr_profile=args.task,
+                               window=args.window, blank_filter=args.blank_filter)
+        try:
+            engine.run_many(args.directories, execute=args.execute, backup=not args.no_backup,
+                            cross_task=args.cross_task, shared_report=args.shared_report)
+        finally:
+            engine.cache = None  # Closed below
+            engine.close()
+    else:
+        cleanup_screenshots(
+            directory=args.directories[0],
+            text_similarity_threshold=args.text_similarity,
+            image_similarity_threshold=args.image_similarity,
+            dry_run=not args.execute,
+            backup=not args.no_backup,
+            hash_radius=args.hash_radius if args.hash_radius is not None and args.hash_radius >= 0 else None,
+            workers=max(1, args.workers),
+            cache=cache,
+            text_lsh=args.text_lsh,
+            watch=args.watch,
+            sentinel=args.sentinel,
+            poll_interval=args.poll_interval,
+            lang=args.lang,
+            ocr_backend=args.ocr_backend,
+            stream=args.stream,
+            ocr_profile=args.task,
+            window=args.window,
+            blank_filter=args.blank_filter
+        )
+    
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"\n🔬 Profile saved: {args.profile} (top functions by cumulative time)")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    
+    if cache:
+        cache.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache for screenshot OCR text and image features.
+
+Entries are keyed by the SHA-256 of the file contents plus a string describing
+the extraction parameters (OCR crop, psm config, language, thumbnail size), so
+renamed or moved screenshots still hit the cache and changing any OCR setting
+automatically misses. The cache is a single SQLite file with size-bounded LRU
+eviction.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE_MB = 256
+
+def default_cache_dir() -> Path:
+    """Per-user cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'levante-screenshots'
+
+def file_content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FeatureCache:
+    """
+    SQLite-backed cache of extract_screenshot_features results.
+
+    Only successful extractions are stored; failed ones are retried on the
+    next run. Least recently used entries are evicted once the stored
+    payload exceeds max_bytes. One instance may be shared between threads.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: int = DEFAULT_CACHE_SIZE_MB,
+                 rebuild: bool = False):
+        """
+        Args:
+            cache_dir: Directory holding features.sqlite (default: default_cache_dir())
+            max_size_mb: Upper bound for stored text and thumbnail bytes
+            rebuild: If True, ignore existing entries and overwrite them with fresh results
+        """
+        self.path = Path(cache_dir or default_cache_dir()) / 'features.sqlite'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS features (
+                content_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                text TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                uniform INTEGER NOT NULL,
+                mean REAL NOT NULL,
+                dhash TEXT NOT NULL,
+                pixel_hash TEXT NOT NULL DEFAULT '',
+                bucket TEXT NOT NULL DEFAULT '',
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (content_hash, params)
+            )
+        ''')
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(features)')}
+        if 'pixel_hash' not in columns:  # Cache written by an older version
+            self.conn.execute("ALTER TABLE features ADD COLUMN pixel_hash TEXT NOT NULL DEFAULT ''")
+        if 'bucket' not in columns:
+            self.conn.execute("ALTER TABLE features ADD COLUMN bucket TEXT NOT NULL DEFAULT ''")
+        self.conn.execute('CREATE INDEX IF NOT EXISTS features_last_used ON features (last_used)')
+        self.conn.commit()
+
+    def get_many(self, content_hashes: List[str], params: str) -> Dict[str, Dict]:
+        """
+        Look up cached results for several files at once.
+
+        Returns:
+            Mapping of content hash to a result dict shaped like
+            extract_screenshot_features output
+        """
+        found = {}
+        if self.rebuild:
+            self.misses += len(content_hashes)
+            return found
+
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        batch_size = 500  # Stay well below SQLite's bound-parameter limit
+        rows = []
+        with self.lock:
+            for start in range(0, len(unique_hashes), batch_size):
+                batch = unique_hashes[start:start + batch_size]
+                placeholders = ','.join('?' * len(batch))
+                rows.extend(self.conn.execute(
+                    f'SELECT content_hash, text, vector, uniform, mean, dhash, pixel_hash, bucket FROM features '
+                    f'WHERE params = ? AND content_hash IN ({placeholders})',
+                    [params, *batch]).fetchall())
+        for content_hash, text, vector, uniform, mean, dhash, pixel_hash, bucket in rows:
+            found[content_hash] = {
+                'text': text,
+                'features': {
+                    'vector': np.frombuffer(vector, dtype=np.float32).copy(),
+                    'uniform': bool(uniform),
+                    'mean': mean,
+                    'dhash': dhash,
+                    'pixel_hash': pixel_hash
+                },
+                'error': None,
+                'bucket': bucket or None
+            }
+
+        if found:
+            now = time.time()
+            with self.lock:
+                self.conn.executemany('UPDATE features SET last_used = ? WHERE content_hash = ? AND params = ?',
+                                      [(now, h, params) for h in found])
+                self.conn.commit()
+
+        self.hits += sum(1 for h in content_hashes if h in found)
+        self.misses += sum(1 for h in content_hashes if h not in found)
+        return found
+
+    def put_many(self, entries: Dict[str, Dict], params: str) -> None:
+        """Store successful extraction results keyed by content hash, then evict."""
+        now = time.time()
+        rows = []
+        for content_hash, result in entries.items():
+            features = result['features']
+            if result['error'] or features is None:
+                continue
+            vector = np.ascontiguousarray(features['vector'], dtype=np.float32).tobytes()
+            text = result['text']
+            rows.append((content_hash, params, text, vector, int(features['uniform']),
+                         float(features['mean']), features['dhash'], features.get('pixel_hash', ''),
+                         result.get('bucket') or '', len(vector) + len(text.encode()), now))
+        if not rows:
+            return
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO features (content_hash, params, text, vector, uniform, mean, dhash, '
+                'pixel_hash, bucket, size, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self.conn.commit()
+            self._evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self.lock:
+            return self._evict()
+    
+    def _evict(self) -> int:
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM features').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        cursor = self.conn.execute('SELECT content_hash, params, size FROM features ORDER BY last_used')
+        stale = []
+        for content_hash, params, size in cursor:
+            if total <= self.max_bytes:
+                break
+            stale.append((content_hash, params))
+            total -= size
+        self.conn.executemany('DELETE FROM features WHERE content_hash = ? AND params = ?', stale)
+        self.conn.commit()
+        return len(stale)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Golden-run index for fast visual regression checks.
+
+`build` extracts OCR text, a normalized thumbnail, a dHash and content
+hashes for every frame under golden-runs/<task>/ and stores them in an
+index directory:
+
+- vectors.npy: float32 matrix with one normalized thumbnail per row, opened
+  memory-mapped so comparing against it does not load the whole index
+- manifest.json: per-frame metadata (task, name, hashes, OCR text, row) and
+  the extraction settings the index was built with
+
+`compare` extracts the same features for a fresh capture, matches every
+screenshot to its nearest golden frame of the same task with one
+matrix-vector product per screenshot and reports unchanged, changed, new
+and missing screens per task.
+"""
+
+import os
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cleanup_screenshots_ocr import (CleanupEngine, ThumbnailMatrix, OCR_LANG, calculate_text_similarity,
+                                     default_worker_count, feature_cache_params)
+from feature_cache import FeatureCache, DEFAULT_CACHE_SIZE_MB
+from ocr_backends import BACKEND_NAMES
+from ocr_profiles import OCR_PROFILES, default_profile
+
+INDEX_VERSION = 3  # 3: OCR profiles are opt-in; the manifest lists the ones the index was built with
+DEFAULT_GOLDEN_ROOT = "golden-runs"
+DEFAULT_INDEX_DIR = "golden_index"
+VECTORS_FILE = "vectors.npy"
+MANIFEST_FILE = "manifest.json"
+
+def list_task_folders(root: str) -> Dict[str, List[Path]]:
+    """Map each task subfolder of root to its PNG files, sorted by name."""
+    tasks = {}
+    with os.scandir(root) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                pngs = sorted(Path(entry.path).glob("*.png"))
+                if pngs:
+                    tasks[entry.name] = pngs
+    return tasks
+
+def build_index(golden_root: str, index_dir: str, engine: CleanupEngine, all_profiles: bool = False) -> Dict:
+    """
+    Extract features for every golden frame and write the index.
+
+    Args:
+        golden_root: Directory with one subfolder of PNGs per task
+        index_dir: Directory receiving vectors.npy and manifest.json
+        engine: Cleanup engine providing the worker pool, cache and OCR settings
+        all_profiles: OCR every task with its profile, validated or not
+
+    Returns:
+        The manifest that was written
+    """
+    tasks = list_task_folders(golden_root)
+    if not tasks:
+        raise FileNotFoundError(f"No task folders with PNG files found in {golden_root}")
+
+    total = sum(len(pngs) for pngs in tasks.values())
+    print(f"📂 Indexing {total} golden frames from {len(tasks)} tasks...")
+    dimension = engine.resize_to * engine.resize_to
+    index_path = Path(index_dir)
+    index_path.mkdir(parents=True, exist_ok=True)
+
+    # Rows are written straight into the memory-mapped file, never held in RAM
+    tmp_vectors = index_path / (VECTORS_FILE + ".tmp")
+    vectors = np.lib.format.open_memmap(str(tmp_vectors), mode='w+', dtype=np.float32,
+                                        shape=(total, dimension))
+    frames = []
+    task_rows = {}
+    errors = []
+    row = 0
+    profiles = {task: default_profile(task, all_profiles) for task in tasks}
+    for task, pngs in tasks.items():
+        start = row
+        for png_file, content_hash, result in engine.iter_features(pngs, ocr_profile=profiles[task]):
+            features = result['features']
+            if features is None:
+                errors.append({'task': task, 'name': png_file.name, 'error': result['error']})
+                continue
+            vectors[row] = features['vector']
+            frames.append({
+                'task': task,
+                'name': png_file.name,
+                'row': row,
+                'content_hash': content_hash,
+                'pixel_hash': features.get('pixel_hash', ''),
+                'dhash': features['dhash'],
+                'uniform': bool(features['uniform']),
+                'mean': float(features['mean']),
+                'text': result['text']
+            })
+            row += 1
+        task_rows[task] = {'start': start, 'count': row - start}
+        print(f"   ✅ {task}: {row - start} frames")
+    vectors.flush()
+    del vectors
+
+    if row < total:
+        # Undecodable frames were skipped; shrink the file to the rows written
+        kept = np.load(str(tmp_vectors), mmap_mode='r')[:row].copy()
+        # Through a file handle: np.save would append .npy to the .tmp path
+        with open(tmp_vectors, 'wb') as f:
+            np.save(f, kept)
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'golden_root': str(golden_root),
+        'params': feature_cache_params(resize_to=engine.resize_to, lang=engine.lang,
+                                       ocr_backend=engine.ocr_backend),
+        'resize_to': engine.resize_to,
+        'lang': engine.lang,
+        'ocr_backend': engine.ocr_backend,
+        'ocr_profiles': {task: OCR_PROFILES[profile].key() for task, profile in profiles.items() if profile},
+        'tasks': task_rows,
+        'frames': frames,
+        'errors': errors
+    }
+    # Replace the old index only once the new one is complete
+    tmp_manifest = index_path / (MANIFEST_FILE + ".tmp")
+    with open(tmp_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_vectors, index_path / VECTORS_FILE)
+    os.replace(tmp_manifest, index_path / MANIFEST_FILE)
+    return manifest
+
+class GoldenIndex:
+    """Read-only view of an index written by build_index."""
+
+    def __init__(self, index_dir: str):
+        index_path = Path(index_dir)
+        with open(index_path / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported golden index version {self.manifest.get('version')} "
+                             f"in {index_dir}; rebuild it with 'golden_index.py build'")
+        self.frames = self.manifest['frames']
+        self.vectors = np.load(str(index_path / VECTORS_FILE), mmap_mode='r')
+        self.matrices = {}
+
+    @property
+    def tasks(self) -> List[str]:
+        return list(self.manifest['tasks'])
+
+    def task_profile(self, task: str) -> Optional[str]:
+        """OCR profile the frames of a task were indexed with, if any."""
+        return task if task in self.manifest['ocr_profiles'] and task in OCR_PROFILES else None
+
+    def task_frames(self, task: str) -> List[Dict]:
+        rows = self.manifest['tasks'][task]
+        return self.frames[rows['start']:rows['start'] + rows['count']]
+
+    def matrix(self, task: str) -> ThumbnailMatrix:
+        """Thumbnail matrix over the (memory-mapped) rows of one task."""
+        if task not in self.matrices:
+            rows = self.manifest['tasks'][task]
+            frames = self.task_frames(task)
+            self.matrices[task] = ThumbnailMatrix.from_arrays(
+                self.vectors[rows['start']:rows['start'] + rows['count']],
+                np.array([f['uniform'] for f in frames], dtype=bool),
+                np.array([f['mean'] for f in frames], dtype=np.float32))
+        return self.matrices[task]
+
+def compare_task(index: GoldenIndex, task: str, png_files: List[Path], engine: CleanupEngine,
+                 text_similarity_threshold: float = 0.8, image_similarity_threshold: float = 0.95,
+                 change_threshold: float = 0.7, top_k: int = 3) -> Dict:
+    """
+    Match a fresh capture of one task against its golden frames.
+
+    Each screenshot is scored against all golden frames of the task at once;
+    the top_k closest by image are then compared by OCR text. A screenshot is
+    'unchanged' if its best golden frame passes both cleanup thresholds,
+    'changed' if that frame is still at least change_threshold similar in
+    image (same screen, different content), and 'new' otherwise. Text alone
+    is not enough to pair screens since short labels recur across a task. Golden frames
+    that no screenshot was matched to are 'missing'.
+
+    Returns:
+        Dictionary with the per-screenshot matches and the missing frames
+    """
+    golden = index.task_frames(task)
+    matrix = index.matrix(task)
+    exact = {}
+    for i, frame in enumerate(golden):
+        exact.setdefault(frame['content_hash'], i)
+        if frame['pixel_hash']:
+            exact.setdefault(frame['pixel_hash'], i)
+
+    matched_rows = set()
+    screens = []
+    for png_file, content_hash, result in engine.iter_features(png_files, ocr_profile=index.task_profile(task)):
+        features = result['features']
+        entry = {'name': png_file.name, 'status': 'new', 'golden': None,
+                 'text_similarity': 0.0, 'image_similarity': 0.0}
+        if features is None:
+            entry.update(status='error', error=result['error'])
+            screens.append(entry)
+            continue
+
+        row = exact.get(content_hash, exact.get(features.get('pixel_hash') or None))
+        if row is not None:
+            entry.update(status='unchanged', golden=golden[row]['name'],
+                         text_similarity=1.0, image_similarity=1.0)
+        elif golden:
+            scores = matrix.similarities(features['vector'], features['uniform'], features['mean'])
+            best = None
+            for candidate in np.argsort(-scores)[:top_k]:
+                image_similarity = float(scores[candidate])
+                text_similarity = calculate_text_similarity(result['text'], golden[candidate]['text'])
+                rank = (image_similarity >= image_similarity_threshold and
+                        text_similarity >= text_similarity_threshold, image_similarity + text_similarity)
+                if best is None or rank > best[0]:
+                    best = (rank, int(candidate), text_similarity, image_similarity)
+            (passes, _), row, text_similarity, image_similarity = best
+            if passes:
+                status = 'unchanged'
+            elif image_similarity >= change_threshold:
+                status = 'changed'
+            else:
+                status = 'new'
+            if status != 'new':
+                entry.update(golden=golden[row]['name'])
+            else:
+                row = None
+            entry.update(status=status, text_similarity=round(text_similarity, 3),
+                         image_similarity=round(image_similarity, 3))
+            if status == 'changed':
+                entry.update(text=result['text'], golden_text=golden[row]['text'])
+        if row is not None:
+            matched_rows.add(row)
+        screens.append(entry)
+
+    missing = [frame['name'] for i, frame in enumerate(golden) if i not in matched_rows]
+    counts = {status: sum(1 for s in screens if s['status'] == status)
+              for status in ('unchanged', 'changed', 'new', 'error')}
+    counts['missing'] = len(missing)
+    return {'task': task, 'golden_frames': len(golden), 'screenshots': len(screens),
+            'counts': counts, 'screens': screens, 'missing': missing}
+
+def compare_capture(index: GoldenIndex, capture_root: str, engine: CleanupEngine,
+                    tasks: Optional[List[str]] = None, **thresholds) -> Dict:
+    """Compare every task folder of a capture that also exists in the index."""
+    captured = list_task_folders(capture_root)
+    selected = tasks or [task for task in index.tasks if task in captured]
+    report = {'index': index.manifest['golden_root'], 'capture': str(capture_root), 'tasks': {}}
+    for task in selected:
+        if task not in index.manifest['tasks']:
+            print(f"⚠️  {task} is not in the golden index")
+            continue
+        indexed_key = index.manifest['ocr_profiles'].get(task)
+        if indexed_key and indexed_key != (OCR_PROFILES[task].key() if task in OCR_PROFILES else None):
+            print(f"⚠️  The OCR profile of {task} changed since the index was built; "
+                  f"text scores may be off until it is rebuilt")
+        report['tasks'][task] = compare_task(index, task, captured.get(task, []), engine, **thresholds)
+    report['not_in_index'] = sorted(set(captured) - set(index.manifest['tasks']))
+    return report
+
+def print_report(report: Dict, limit: int = 5) -> None:
+    """Print per-task counts and the first few differences of each kind."""
+    print(f"\n📊 Golden comparison: {report['capture']} vs {report['index']}")
+    for task, result in report['tasks'].items():
+        counts = result['counts']
+        flag = "✅" if not (counts['changed'] or counts['new'] or counts['missing'] or counts['error']) else "⚠️ "
+        print(f"{flag} {task}: {counts['unchanged']} unchanged, {counts['changed']} changed, "
+              f"{counts['new']} new, {counts['missing']} missing"
+              + (f", {counts['error']} errors" if counts['error'] else ""))
+        for status in ('changed', 'new'):
+            screens = [s for s in result['screens'] if s['status'] == status]
+            for screen in screens[:limit]:
+                target = f" ~ {screen['golden']}" if screen['golden'] else ""
+                print(f"      {status}: {screen['name']}{target} "
+                      f"(text: {screen['text_similarity']:.2f}, image: {screen['image_similarity']:.2f})")
+            if len(screens) > limit:
+                print(f"      ... and {len(screens) - limit} more {status}")
+        for name in result['missing'][:limit]:
+            print(f"      missing: {name}")
+        if len(result['missing']) > limit:
+            print(f"      ... and {len(result['missing']) - limit} more missing")
+    if report['not_in_index']:
+        print(f"ℹ️  Captured tasks without golden frames: {', '.join(report['not_in_index'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a golden-run feature index and diff new captures against it")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR,
+                        help=f"Directory holding the index (default: {DEFAULT_INDEX_DIR})")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="Processes used for OCR and feature extraction (default: number of CPU cores)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the persistent OCR/feature cache")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directory for the feature cache (default: ~/.cache/levante-screenshots)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Index every frame under the golden-runs folder")
+    build.add_argument("golden_root", nargs="?", default=DEFAULT_GOLDEN_ROOT,
+                       help=f"Folder with one subfolder per task (default: {DEFAULT_GOLDEN_ROOT})")
+    build.add_argument("--lang", default=OCR_LANG, help=f"Tesseract language(s) (default: {OCR_LANG})")
+    build.add_argument("--ocr-backend", choices=BACKEND_NAMES, default="auto",
+                       help="OCR backend; compare reuses the one the index was built with (default: auto)")
+    build.add_argument("--ocr-profiles", action="store_true",
+                       help="OCR each task with its profile from ocr_profiles.py even if the profile has "
+                            "not been validated; compare follows the index (default: validated only)")
+
+    compare = subparsers.add_parser("compare", help="Report missing, new and changed screens of a capture")
+    compare.add_argument("capture_root", help="Folder with one subfolder of screenshots per task")
+    compare.add_argument("--tasks", nargs="+", default=None, metavar="TASK",
+                         help="Only compare these tasks (default: every captured task in the index)")
+    compare.add_argument("--text-similarity", type=float, default=0.8,
+                         help="Text similarity needed for an unchanged screen (default: 0.8)")
+    compare.add_argument("--image-similarity", type=float, default=0.95,
+                         help="Image similarity needed for an unchanged screen (default: 0.95)")
+    compare.add_argument("--change-threshold", type=float, default=0.7,
+                         help="Image similarity above which a non-matching screen counts as changed "
+                              "rather than new (default: 0.7)")
+    compare.add_argument("--output", default="golden_diff.json",
+                         help="JSON report path (default: golden_diff.json)")
+    compare.add_argument("--fail-on-diff", action="store_true",
+                         help="Exit with status 1 if any screen is changed, new or missing")
+
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else FeatureCache(args.cache_dir, max_size_mb=DEFAULT_CACHE_SIZE_MB)
+    started = time.time()
+
+    if args.command == "build":
+        with CleanupEngine(workers=args.workers, cache=cache, lang=args.lang,
+                           ocr_backend=args.ocr_backend) as engine:
+            manifest = build_index(args.golden_root, args.index_dir, engine, all_profiles=args.ocr_profiles)
+        print(f"\n✅ Indexed {len(manifest['frames'])} frames in {time.time() - started:.1f}s → {args.index_dir}")
+        if manifest['errors']:
+            print(f"   ⚠️  Skipped {len(manifest['errors'])} unreadable files")
+        return
+
+    index = GoldenIndex(args.index_dir)
+    # Features must be extracted exactly as they were for the index
+    with CleanupEngine(resize_to=index.manifest['resize_to'], workers=args.workers, cache=cache,
+                       lang=index.manifest['lang'], ocr_backend=index.manifest['ocr_backend']) as engine:
+        report = compare_capture(index, args.capture_root, engine, tasks=args.tasks,
+                                 text_similarity_threshold=args.text_similarity,
+                                 image_similarity_threshold=args.image_similarity,
+                                 change_threshold=args.change_threshold)
+    print_report(report)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report saved to: {args.output} ({time.time() - started:.1f}s)")
+
+    if args.fail_on_diff and any(result['counts']['changed'] or result['counts']['new'] or
+                                 result['counts']['missing'] for result in report['tasks'].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing and counters for the screenshot cleanup pipeline.
+
+An Instrumentation object collects, for one cleanup run:
+
+- wall and CPU time per stage, either measured in this process with
+  stage() or reported by worker processes with add_time()
+- named counters (images decoded, pairs compared, cache hits, ...)
+- a histogram of per-file OCR latency
+
+summary() returns all of it as a JSON-serializable dict for cleanup_report.json.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Upper bounds (milliseconds) of the OCR latency histogram buckets
+OCR_LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class Instrumentation:
+    """Per-run stage timings, counters and OCR latency histogram."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {}
+        self.ocr_histogram = [0] * (len(OCR_LATENCY_BUCKETS_MS) + 1)
+        self.ocr_total_ms = 0.0
+        self.ocr_max_ms = 0.0
+        self.wall_started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of code running in this process under a stage name."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add_time(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        """Add time measured elsewhere (e.g. in a worker process) to a stage."""
+        stage = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+        stage['wall'] += wall
+        stage['cpu'] += cpu
+        stage['calls'] += calls
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_ocr_latency(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        bucket = 0
+        while bucket < len(OCR_LATENCY_BUCKETS_MS) and milliseconds > OCR_LATENCY_BUCKETS_MS[bucket]:
+            bucket += 1
+        self.ocr_histogram[bucket] += 1
+        self.ocr_total_ms += milliseconds
+        self.ocr_max_ms = max(self.ocr_max_ms, milliseconds)
+
+    def record_extraction(self, timings: Optional[Dict]) -> None:
+        """Fold the 'timings' of a freshly extracted screenshot into the worker stages."""
+        if not timings:
+            return
+        self.add_time('decode', timings['decode'], timings['decode_cpu'])
+        if 'ocr' in timings:
+            self.add_time('ocr', timings['ocr'], timings['ocr_cpu'])
+            self.record_ocr_latency(timings['ocr'])
+
+    def summary(self) -> Dict:
+        """Everything collected so far, rounded for the JSON report."""
+        labels = [f"<={edge}ms" for edge in OCR_LATENCY_BUCKETS_MS] + [f">{OCR_LATENCY_BUCKETS_MS[-1]}ms"]
+        ocr_files = sum(self.ocr_histogram)
+        return {
+            'total': {'wall': round(time.perf_counter() - self.wall_started, 4),
+                      'cpu': round(time.process_time() - self.cpu_started, 4)},
+            'stages': {name: {'wall': round(stage['wall'], 4), 'cpu': round(stage['cpu'], 4),
+                              'calls': stage['calls']}
+                       for name, stage in self.stages.items()},
+            'counters': dict(self.counters),
+            'ocr_latency': {
+                'files': ocr_files,
+                'mean_ms': round(self.ocr_total_ms / ocr_files, 2) if ocr_files else 0.0,
+                'max_ms': round(self.ocr_max_ms, 2),
+                'histogram': dict(zip(labels, self.ocr_histogram))
+            }
+        }
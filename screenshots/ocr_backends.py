@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+OCR backends used by cleanup_screenshots_ocr.py.
+
+pytesseract starts a new tesseract process (and reloads the language data)
+for every image. The backends here avoid that cost where possible:
+
+- tesserocr: keeps a TessBaseAPI with the traineddata loaded for the whole
+  life of the thread, one instance per language and page segmentation mode.
+  Inside a worker pool this gives one long-lived OCR engine per core.
+- batch: sends a whole chunk of crops to a single tesseract invocation via a
+  list file and splits the output on the page separator.
+- pytesseract: the original one-process-per-image path, kept as a fallback.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+
+from PIL import Image
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # Optional dependency
+    tesserocr = None
+
+BACKEND_NAMES = ('auto', 'tesserocr', 'batch', 'pytesseract')
+
+def parse_psm(config: str, default: int = 3) -> int:
+    """Extract the --psm value from a tesseract config string."""
+    match = re.search(r'--psm\s+(\d+)', config)
+    return int(match.group(1)) if match else default
+
+class OCRBackend:
+    """Common interface: OCR one image, or a batch of images in order."""
+
+    name = 'base'
+    batched = False  # True if batch_to_string is cheaper than one call per image
+
+    def available(self) -> bool:
+        """Whether the backend can run on this machine."""
+        raise NotImplementedError
+
+    def image_to_string(self, img: Image.Image, lang: str, config: str) -> str:
+        raise NotImplementedError
+
+    def batch_to_string(self, images: List[Image.Image], lang: str, config: str) -> List[str]:
+        """OCR several images; the default simply loops over image_to_string."""
+        return [self.image_to_string(img, lang, config) for img in images]
+
+class PytesseractBackend(OCRBackend):
+    """One tesseract process per image through pytesseract."""
+
+    name = 'pytesseract'
+
+    def available(self) -> bool:
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+    def image_to_string(self, img: Image.Image, lang: str, config: str) -> str:
+        return pytesseract.image_to_string(img, lang=lang, config=config)
+
+class TesserocrBackend(OCRBackend):
+    """In-process libtesseract; language data stays loaded between images."""
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        self.apis: Dict[Tuple[str, int], object] = {}
+
+    def available(self) -> bool:
+        return tesserocr is not None
+
+    def _api(self, lang: str, psm: int):
+        key = (lang, psm)
+        if key not in self.apis:
+            self.apis[key] = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+        return self.apis[key]
+
+    def image_to_string(self, img: Image.Image, lang: str, config: str) -> str:
+        api = self._api(lang, parse_psm(config))
+        api.SetImage(img)
+        return api.GetUTF8Text()
+
+    def close(self) -> None:
+        for api in self.apis.values():
+            api.End()
+        self.apis.clear()
+
+class TesseractBatchBackend(OCRBackend):
+    """Many images per tesseract invocation using a list file."""
+
+    name = 'batch'
+    batched = True
+    page_separator = '\f'
+
+    def __init__(self, fallback: OCRBackend = None):
+        self.fallback = fallback or PytesseractBackend()
+
+    def available(self) -> bool:
+        return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+    def image_to_string(self, img: Image.Image, lang: str, config: str) -> str:
+        return self.batch_to_string([img], lang, config)[0]
+
+    def batch_to_string(self, images: List[Image.Image], lang: str, config: str) -> List[str]:
+        if not images:
+            return []
+        with tempfile.TemporaryDirectory(prefix='ocr-batch-') as tmp:
+            paths = []
+            for i, img in enumerate(images):
+                path = os.path.join(tmp, f"{i:05d}.png")
+                img.save(path, compress_level=1)  # Fast write; the file is read once
+                paths.append(path)
+            list_file = os.path.join(tmp, 'images.txt')
+            with open(list_file, 'w') as f:
+                f.write('\n'.join(paths) + '\n')
+
+            command = [pytesseract.pytesseract.tesseract_cmd, list_file, 'stdout', '-l', lang,
+                       '-c', 'page_separator=' + self.page_separator, *config.split()]
+            result = subprocess.run(command, capture_output=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"tesseract failed: {result.stderr.decode(errors='replace').strip()}")
+
+        pages = result.stdout.decode('utf-8', errors='replace').split(self.page_separator)
+        # The output ends with a separator, leaving one trailing empty chunk
+        if len(pages) == len(images) + 1 and not pages[-1].strip():
+            pages = pages[:-1]
+        if len(pages) != len(images):
+            # Page boundaries are ambiguous; redo this chunk one image at a time
+            return [self.fallback.image_to_string(img, lang, config) for img in images]
+        return pages
+
+_BACKEND_CLASSES = {
+    'tesserocr': TesserocrBackend,
+    'batch': TesseractBatchBackend,
+    'pytesseract': PytesseractBackend,
+}
+
+# One instance per thread so OCR engines stay warm inside pool workers; a
+# tesseract handle must never be driven by two threads at once (in-process
+# cleanups with workers=1 run OCR on the caller's thread)
+_local = threading.local()
+
+def resolve_backend_name(name: str = 'auto') -> str:
+    """Map 'auto' to the fastest backend that is installed."""
+    if name != 'auto':
+        if name not in _BACKEND_CLASSES:
+            raise ValueError(f"Unknown OCR backend '{name}' (choose from {', '.join(BACKEND_NAMES)})")
+        return name
+    if tesserocr is not None:
+        return 'tesserocr'
+    return 'pytesseract'
+
+def get_backend(name: str = 'auto') -> OCRBackend:
+    """Return this thread's instance of an OCR backend."""
+    name = resolve_backend_name(name)
+    instances: Dict[str, OCRBackend] = getattr(_local, 'instances', None)
+    if instances is None:
+        instances = _local.instances = {}
+    if name not in instances:
+        instances[name] = _BACKEND_CLASSES[name]()
+    return instances[name]
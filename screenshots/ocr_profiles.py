@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Per-task OCR profiles used by cleanup_screenshots_ocr.py.
+
+Without a profile the top half of the full-resolution screenshot is sent to
+tesseract with --psm 6. A profile instead describes, for one task:
+
+- rois: the boxes (fractions of width/height) where that task shows its
+  prompt and answer text; the boxes are cropped and stacked into one image,
+  so each screenshot still costs a single OCR call
+- downscale: integer block-averaging factor applied to the crops
+- binarize: Otsu-threshold the crops to black text on white, which is what
+  tesseract would otherwise compute itself on the larger grayscale input
+- psm: tesseract page segmentation mode
+
+Profiles are keyed by the task names of TASKS in run_all_tasks_screenshots.py.
+Their boxes come from the task layouts, not from measurements on captured
+screenshots, so they are opt-in: the runner and golden_index.py only apply
+the profiles listed in VALIDATED_PROFILES unless asked to use all of them.
+Screenshots wider than the Cypress viewport (high-DPI captures) are
+downscaled to viewport scale first, so the boxes and factors apply to any
+capture resolution. All pixel work is done with numpy on the cropped region
+only.
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# viewportWidth in task-launcher/cypress.config.js
+REFERENCE_WIDTH = 1000
+# White rows between stacked regions so tesseract sees separate lines
+REGION_GAP = 12
+
+class OCRProfile:
+    """Where and how to OCR the screenshots of one task."""
+
+    def __init__(self, rois: Tuple[Tuple[float, float, float, float], ...], downscale: int = 1,
+                 binarize: bool = True, psm: int = 6):
+        """
+        Args:
+            rois: (left, top, right, bottom) boxes as fractions of the image size
+            downscale: Integer factor to shrink the crops by (1 keeps viewport resolution)
+            binarize: Convert crops to black-on-white with an Otsu threshold
+            psm: Tesseract page segmentation mode
+        """
+        self.rois = tuple(tuple(box) for box in rois)
+        self.downscale = max(1, int(downscale))
+        self.binarize = binarize
+        self.psm = psm
+
+    @property
+    def config(self) -> str:
+        """Tesseract config string for this profile."""
+        return f'--psm {self.psm}'
+
+    def key(self) -> str:
+        """Describe every setting that affects the OCR input; part of the feature cache key."""
+        rois = ';'.join(','.join(f"{v:g}" for v in box) for box in self.rois)
+        return f"rois={rois}|down={self.downscale}|bin={int(self.binarize)}|psm={self.psm}"
+
+    def prepare(self, img: Image.Image) -> Image.Image:
+        """Crop, downscale, binarize and stack the regions of interest of a screenshot."""
+        width, height = img.size
+        # High-DPI captures are first brought back to viewport scale
+        factor = self.downscale * max(1, width // REFERENCE_WIDTH)
+        regions = []
+        for left, top, right, bottom in self.rois:
+            box = (int(width * left), int(height * top), int(width * right), int(height * bottom))
+            if box[2] <= box[0] or box[3] <= box[1]:
+                continue
+            region = np.asarray(img.crop(box).convert('L'))
+            region = block_downscale(region, factor)
+            if self.binarize:
+                region = binarize(region)
+            regions.append(region)
+        return Image.fromarray(stack_regions(regions))
+
+def block_downscale(gray: np.ndarray, factor: int) -> np.ndarray:
+    """Shrink a grayscale array by an integer factor, averaging factor x factor blocks."""
+    if factor <= 1:
+        return gray
+    height, width = gray.shape[0] // factor, gray.shape[1] // factor
+    if height == 0 or width == 0:
+        return gray
+    blocks = gray[:height * factor, :width * factor].reshape(height, factor, width, factor)
+    return blocks.mean(axis=(1, 3)).astype(np.uint8)
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Gray level that best separates the two classes of a grayscale array."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(histogram)
+    if weight[-1] == 0:
+        return 128
+    weight /= weight[-1]
+    mean = np.cumsum(histogram * np.arange(256)) / histogram.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mean[-1] * weight - mean) ** 2 / (weight * (1 - weight))
+    return int(np.argmax(np.nan_to_num(between)))
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """Black text on white background; the majority class is taken to be the background."""
+    foreground = gray > otsu_threshold(gray)
+    if foreground.mean() < 0.5:
+        foreground = ~foreground  # Light text on a dark background
+    return np.where(foreground, 255, 0).astype(np.uint8)
+
+def stack_regions(regions: List[np.ndarray]) -> np.ndarray:
+    """Stack regions vertically on a white canvas, left-aligned, with a gap between them."""
+    if not regions:
+        return np.full((1, 1), 255, dtype=np.uint8)
+    width = max(region.shape[1] for region in regions)
+    height = sum(region.shape[0] for region in regions) + REGION_GAP * (len(regions) - 1)
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+    y = 0
+    for region in regions:
+        canvas[y:y + region.shape[0], :region.shape[1]] = region
+        y += region.shape[0] + REGION_GAP
+    return canvas
+
+# Prompt band across the top, shared by tasks that only show their question there
+TOP_PROMPT = (0.05, 0.0, 0.95, 0.3)
+# Row of answer choices below the stimulus
+ANSWER_ROW = (0.15, 0.65, 0.85, 0.9)
+
+OCR_PROFILES: Dict[str, OCRProfile] = {
+    # Question on top, numeric answer choices in the lower half
+    'egma-math': OCRProfile(rois=((0.1, 0.0, 0.9, 0.25), ANSWER_ROW)),
+    'matrix-reasoning': OCRProfile(rois=(TOP_PROMPT,)),
+    'mental-rotation': OCRProfile(rois=(TOP_PROMPT,)),
+    # Large centered instructions between sparse stimulus screens
+    'hearts-and-flowers': OCRProfile(rois=((0.1, 0.05, 0.9, 0.6),), downscale=2),
+    'memory-game': OCRProfile(rois=(TOP_PROMPT,)),
+    'same-different-selection': OCRProfile(rois=(TOP_PROMPT,)),
+    # Sentence prompt above the picture grid
+    'trog': OCRProfile(rois=((0.05, 0.0, 0.95, 0.5),)),
+    'vocab': OCRProfile(rois=((0.05, 0.0, 0.95, 0.5),)),
+    # Story text can run over several lines
+    'theory-of-mind': OCRProfile(rois=((0.05, 0.0, 0.95, 0.4),), psm=4),
+    'intro': OCRProfile(rois=((0.1, 0.05, 0.9, 0.6),), downscale=2),
+    'roar-inference': OCRProfile(rois=((0.05, 0.0, 0.95, 0.4),), psm=4),
+    'adult-reasoning': OCRProfile(rois=((0.1, 0.0, 0.9, 0.25), ANSWER_ROW)),
+}
+
+# Profiles checked to give the same groups as the default crop on real
+# screenshots of their task; only these are applied by default
+VALIDATED_PROFILES: FrozenSet[str] = frozenset()
+
+def default_profile(task: str, all_profiles: bool = False) -> Optional[str]:
+    """
+    Profile name to use for a task when none was chosen explicitly.
+
+    Args:
+        task: Task name (see TASKS in run_all_tasks_screenshots.py)
+        all_profiles: Also use profiles that have not been validated yet
+
+    Returns:
+        The task name if it has a profile to apply, None for the default top-half OCR
+    """
+    if task in VALIDATED_PROFILES or (all_profiles and task in OCR_PROFILES):
+        return task
+    return None
+
+def get_profile(name: Optional[str]) -> Optional[OCRProfile]:
+    """Profile for a task name; None means the default top-half OCR."""
+    if name is None:
+        return None
+    if name not in OCR_PROFILES:
+        raise ValueError(f"Unknown OCR profile '{name}' (choose from {', '.join(sorted(OCR_PROFILES))})")
+    return OCR_PROFILES[name]
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Compact the retained screenshots and build a light-weight review page.
+
+Run after cleanup (and renaming) on golden-runs, a single task folder or a
+filtered_frames folder. For every screenshot, in a process pool:
+
+- the PNG is losslessly re-encoded with maximum compression and replaced
+  only if that is smaller (or, with --webp, converted to lossless WebP)
+- a small thumbnail is written to the review folder
+
+Then one contact sheet per task (paged, a grid of labelled thumbnails) and
+an index.html with lazy-loaded thumbnails linking to the full images are
+written to the review folder. A manifest in the review folder remembers the
+size and mtime of every processed file, so later runs only touch new or
+changed screenshots. File mtimes are preserved, since rename_golden_runs.py
+numbers screenshots by mtime.
+"""
+
+import os
+import sys
+import argparse
+import html
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, features
+
+MANIFEST_FILE = "optimize_manifest.json"
+INDEX_FILE = "index.html"
+THUMB_SIZE = (240, 160)  # Bounding box; the aspect ratio is kept
+SHEET_COLUMNS = 6
+SHEET_ROWS = 10
+SHEET_LABEL_HEIGHT = 16
+IMAGE_SUFFIXES = ('.png', '.webp')
+
+def thumbnail_format() -> Tuple[str, str]:
+    """(Pillow format, suffix) for thumbnails: WebP when Pillow supports it."""
+    if features.check('webp'):
+        return 'WEBP', '.webp'
+    return 'JPEG', '.jpg'
+
+def find_image_sets(root: str) -> Dict[str, List[Path]]:
+    """
+    Screenshots to process, grouped by task.
+
+    Every subfolder of root with images is one set; images directly in root
+    form a set named after root. Dot folders and files are skipped.
+    """
+    root_path = Path(root)
+    sets = {}
+    folders = [root_path] + sorted(p for p in root_path.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    for folder in folders:
+        images = sorted(p for p in folder.iterdir()
+                        if p.suffix.lower() in IMAGE_SUFFIXES and not p.name.startswith('.') and p.is_file())
+        if images:
+            sets[folder.name if folder != root_path else root_path.resolve().name] = images
+    return sets
+
+def optimize_image(path: str, thumb_path: str, mode: str = 'png',
+                   thumb_size: Tuple[int, int] = THUMB_SIZE) -> Dict:
+    """
+    Re-encode one screenshot and write its thumbnail (runs in a worker process).
+
+    Args:
+        path: Screenshot to process
+        thumb_path: Where the thumbnail is written
+        mode: 'png' (lossless PNG re-optimization), 'webp' (lossless WebP,
+            the PNG is removed) or 'none' (thumbnail only)
+        thumb_size: Thumbnail bounding box
+
+    Returns:
+        Dictionary with 'path' (the file now holding the image), 'original_size',
+        'size', 'mtime', 'width', 'height', 'thumb_width', 'thumb_height' and
+        'error' (None on success)
+    """
+    result = {'path': path, 'original_size': 0, 'size': 0, 'mtime': 0.0, 'error': None}
+    try:
+        stat = os.stat(path)
+        result['original_size'] = result['size'] = stat.st_size
+        result['mtime'] = stat.st_mtime
+        with Image.open(path) as img:
+            img.load()
+            result['width'], result['height'] = img.size
+
+            thumb = img.convert('RGB')
+            thumb.thumbnail(thumb_size, Image.LANCZOS)
+            result['thumb_width'], result['thumb_height'] = thumb.size
+            thumb_format, _ = thumbnail_format()
+            Path(thumb_path).parent.mkdir(parents=True, exist_ok=True)
+            thumb.save(thumb_path, thumb_format, quality=80)
+
+            target = None
+            if mode == 'png' and path.lower().endswith('.png'):
+                target = path
+                options = {'format': 'PNG', 'optimize': True, 'compress_level': 9}
+            elif mode == 'webp' and path.lower().endswith('.png'):
+                target = str(Path(path).with_suffix('.webp'))
+                options = {'format': 'WEBP', 'lossless': True, 'method': 6}
+            if target is not None:
+                # Write next to the original, then swap it in atomically
+                tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(target)}.tmp")
+                img.save(tmp_path, **options)
+                new_size = os.path.getsize(tmp_path)
+                if target != path or new_size < stat.st_size:
+                    os.replace(tmp_path, target)
+                    os.utime(target, (stat.st_atime, stat.st_mtime))
+                    if target != path:
+                        os.remove(path)
+                    result['path'], result['size'] = target, new_size
+                else:
+                    os.remove(tmp_path)  # Already as small as it gets
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def build_contact_sheet(title: str, thumbs: List[Tuple[str, str]], sheet_path: str,
+                        columns: int = SHEET_COLUMNS, thumb_size: Tuple[int, int] = THUMB_SIZE) -> str:
+    """
+    Paste (label, thumbnail path) pairs into one labelled grid image (runs in a worker process).
+
+    Returns:
+        sheet_path
+    """
+    cell_width, cell_height = thumb_size[0], thumb_size[1] + SHEET_LABEL_HEIGHT
+    rows = (len(thumbs) + columns - 1) // columns
+    sheet = Image.new('RGB', (columns * cell_width, SHEET_LABEL_HEIGHT + rows * cell_height), 'white')
+    draw = ImageDraw.Draw(sheet)
+    draw.text((4, 2), title, fill='black')
+    for i, (label, thumb_path) in enumerate(thumbs):
+        x = (i % columns) * cell_width
+        y = SHEET_LABEL_HEIGHT + (i // columns) * cell_height
+        try:
+            with Image.open(thumb_path) as thumb:
+                sheet.paste(thumb, (x + (cell_width - thumb.width) // 2, y))
+        except OSError:
+            draw.rectangle((x + 2, y + 2, x + cell_width - 2, y + thumb_size[1] - 2), outline='red')
+        draw.text((x + 4, y + thumb_size[1] + 2), label, fill='black')
+    Path(sheet_path).parent.mkdir(parents=True, exist_ok=True)
+    sheet.save(sheet_path, 'JPEG', quality=80)
+    return sheet_path
+
+def load_manifest(review_dir: str) -> Dict:
+    try:
+        with open(os.path.join(review_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}, 'sheets': {}}
+
+def save_manifest(review_dir: str, manifest: Dict) -> None:
+    manifest['updated'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    tmp_path = os.path.join(review_dir, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(review_dir, MANIFEST_FILE))
+
+def write_index_html(review_dir: str, root: str, sets: Dict[str, List[Dict]], sheets: Dict[str, List[str]],
+                     title: str) -> Path:
+    """Write the review page: per task, its contact sheets and lazy-loaded thumbnails."""
+    sections = []
+    for name, entries in sets.items():
+        sheet_links = " ".join(
+            f'<a href="{html.escape(sheet)}">sheet {i + 1}</a>' for i, sheet in enumerate(sheets.get(name, [])))
+        tiles = "\n".join(
+            f'        <a class="screenshot" href="{html.escape(os.path.relpath(os.path.join(root, e["file"]), review_dir))}">'
+            f'<img src="{html.escape(e["thumb"])}" width="{e["thumb_width"]}" height="{e["thumb_height"]}" '
+            f'alt="{html.escape(e["file"])}" loading="lazy"><p>{html.escape(os.path.basename(e["file"]))}</p></a>'
+            for e in entries)
+        sections.append(f'    <h2 id="{html.escape(name)}">{html.escape(name)} ({len(entries)})</h2>\n'
+                        f'    <p>Contact sheets: {sheet_links}</p>\n'
+                        f'    <div class="grid">\n{tiles}\n    </div>')
+    nav = " | ".join(f'<a href="#{html.escape(name)}">{html.escape(name)}</a>' for name in sets)
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .screenshot {{ margin: 6px; display: inline-block; text-align: center; color: inherit; text-decoration: none; }}
+        .screenshot img {{ border: 1px solid #ccc; }}
+        .screenshot p {{ margin: 4px 0; font-size: 12px; }}
+    </style>
+</head>
+<body>
+    <h1>{html.escape(title)}</h1>
+    <p>Total screenshots: {sum(len(entries) for entries in sets.values())}</p>
+    <p>{nav}</p>
+    <hr>
+{chr(10).join(sections)}
+</body>
+</html>
+"""
+    index_path = Path(review_dir) / INDEX_FILE
+    index_path.write_text(page)
+    return index_path
+
+def optimize_screenshots(root: str, review_dir: Optional[str] = None, mode: str = 'png',
+                         workers: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    Optimize new or changed screenshots under root and refresh the review folder.
+
+    Args:
+        root: golden-runs style folder (one subfolder per task) or a folder of images
+        review_dir: Where thumbnails, contact sheets and index.html go
+            (default: <root>-review, outside root so renaming and uploads
+            do not pick them up)
+        mode: 'png', 'webp' or 'none' (see optimize_image)
+        workers: Processes (None = one per core)
+        force: Reprocess every file, ignoring the manifest
+
+    Returns:
+        Dictionary with 'processed', 'skipped', 'removed', 'errors',
+        'bytes_before', 'bytes_after', 'sheets' (written this run) and 'index'
+    """
+    root = os.path.normpath(root)
+    review_dir = review_dir or f"{root}-review"
+    os.makedirs(review_dir, exist_ok=True)
+    manifest = {'files': {}, 'sheets': {}} if force else load_manifest(review_dir)
+    _, thumb_suffix = thumbnail_format()
+    image_sets = find_image_sets(root)
+
+    # Only files whose size or mtime differ from the manifest need work
+    pending = []
+    current = set()
+    changed_sets = set()
+    for name, images in image_sets.items():
+        for image in images:
+            key = os.path.relpath(image, root)
+            current.add(key)
+            known = manifest['files'].get(key)
+            stat = image.stat()
+            if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+                continue
+            thumb = os.path.join('thumbs', name, image.stem + thumb_suffix)
+            pending.append((key, name, str(image), thumb))
+            changed_sets.add(name)
+
+    result = {'processed': 0, 'skipped': len(current) - len(pending), 'removed': 0, 'errors': {},
+              'bytes_before': 0, 'bytes_after': 0, 'sheets': []}
+
+    # Files that disappeared (e.g. removed by a later cleanup) leave the review
+    for key in sorted(set(manifest['files']) - current):
+        entry = manifest['files'].pop(key)
+        Path(review_dir, entry['thumb']).unlink(missing_ok=True)
+        changed_sets.add(entry['set'])
+        result['removed'] += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outcomes = executor.map(optimize_image, [p for _, _, p, _ in pending],
+                                [os.path.join(review_dir, t) for _, _, _, t in pending],
+                                [mode] * len(pending), chunksize=4)
+        for (key, name, _, thumb), outcome in zip(pending, outcomes):
+            if outcome['error']:
+                result['errors'][key] = outcome['error']
+                print(f"   ❌ {key}: {outcome['error']}")
+                continue
+            stored_key = os.path.relpath(outcome['path'], root)  # .webp after conversion
+            if stored_key != key:
+                manifest['files'].pop(key, None)
+            manifest['files'][stored_key] = {
+                'set': name, 'size': outcome['size'], 'mtime': outcome['mtime'],
+                'original_size': outcome['original_size'], 'width': outcome['width'],
+                'height': outcome['height'], 'thumb': thumb, 'thumb_width': outcome['thumb_width'],
+                'thumb_height': outcome['thumb_height']}
+            result['processed'] += 1
+            result['bytes_before'] += outcome['original_size']
+            result['bytes_after'] += outcome['size']
+            done = result['processed']
+            if done % 100 == 0:
+                print(f"   🗜️  {done}/{len(pending)} processed")
+
+        # Contact sheets, paged, for every set that changed (or never got one)
+        entries_by_set = {}
+        for key in sorted(manifest['files']):
+            entry = manifest['files'][key]
+            entries_by_set.setdefault(entry['set'], []).append(dict(entry, file=key))
+        per_sheet = SHEET_COLUMNS * SHEET_ROWS
+        jobs = []
+        for name, entries in entries_by_set.items():
+            if name not in changed_sets and name in manifest['sheets']:
+                continue
+            pages = [entries[i:i + per_sheet] for i in range(0, len(entries), per_sheet)]
+            for sheet in manifest['sheets'].get(name, [])[len(pages):]:
+                Path(review_dir, sheet).unlink(missing_ok=True)
+            manifest['sheets'][name] = [os.path.join('sheets', f"{name}-{i + 1:02d}.jpg") for i in range(len(pages))]
+            for page_number, page in enumerate(pages):
+                jobs.append((f"{name} ({page_number + 1}/{len(pages)})",
+                             [(os.path.basename(e['file']), os.path.join(review_dir, e['thumb'])) for e in page],
+                             os.path.join(review_dir, manifest['sheets'][name][page_number])))
+        for name in set(manifest['sheets']) - set(entries_by_set):
+            for sheet in manifest['sheets'].pop(name):
+                Path(review_dir, sheet).unlink(missing_ok=True)
+        result['sheets'] = list(executor.map(build_contact_sheet, *zip(*jobs))) if jobs else []
+
+    save_manifest(review_dir, manifest)
+    result['index'] = str(write_index_html(review_dir, root, entries_by_set, manifest['sheets'],
+                                           f"{os.path.basename(root)} screenshots"))
+    return result
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compress retained screenshots and build thumbnails, "
+                                                 "contact sheets and a lazy-loading review page")
+    parser.add_argument("root", nargs="?", default="golden-runs",
+                        help="Folder with one subfolder per task, or a folder of screenshots "
+                             "such as filtered_frames (default: golden-runs)")
+    parser.add_argument("--review-dir", default=None,
+                        help="Where thumbnails, contact sheets and index.html go (default: <root>-review)")
+    parser.add_argument("--webp", action="store_true",
+                        help="Convert PNGs to lossless WebP instead of re-optimizing them "
+                             "(the cleanup, rename and index tools read PNG only)")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="Leave the screenshots untouched, only build the review files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: number of CPU cores)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocess every screenshot, ignoring the manifest")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        print(f"❌ Directory {args.root} not found!")
+        sys.exit(1)
+
+    mode = 'none' if args.no_optimize else 'webp' if args.webp else 'png'
+    print(f"🚀 Optimizing screenshots in {args.root} (mode: {mode})")
+    started = time.time()
+    result = optimize_screenshots(args.root, args.review_dir, mode=mode, workers=args.workers, force=args.force)
+
+    saved = result['bytes_before'] - result['bytes_after']
+    print(f"📊 {result['processed']} processed, {result['skipped']} unchanged, {result['removed']} removed "
+          f"in {time.time() - started:.1f}s")
+    if result['processed']:
+        print(f"🗜️  {result['bytes_before']/1024/1024:.1f}MB → {result['bytes_after']/1024/1024:.1f}MB "
+              f"({saved/1024/1024:.1f}MB saved)")
+    print(f"🖼️  {len(result['sheets'])} contact sheets written")
+    print(f"📄 Review page: {result['index']}")
+    if result['errors']:
+        print(f"❌ {len(result['errors'])} files failed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Extract the unique screens from a Cypress video recording.
+
+Frames are decoded straight from the MP4 with OpenCV and pass through a
+streaming filter chain: sampling at a fixed rate, scene-change detection
+against the previous sample, blank/loading-screen rejection and perceptual
+hash deduplication. Only frames that survive are written to disk, followed
+by an HTML summary of the result.
+"""
+
+import os
+import sys
+import argparse
+import html
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from bktree import BKTree
+
+def find_latest_video(video_dir: str = "cypress/videos") -> Optional[str]:
+    """Most recently modified MP4 under video_dir, if any."""
+    videos = list(Path(video_dir).rglob("*.mp4"))
+    if not videos:
+        return None
+    return str(max(videos, key=lambda p: p.stat().st_mtime))
+
+def frame_dhash(gray: np.ndarray) -> int:
+    """64-bit difference hash of a grayscale frame."""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+def count_colors(frame: np.ndarray) -> int:
+    """
+    Number of distinct BGR colors in a frame.
+
+    Every pixel is counted, like the old ImageMagick check: thin UI elements
+    (borders, text strokes) would disappear from a subsampled frame.
+    """
+    pixels = frame.reshape(-1, 3).astype(np.uint32)
+    packed = (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+    return len(np.unique(packed))
+
+def is_blank_frame(frame: np.ndarray, gray: np.ndarray, min_colors: int = 10,
+                   dark_fraction: float = 0.1, bright_fraction: float = 0.9) -> Optional[str]:
+    """
+    Reason a frame should be dropped as blank or loading content, or None.
+
+    Mirrors the old ImageMagick checks: fewer than min_colors distinct colors,
+    or a mean brightness below 10% / above 90%.
+    """
+    if count_colors(frame) < min_colors:
+        return "blank"
+    mean = float(gray.mean()) / 255.0
+    if mean < dark_fraction:
+        return "too_dark"
+    if mean > bright_fraction:
+        return "too_bright"
+    return None
+
+def extract_unique_frames(video_path: str, output_dir: str, sample_fps: float = 0.5,
+                          scene_threshold: float = 2.0, hash_distance: int = 2,
+                          filter_blank: bool = True) -> Dict:
+    """
+    Stream a video and write only its unique frames.
+
+    Args:
+        video_path: Path to the MP4 recording
+        output_dir: Directory that receives filtered_frames/ and the summary
+        sample_fps: Frames per second to examine (0.5 = one every 2 seconds)
+        scene_threshold: Mean absolute gray-level difference (0-255) to the
+            previous sample below which the screen is considered unchanged
+        hash_distance: Max dHash Hamming distance to an already kept frame
+            for a frame to count as a duplicate
+        filter_blank: Drop blank, very dark and very bright frames
+
+    Returns:
+        Dictionary with the kept frames and counts for every filter stage
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open video {video_path}")
+
+    video_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, int(round(video_fps / sample_fps)))
+    frames_dir = Path(output_dir) / "filtered_frames"
+    frames_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = {'decoded': 0, 'sampled': 0, 'unchanged': 0, 'blank': 0, 'duplicate': 0, 'kept': 0}
+    kept: List[Dict] = []
+    seen_hashes = BKTree()
+    previous_small = None
+    frame_index = -1
+
+    try:
+        while True:
+            # grab() advances without converting frames we are not going to look at
+            if not capture.grab():
+                break
+            frame_index += 1
+            counts['decoded'] += 1
+            if frame_index % step:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            counts['sampled'] += 1
+            timestamp = frame_index / video_fps
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+            # Scene change: skip samples that look like the previous one
+            if previous_small is not None and np.abs(small - previous_small).mean() < scene_threshold:
+                previous_small = small
+                counts['unchanged'] += 1
+                continue
+            previous_small = small
+
+            if filter_blank and is_blank_frame(frame, gray):
+                counts['blank'] += 1
+                continue
+
+            frame_hash = frame_dhash(gray)
+            if seen_hashes.search(frame_hash, hash_distance):
+                counts['duplicate'] += 1
+                continue
+            seen_hashes.add(frame_hash, len(kept))
+
+            counts['kept'] += 1
+            filename = f"screenshot_{counts['kept']:04d}.png"
+            cv2.imwrite(str(frames_dir / filename), frame)
+            kept.append({'file': filename, 'frame': frame_index,
+                         'timestamp': round(timestamp, 2), 'dhash': f"{frame_hash:016x}"})
+            print(f"Kept frame {frame_index} ({timestamp:.1f}s) → {filename}")
+    finally:
+        capture.release()
+
+    return {'video': video_path, 'sample_fps': sample_fps, 'video_fps': video_fps,
+            'counts': counts, 'frames': kept}
+
+def write_summary_html(result: Dict, output_dir: str, title: str) -> Path:
+    """Write an HTML page showing every kept frame."""
+    tiles = "\n".join(
+        f'    <div class="screenshot">\n'
+        f'        <img src="filtered_frames/{html.escape(f["file"])}" alt="{html.escape(f["file"])}" loading="lazy">\n'
+        f'        <p>{html.escape(f["file"])} ({f["timestamp"]:.1f}s)</p>\n'
+        f'    </div>'
+        for f in result['frames'])
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .screenshot {{ margin: 10px; display: inline-block; text-align: center; }}
+        .screenshot img {{ max-width: 300px; max-height: 200px; border: 1px solid #ccc; }}
+        .screenshot p {{ margin: 5px 0; font-size: 12px; }}
+    </style>
+</head>
+<body>
+    <h1>{html.escape(title)}</h1>
+    <p>Extracted from: {html.escape(result['video'])}</p>
+    <p>Total screenshots: {len(result['frames'])}</p>
+    <hr>
+{tiles}
+</body>
+</html>
+"""
+    summary_path = Path(output_dir) / "screenshot_summary.html"
+    summary_path.write_text(page)
+    return summary_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract unique screenshots from a Cypress video recording")
+    parser.add_argument("video", nargs="?", help="Path to the MP4 (default: most recent in cypress/videos)")
+    parser.add_argument("--output-dir", default="extracted_screenshots",
+                       help="Output directory (default: extracted_screenshots)")
+    parser.add_argument("--fps", type=float, default=0.5,
+                       help="Frames per second to examine (default: 0.5)")
+    parser.add_argument("--scene-threshold", type=float, default=2.0,
+                       help="Mean gray-level change needed to count as a new scene (default: 2.0)")
+    parser.add_argument("--hash-distance", type=int, default=2,
+                       help="Max dHash distance for a frame to be a duplicate (default: 2)")
+    parser.add_argument("--keep-blank", action="store_true",
+                       help="Keep blank, very dark and very bright frames")
+    parser.add_argument("--title", default=None,
+                       help="Title of the HTML summary (default: derived from the video name)")
+
+    args = parser.parse_args()
+
+    video = args.video or find_latest_video()
+    if not video or not os.path.isfile(video):
+        print("Error: No video file found or specified")
+        print(f"Usage: {sys.argv[0]} [path/to/video.mp4]")
+        sys.exit(1)
+
+    print(f"Processing video: {video}")
+    result = extract_unique_frames(video, args.output_dir, sample_fps=args.fps,
+                                   scene_threshold=args.scene_threshold,
+                                   hash_distance=args.hash_distance,
+                                   filter_blank=not args.keep_blank)
+
+    counts = result['counts']
+    print("\nFiltering complete!")
+    print(f"Sampled frames: {counts['sampled']} (of {counts['decoded']} decoded)")
+    print(f"Dropped: {counts['unchanged']} unchanged, {counts['blank']} blank, {counts['duplicate']} duplicate")
+    print(f"Filtered frames: {counts['kept']}")
+
+    title = args.title or f"{Path(video).name.split('.')[0].replace('_', ' ').title()} Screenshots"
+    summary_path = write_summary_html(result, args.output_dir, title)
+    with open(Path(args.output_dir) / "frames.json", 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"Summary HTML created: {summary_path}")
+    print(f"Done! Screenshots saved to: {Path(args.output_dir) / 'filtered_frames'}/")
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,6 @@
 
 # Script to rename images in all golden-runs subfolders
 
-echo "🚀 Starting golden-runs image renaming for all folders..."
-
-# Make the single folder script executable
-chmod +x rename_one_folder.sh
-
 # List of all folders to process
 folders=(
     "egma-math"
@@ -20,11 +15,6 @@ folders=(
     "vocab"
 )
 
-# Process each folder
-for folder in "${folders[@]}"; do
-    echo ""
-    ./rename_one_folder.sh "$folder"
-done
-
-echo ""
-echo "🎉 All golden-runs folders processed!" 
\ No newline at end of file
+# Folders are renamed concurrently by a single process
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+exec python3 "$SCRIPT_DIR/rename_golden_runs.py" golden-runs --folders "${folders[@]}"
@@ -3,70 +3,252 @@
 Script to rename images in golden-runs subfolders.
 Renames images to <foldername>-###.png where ### is a 3-digit left-padded number
 starting from the oldest file in each subfolder.
+
+Each folder is read with a single os.scandir pass and renamed in two phases:
+every file is first moved to a unique temporary name, then to its final
+name, so a planned name can never overwrite a file that has not been
+renamed yet. The plan is journaled in the folder before anything is moved;
+if a run is interrupted, the next run finishes the journaled renames before
+doing anything else. Folders are processed concurrently, and a manifest
+(old name, new name, content hash, mtime, size) is written to the root for
+later tools to read.
 """
 
 import os
-import glob
-from pathlib import Path
-
-def rename_images_in_folder(folder_path):
-    """Rename all PNG images in a folder with the folder name prefix."""
-    folder_name = os.path.basename(folder_path)
-    print(f"\n📁 Processing folder: {folder_name}")
-    
-    # Get all PNG files in the folder
-    png_files = glob.glob(os.path.join(folder_path, "*.png"))
-    
-    if not png_files:
-        print(f"   ⚠️  No PNG files found in {folder_name}")
-        return
-    
-    # Sort files by modification time (oldest first)
-    png_files.sort(key=lambda x: os.path.getmtime(x))
-    
-    print(f"   📸 Found {len(png_files)} PNG files")
-    
-    # Rename each file
-    for i, old_path in enumerate(png_files):
-        # Generate new filename with 3-digit padding
-        new_filename = f"{folder_name}-{i+1:03d}.png"
-        new_path = os.path.join(folder_path, new_filename)
-        
-        # Skip if already correctly named
-        if os.path.basename(old_path) == new_filename:
-            print(f"   ✅ {new_filename} (already correct)")
-            continue
-        
-        # Rename the file
-        try:
-            os.rename(old_path, new_path)
-            old_filename = os.path.basename(old_path)
-            print(f"   🔄 {old_filename} → {new_filename}")
-        except Exception as e:
-            print(f"   ❌ Error renaming {old_path}: {e}")
-
-def main():
+import sys
+import argparse
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from feature_cache import file_content_hash
+
+MANIFEST_FILE = "manifest.json"
+JOURNAL_FILE = ".rename_journal.json"
+
+def scan_folder(folder_path: str) -> List[Dict]:
+    """
+    List the PNG files of a folder, oldest first, with one scandir pass.
+
+    Returns:
+        List of dicts with 'name', 'mtime' and 'size'
+    """
+    files = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # Dot files are journal and temporary names of an interrupted run
+            if entry.name.endswith('.png') and not entry.name.startswith('.') and entry.is_file():
+                stat = entry.stat()  # Cached by scandir where the OS provides it
+                files.append({'name': entry.name, 'mtime': stat.st_mtime, 'size': stat.st_size})
+    # Name breaks mtime ties so the numbering is reproducible
+    files.sort(key=lambda f: (f['mtime'], f['name']))
+    return files
+
+def plan_renames(folder_name: str, files: List[Dict]) -> List[Dict]:
+    """Assign <folder>-###.png names in order; returns the files with 'new_name' set."""
+    return [dict(f, new_name=f"{folder_name}-{i+1:03d}.png") for i, f in enumerate(files)]
+
+def write_json_atomic(path: str, data: Dict) -> None:
+    """Write JSON to a temporary file, fsync it and move it into place."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def apply_journal(folder_path: str, journal: Dict) -> None:
+    """
+    Carry out (or finish) the renames recorded in a journal.
+
+    Phase 1 moves every source to its temporary name; phase 2 moves every
+    temporary file to its final name. The journal records the phase, so an
+    interrupted run can be resumed without guessing which names are which.
+    """
+    journal_path = os.path.join(folder_path, JOURNAL_FILE)
+    moves = journal['moves']
+
+    if journal['phase'] == 1:
+        for move in moves:
+            old_path = os.path.join(folder_path, move['old'])
+            tmp_path = os.path.join(folder_path, move['tmp'])
+            if not os.path.exists(tmp_path):
+                os.rename(old_path, tmp_path)
+        journal['phase'] = 2
+        write_json_atomic(journal_path, journal)
+
+    for move in moves:
+        tmp_path = os.path.join(folder_path, move['tmp'])
+        new_path = os.path.join(folder_path, move['new'])
+        if not os.path.exists(tmp_path):
+            continue  # Already moved before an interruption
+        if os.path.exists(new_path):
+            raise FileExistsError(f"Refusing to overwrite {new_path}")
+        os.rename(tmp_path, new_path)
+
+    os.remove(journal_path)
+
+def recover_folder(folder_path: str) -> bool:
+    """Finish a rename that was interrupted; returns True if there was one."""
+    journal_path = os.path.join(folder_path, JOURNAL_FILE)
+    if not os.path.exists(journal_path):
+        return False
+    with open(journal_path) as f:
+        journal = json.load(f)
+    print(f"   ♻️  Resuming interrupted rename in {os.path.basename(folder_path)} (phase {journal['phase']})")
+    apply_journal(folder_path, journal)
+    return True
+
+def rename_images_in_folder(folder_path: str, previous: Optional[Dict] = None,
+                            dry_run: bool = False) -> Optional[Dict]:
+    """
+    Rename all PNG images in a folder with the folder name prefix.
+
+    Args:
+        folder_path: Folder to rename in place
+        previous: This folder's entry from an earlier manifest; content hashes
+            of files whose name, size and mtime are unchanged are reused
+        dry_run: Only print the plan
+
+    Returns:
+        Manifest entry for the folder, or None if it has no PNG files
+    """
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    output = [f"\n📁 Processing folder: {folder_name}"]
+
+    if not dry_run and recover_folder(folder_path):
+        previous = None  # Names in the old manifest no longer describe the folder
+
+    files = scan_folder(folder_path)
+    if not files:
+        output.append(f"   ⚠️  No PNG files found in {folder_name}")
+        print("\n".join(output))
+        return None
+    output.append(f"   📸 Found {len(files)} PNG files")
+
+    planned = plan_renames(folder_name, files)
+    moves = [f for f in planned if f['name'] != f['new_name']]
+    for f in planned:
+        if f['name'] == f['new_name']:
+            output.append(f"   ✅ {f['new_name']} (already correct)")
+        else:
+            output.append(f"   🔄 {f['name']} → {f['new_name']}")
+
+    if moves and not dry_run:
+        token = uuid.uuid4().hex[:8]
+        journal = {'phase': 1, 'moves': [
+            {'old': f['name'], 'tmp': f".renaming-{token}-{i:05d}.png", 'new': f['new_name']}
+            for i, f in enumerate(moves)]}
+        write_json_atomic(os.path.join(folder_path, JOURNAL_FILE), journal)
+        apply_journal(folder_path, journal)
+
+    # Hash after renaming; unchanged files reuse the hash from the previous manifest
+    known = {(f['name'], f['size'], f['mtime']): f['sha256'] for f in (previous or {}).get('files', [])}
+    entries = []
+    for f in planned:
+        final_name = f['name'] if dry_run else f['new_name']
+        sha256 = known.get((final_name, f['size'], f['mtime']))
+        if sha256 is None:
+            sha256 = file_content_hash(os.path.join(folder_path, final_name))
+        entries.append({'name': f['new_name'], 'old_name': f['name'], 'sha256': sha256,
+                        'mtime': f['mtime'], 'size': f['size']})
+
+    output.append(f"   ✅ Completed {folder_name} ({len(moves)} files {'to rename' if dry_run else 'renamed'})")
+    print("\n".join(output))
+    return {'files': entries, 'renamed': len(moves)}
+
+def load_manifest(root: str) -> Dict:
+    """Read root/manifest.json, or an empty manifest if there is none."""
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'folders': {}}
+
+def rename_golden_runs(root: str = "golden-runs", folders: Optional[List[str]] = None,
+                       workers: int = 4, dry_run: bool = False) -> Dict:
+    """
+    Rename every (or the given) subfolder of root and update the manifest.
+
+    A folder whose rename fails does not stop the others: the manifest is
+    still written for the folders that succeeded, the failed folder's entry
+    is dropped (its journal lets the next run finish it) and the error is
+    listed under 'failed'.
+
+    Returns:
+        The manifest ({'updated': ..., 'renamed': n, 'failed': {name: error},
+        'folders': {name: {'files': [...], 'renamed': n}}}); the top-level
+        'renamed' and 'failed' describe this run only
+    """
+    if folders is None:
+        with os.scandir(root) as entries:
+            folders = sorted(e.name for e in entries if e.is_dir() and not e.name.startswith('.'))
+        print(f"📂 Found {len(folders)} subdirectories: {', '.join(folders)}")
+
+    manifest = load_manifest(root)
+    existing = []
+    for folder in folders:
+        if os.path.isdir(os.path.join(root, folder)):
+            existing.append(folder)
+        else:
+            print(f"\n❌ Folder {folder} not found!")
+
+    # Folders are independent; renaming and hashing them in parallel hides I/O latency
+    manifest['renamed'] = 0
+    manifest['failed'] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {folder: executor.submit(rename_images_in_folder, os.path.join(root, folder),
+                                           manifest['folders'].get(folder), dry_run)
+                   for folder in existing}
+        for folder, future in futures.items():
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"\n❌ Renaming {folder} failed: {e}")
+                manifest['failed'][folder] = str(e)
+                manifest['folders'].pop(folder, None)
+                continue
+            if entry is not None:
+                manifest['folders'][folder] = entry
+                manifest['renamed'] += entry['renamed']
+
+    if not dry_run:
+        manifest['updated'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        write_json_atomic(os.path.join(root, MANIFEST_FILE), manifest)
+    return manifest
+
+def main(argv: Optional[List[str]] = None):
     """Main function to process all subfolders in golden-runs."""
-    golden_runs_path = "golden-runs"
-    
-    if not os.path.exists(golden_runs_path):
-        print(f"❌ Directory {golden_runs_path} not found!")
-        return
-    
+    parser = argparse.ArgumentParser(description="Rename golden-runs images to <folder>-###.png, oldest first")
+    parser.add_argument("root", nargs="?", default="golden-runs",
+                        help="Folder containing one subfolder per task (default: golden-runs)")
+    parser.add_argument("--folders", nargs="+", default=None, metavar="FOLDER",
+                        help="Only rename these subfolders (default: all)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Folders processed at the same time (default: 4)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Show the planned renames without changing anything")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.root):
+        print(f"❌ Directory {args.root} not found!")
+        sys.exit(1)
+
     print("🚀 Starting golden-runs image renaming...")
-    
-    # Get all subdirectories
-    subdirs = [d for d in os.listdir(golden_runs_path) 
-               if os.path.isdir(os.path.join(golden_runs_path, d))]
-    
-    print(f"📂 Found {len(subdirs)} subdirectories: {', '.join(subdirs)}")
-    
-    # Process each subdirectory
-    for subdir in subdirs:
-        subdir_path = os.path.join(golden_runs_path, subdir)
-        rename_images_in_folder(subdir_path)
-    
+    manifest = rename_golden_runs(args.root, args.folders, workers=args.workers, dry_run=args.dry_run)
+
+    if args.dry_run:
+        print("\n🔍 DRY RUN - No files were renamed")
+    else:
+        print(f"\n📄 Manifest saved: {os.path.join(args.root, MANIFEST_FILE)} ({manifest['renamed']} files renamed)")
+    if manifest['failed']:
+        print(f"\n❌ {len(manifest['failed'])} folder(s) failed:")
+        for folder, error in manifest['failed'].items():
+            print(f"   • {folder}: {error}")
+        sys.exit(1)
     print("\n🎉 Golden-runs image renaming completed!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -2,36 +2,137 @@
 """
 Comprehensive script to capture screenshots for all available tasks
 and process them with OCR-based cleanup.
+
+Tasks run as an asyncio pipeline: Cypress captures (browser-bound) and
+OCR cleanups (CPU-bound) have separate concurrency limits and timeouts, and
+the cleanup of a finished task runs while the next task is captured. Each
+Cypress run's output is streamed to logs/tasks/<task>.log.
 """
 
 import os
 import sys
+import argparse
+import asyncio
+import codecs
+import signal
 import subprocess
+import threading
 import time
 import json
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from cleanup_screenshots_ocr import CleanupEngine
+from feature_cache import FeatureCache
+from ocr_profiles import default_profile
+
+# Capture settings used unless a task overrides them in TASKS:
+# - poll: seconds between checks of the screen (a screenshot is taken only
+#   when the DOM/canvas hash changed since the last one)
+# - duration: seconds of capturing before the spec gives up on detecting
+#   the end of the task
+# - idle: consecutive unchanged polls (after trying to advance) before the
+#   task is considered stuck
+# - timeout: seconds before the whole Cypress run is killed
+DEFAULT_CAPTURE = {'poll': 2.0, 'duration': 240, 'idle': 30, 'timeout': 300}
 
-# Task mapping from taskConfig.ts to URL parameters
+# Tasks to capture, with per-task capture overrides; the name is also the
+# ?task= URL parameter (serve/serve.js passes it on as taskName) and the key
+# of the task's entry in ocr_profiles.OCR_PROFILES (applied when validated,
+# or for every task with --ocr-profiles)
 TASKS = {
-    'egma-math': 'egmaMath',
-    'matrix-reasoning': 'matrixReasoning', 
-    'mental-rotation': 'mentalRotation',
-    'hearts-and-flowers': 'heartsAndFlowers',
-    'memory-game': 'memoryGame',
-    'same-different-selection': 'sameDifferentSelection',
-    'trog': 'trog',
-    'vocab': 'vocab',
-    'theory-of-mind': 'theoryOfMind',
-    'intro': 'intro',
-    'roar-inference': 'roarInference',
-    'adult-reasoning': 'adultReasoning'
+    'egma-math': {},
+    'matrix-reasoning': {},
+    'mental-rotation': {},
+    # Short trials with fast stimulus changes
+    'hearts-and-flowers': {'poll': 1.0},
+    'memory-game': {'poll': 1.0},
+    'same-different-selection': {},
+    'trog': {},
+    'vocab': {},
+    # Story screens with audio keep the screen unchanged for a long time
+    'theory-of-mind': {'idle': 60, 'duration': 360, 'timeout': 420},
+    'intro': {'duration': 120, 'timeout': 180},
+    'roar-inference': {'idle': 60, 'duration': 360, 'timeout': 420},
+    'adult-reasoning': {}
 }
 
-def create_task_test(task_url_param: str, task_name: str) -> str:
-    """Create a Cypress test file for a specific task."""
+def task_settings(task_name: str) -> Dict:
+    """Capture settings of a task: DEFAULT_CAPTURE with the task's overrides."""
+    return {**DEFAULT_CAPTURE, **TASKS[task_name]}
+
+def create_task_test(task_url_param: str, task_name: str, poll: float = DEFAULT_CAPTURE['poll'],
+                     duration: float = DEFAULT_CAPTURE['duration'], idle: int = DEFAULT_CAPTURE['idle']) -> str:
+    """
+    Create a Cypress test file for a specific task.
+    
+    The spec hashes the jsPsych content (its HTML plus the pixels of every
+    canvas) every poll seconds and takes a screenshot only when the hash
+    changed. When the screen stays the same it clicks the first
+    OK/Continue/Next/Start (or other visible) button to move on. Capturing
+    stops as soon as the task is over (jsPsych content emptied or the end
+    screen's footer shown), after idle unchanged polls, or after duration
+    seconds.
+    """
     test_content = f'''const {task_name.replace('-', '_')}_url = 'http://localhost:8080/?task={task_url_param}';
 
+const POLL_INTERVAL = {int(poll * 1000)}; // ms between screen checks
+const CAPTURE_DURATION = {int(duration * 1000)}; // ms before giving up on detecting the end
+const MAX_IDLE_POLLS = {int(idle)}; // unchanged checks before the task counts as stuck
+const COMPLETION_POLLS = 2; // jsPsych empties the display between trials too
+const BUTTON_LABELS = ['OK', 'Continue', 'Next', 'Start'];
+
+// FNV-1a, enough to notice that anything on screen changed
+function hashString(text, hash = 2166136261) {{
+  for (let i = 0; i < text.length; i++) {{
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 16777619);
+  }}
+  return hash >>> 0;
+}}
+
+function screenHash(doc) {{
+  const content = doc.querySelector('.jspsych-content') || doc.body;
+  let hash = hashString(content.innerHTML);
+  doc.querySelectorAll('canvas').forEach((canvas) => {{
+    try {{
+      hash = hashString(canvas.toDataURL(), hash);
+    }} catch (e) {{
+      // Tainted canvas: fall back to its size
+      hash = hashString(`${{canvas.width}}x${{canvas.height}}`, hash);
+    }}
+  }});
+  return hash;
+}}
+
+function taskFinished(doc) {{
+  const content = doc.querySelector('.jspsych-content');
+  if (content && content.children.length === 0) {{
+    return true;
+  }}
+  // End-of-task screen with the Exit button
+  return doc.querySelectorAll('.lev-stimulus-container footer').length > 0;
+}}
+
+function clickNextButton(doc) {{
+  const $body = Cypress.$(doc.body);
+  for (const label of BUTTON_LABELS) {{
+    const $button = $body.find(`button:contains("${{label}}"):visible`);
+    if ($button.length > 0) {{
+      cy.wrap($button.first()).click({{ force: true }});
+      return;
+    }}
+  }}
+  const $visible = $body.find('button:visible');
+  if ($visible.length > 0) {{
+    cy.wrap($visible.first()).click({{ force: true }});
+  }}
+}}
+
 describe('{task_name.title().replace("-", " ")} Complete Run', () => {{
   let screenshotCounter = 1;
 
@@ -40,6 +141,38 @@ describe('{task_name.title().replace("-", " ")} Complete Run', () => {{
     screenshotCounter++;
   }}
 
+  function captureLoop(state) {{
+    cy.document().then((doc) => {{
+      const hash = screenHash(doc);
+      if (hash !== state.lastHash) {{
+        takeScreenshot(`screen-${{state.screens.toString().padStart(3, '0')}}`);
+        state.lastHash = hash;
+        state.screens++;
+        state.idlePolls = 0;
+      }} else {{
+        state.idlePolls++;
+      }}
+
+      state.finishedPolls = taskFinished(doc) ? state.finishedPolls + 1 : 0;
+      const elapsed = Date.now() - state.started;
+      if (state.finishedPolls >= COMPLETION_POLLS) {{
+        cy.task('progress', `{task_name}: task complete after ${{state.screens}} screens in ${{Math.round(elapsed / 1000)}}s`);
+        return;
+      }}
+      if (state.idlePolls >= MAX_IDLE_POLLS || elapsed >= CAPTURE_DURATION) {{
+        cy.task('progress', `{task_name}: stopping after ${{state.screens}} screens (${{state.idlePolls >= MAX_IDLE_POLLS ? 'no change' : 'time limit'}})`);
+        takeScreenshot('final-state');
+        return;
+      }}
+
+      // An unchanged screen is waiting for input
+      if (state.idlePolls > 0) {{
+        clickNextButton(doc);
+      }}
+      cy.wait(POLL_INTERVAL).then(() => captureLoop(state));
+    }});
+  }}
+
   it('runs complete {task_name.replace("-", " ")} with screenshots', () => {{
     // Visit with fullscreen mocking and extended timeout
     cy.visit({task_name.replace('-', '_')}_url, {{
@@ -56,199 +189,506 @@ describe('{task_name.title().replace("-", " ")} Complete Run', () => {{
       }}
     }});
 
-    // Initial screenshot
-    takeScreenshot('initial-load');
-    
-    // Run for 4 minutes with screenshots every 10 seconds
-    const totalDuration = 4 * 60 * 1000; // 4 minutes
-    const screenshotInterval = 10 * 1000; // 10 seconds
-    const numScreenshots = Math.floor(totalDuration / screenshotInterval);
-    
-    // Take screenshots at regular intervals
-    for (let i = 1; i <= numScreenshots; i++) {{
-      cy.wait(screenshotInterval);
-      takeScreenshot(`interval-${{i.toString().padStart(2, '0')}}`);
-      
-      // Try to interact with common elements (non-blocking)
-      cy.get('body').then(($body) => {{
-        // Click OK buttons if they exist
-        if ($body.find('button:contains("OK")').length > 0) {{
-          cy.get('button:contains("OK")').first().click({{ force: true }});
-        }}
-        // Click Continue buttons if they exist  
-        if ($body.find('button:contains("Continue")').length > 0) {{
-          cy.get('button:contains("Continue")').first().click({{ force: true }});
-        }}
-        // Click Next buttons if they exist
-        if ($body.find('button:contains("Next")').length > 0) {{
-          cy.get('button:contains("Next")').first().click({{ force: true }});
-        }}
-        // Click Start buttons if they exist
-        if ($body.find('button:contains("Start")').length > 0) {{
-          cy.get('button:contains("Start")').first().click({{ force: true }});
-        }}
-        // Click any visible buttons as fallback
-        if ($body.find('button:visible').length > 0) {{
-          cy.get('button:visible').first().click({{ force: true }});
-        }}
-      }});
-    }}
-    
-    // Final screenshot
-    takeScreenshot('final-state');
+    // Screenshot whenever the screen changes, until the task ends
+    captureLoop({{ lastHash: null, screens: 0, idlePolls: 0, finishedPolls: 0, started: Date.now() }});
   }});
 }});
 '''
     return test_content
 
-def start_dev_server():
-    """Start the webpack dev server."""
-    print("🚀 Starting webpack dev server...")
+SERVER_PORT = 8080
+SERVER_LOG = "logs/server.log"
+# Everything the production bundle is built from (relative to task-launcher/)
+BUNDLE_INPUTS = ("src", "serve", "patches", "webpack.config.cjs", "package.json", "package-lock.json",
+                 "tsconfig.json")
+
+class TaskServer:
+    """
+    Serves the task launcher on SERVER_PORT for the Cypress runs.
     
-    # Kill any existing processes on port 8080
-    try:
-        subprocess.run(['pkill', '-f', 'webpack serve'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'port 8080'], capture_output=True)
-        time.sleep(2)
-    except:
-        pass
-    
-    # Start dev server in background
-    server_process = subprocess.Popen([
-        'npx', 'webpack', 'serve', 
-        '--mode', 'development', 
-        '--env', 'dbmode=development', 
-        '--port', '8080'
-    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
-    # Wait for server to start
-    print("⏳ Waiting for dev server to start...")
-    time.sleep(15)
-    
-    return server_process
-
-def run_task_test(task_url_param: str, task_name: str) -> bool:
-    """Run Cypress test for a specific task."""
+    In 'static' mode the production bundle is built once (and only rebuilt
+    when one of BUNDLE_INPUTS changed: sources, serve/, patches, webpack
+    config, package*.json, tsconfig) and served from dist/ by a lightweight
+    Python HTTP server; 'dev' mode runs webpack serve as before. Server
+    output goes to a log file instead of an undrained pipe, and readiness is
+    detected by polling the port. A server that is already answering on the port is
+    reused, and keep_running leaves a started server up for later reruns.
+    """
+    
+    def __init__(self, mode: str = 'static', port: int = SERVER_PORT, log_path: str = SERVER_LOG,
+                 rebuild: bool = False, keep_running: bool = False, timeout: float = 120):
+        self.mode = mode
+        self.port = port
+        self.log_path = log_path
+        self.rebuild = rebuild
+        self.keep_running = keep_running
+        self.timeout = timeout
+        self.process = None
+        self.log_file = None
+    
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}/"
+    
+    def is_ready(self) -> bool:
+        """Whether something answers HTTP requests on the port."""
+        try:
+            with urllib.request.urlopen(self.url, timeout=2) as response:
+                return response.status < 500
+        except (urllib.error.URLError, OSError):
+            return False
+    
+    def bundle_is_stale(self, dist_dir: str = "dist", inputs: Tuple[str, ...] = BUNDLE_INPUTS) -> bool:
+        """True if dist/ is missing or older than any of the bundle's inputs (files or folders)."""
+        index = Path(dist_dir) / "index.html"
+        if not index.exists():
+            return True
+        built_at = index.stat().st_mtime
+        for path in inputs:
+            if os.path.isfile(path):
+                if os.path.getmtime(path) > built_at:
+                    return True
+                continue
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if os.path.getmtime(os.path.join(root, name)) > built_at:
+                        return True
+        return False
+    
+    def build(self) -> None:
+        """Build the production bundle into dist/ (npm run build)."""
+        print("📦 Building production bundle...")
+        started = time.time()
+        result = subprocess.run(
+            ['npx', 'webpack', '--mode', 'production', '--env', 'dbmode=development'],
+            stdout=self.log_file, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f"Bundle build failed, see {self.log_path}")
+        print(f"   Built in {time.time() - started:.0f}s")
+    
+    def start(self) -> None:
+        if self.is_ready():
+            print(f"♻️  Reusing server already running on port {self.port}")
+            return
+        
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        self.log_file = open(self.log_path, 'a')
+        
+        if self.mode == 'static':
+            if self.rebuild or self.bundle_is_stale():
+                self.build()
+            else:
+                print("📦 Production bundle is up to date")
+            print(f"🚀 Serving dist/ on port {self.port}...")
+            command = [sys.executable, '-m', 'http.server', str(self.port), '--directory', 'dist']
+        else:
+            print("🚀 Starting webpack dev server...")
+            command = ['npx', 'webpack', 'serve', 
+                       '--mode', 'development', 
+                       '--env', 'dbmode=development', 
+                       '--port', str(self.port)]
+        
+        # A new session lets keep_running servers outlive this script
+        self.process = subprocess.Popen(command, stdout=self.log_file, stderr=subprocess.STDOUT,
+                                        start_new_session=self.keep_running)
+        self.wait_until_ready()
+    
+    def wait_until_ready(self) -> None:
+        """Poll the port until the server answers, the process dies or we time out."""
+        print(f"⏳ Waiting for server on port {self.port} (log: {self.log_path})...")
+        started = time.time()
+        while time.time() - started < self.timeout:
+            if self.is_ready():
+                print(f"✅ Server ready after {time.time() - started:.1f}s")
+                return
+            if self.process is not None and self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.process.returncode}, see {self.log_path}")
+            time.sleep(0.5)
+        self.stop(force=True)
+        raise RuntimeError(f"Server not ready after {self.timeout:.0f}s, see {self.log_path}")
+    
+    def stop(self, force: bool = False) -> None:
+        """Stop the server this object started (unless it should stay warm)."""
+        if self.process is not None and (force or not self.keep_running):
+            print("\n🛑 Stopping server...")
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        elif self.process is not None:
+            print(f"\n♨️  Leaving server running on port {self.port} (pid {self.process.pid})")
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+# Cypress run settings shared by all tasks
+CLEANUP_TIMEOUT = 600  # OCR cleanup of one task
+SPEC_DIR = "cypress/e2e-screenshot-scripts"
+SCREENSHOT_ROOT = "cypress/screenshots"
+VIDEO_ROOT = "cypress/videos"
+TASK_LOG_DIR = "logs/tasks"
+DURATIONS_FILE = "task_durations.json"
+LOG_TAIL_LINES = 20  # Lines of Cypress output shown when a run does not pass
+LOG_CHUNK_SIZE = 64 * 1024  # Bytes read from the Cypress pipe at a time
+LOG_TAIL_LINE_CHARS = 500  # Longer output lines are cut in the tail (not in the log)
+
+def spec_path(task_name: str) -> str:
+    """Path of the generated Cypress spec for a task."""
+    return f"{SPEC_DIR}/{task_name.replace('-', '_')}_complete.cy.js"
+
+def find_screenshot_dir(screenshots_folder: str, spec_file: str) -> Optional[str]:
+    """
+    Locate the folder Cypress wrote a spec's screenshots into.
+    
+    Cypress nests screenshots under the spec file name, possibly below
+    intermediate folders depending on the spec pattern, so search for it.
+    """
+    spec_name = os.path.basename(spec_file)
+    for root, dirs, _ in os.walk(screenshots_folder):
+        if spec_name in dirs:
+            return os.path.join(root, spec_name)
+    return None
+
+async def stream_to_log(stream: asyncio.StreamReader, log_file, tail: deque) -> None:
+    """
+    Copy a subprocess pipe into its log file, keeping the last lines.
+    
+    The pipe is read in chunks rather than lines: a single line longer than
+    the StreamReader limit (webpack stats, minified stack traces) would
+    otherwise raise instead of being logged.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    partial = ''
+    while True:
+        chunk = await stream.read(LOG_CHUNK_SIZE)
+        text = decoder.decode(chunk, final=not chunk)
+        log_file.write(text)
+        lines = (partial + text).split('\n')
+        partial = lines.pop()[:LOG_TAIL_LINE_CHARS]
+        tail.extend(line[:LOG_TAIL_LINE_CHARS].rstrip() for line in lines)
+        if not chunk:
+            break
+    if partial.strip():
+        tail.append(partial.rstrip())
+
+async def stop_process_group(process: asyncio.subprocess.Process, grace: float = 5) -> None:
+    """Terminate a subprocess and everything it started (Cypress spawns Electron)."""
+    if process.returncode is not None:
+        return
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            break
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+async def run_task_test(task_url_param: str, task_name: str, log_dir: str = TASK_LOG_DIR,
+                        timeout: Optional[float] = None) -> Dict:
+    """
+    Run the Cypress test for a specific task.
+    
+    Each run gets its own screenshots/videos folders, so a finished task can
+    be cleaned up while the next one is captured (Cypress trashes its
+    default folders at the start of every run). Output is streamed to
+    <log_dir>/<task>.log as it is produced instead of being buffered.
+    
+    Args:
+        task_url_param: Value of the ?task= URL parameter
+        task_name: Task name used for the spec, screenshot folders and log file
+        log_dir: Directory for the per-task Cypress logs
+        timeout: Seconds before the run (and its browser) is killed
+            (default: the task's 'timeout' in TASKS)
+    
+    Returns:
+        Dictionary with 'status' ('success', 'warnings', 'timeout' or
+        'failed'), 'screenshots_folder', 'log' and 'duration'
+    """
     print(f"\n📸 Running screenshots for: {task_name}")
+    started = time.time()
     
     # Create test file
-    test_filename = f"cypress/e2e-screenshot-scripts/{task_name.replace('-', '_')}_complete.cy.js"
-    test_content = create_task_test(task_url_param, task_name)
+    test_filename = spec_path(task_name)
+    settings = task_settings(task_name)
+    test_content = create_task_test(task_url_param, task_name, poll=settings['poll'],
+                                    duration=settings['duration'], idle=settings['idle'])
+    if timeout is None:
+        timeout = settings['timeout']
     
+    os.makedirs(SPEC_DIR, exist_ok=True)
     with open(test_filename, 'w') as f:
         f.write(test_content)
     
+    screenshots_folder = f"{SCREENSHOT_ROOT}/parallel/{task_name}"
+    videos_folder = f"{VIDEO_ROOT}/parallel/{task_name}"
+    command = [
+        'npx', 'cypress', 'run', 
+        '--spec', test_filename,
+        '--record', 'false',
+        '--config', f"screenshotsFolder={screenshots_folder},videosFolder={videos_folder}"
+    ]
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, f"{task_name}.log")
+    result = {'status': 'failed', 'screenshots_folder': screenshots_folder, 'log': log_path}
+    tail = deque(maxlen=LOG_TAIL_LINES)
+    
     # Run Cypress test
-    try:
-        result = subprocess.run([
-            'npx', 'cypress', 'run', 
-            '--spec', test_filename,
-            '--record', 'false'
-        ], capture_output=True, text=True, timeout=300)  # 5 minute timeout
+    with open(log_path, 'w') as log_file:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True)
+        except OSError as e:
+            print(f"❌ {task_name} test failed: {e}")
+            result['duration'] = round(time.time() - started, 1)
+            return result
         
-        if result.returncode == 0:
-            print(f"✅ {task_name} screenshots completed successfully")
-            return True
-        else:
-            print(f"⚠️  {task_name} test completed with warnings")
-            print(f"   Output: {result.stdout[-200:]}")  # Last 200 chars
-            return True  # Still consider it successful for screenshots
-            
-    except subprocess.TimeoutExpired:
-        print(f"⏰ {task_name} test timed out after 5 minutes")
-        return False
-    except Exception as e:
-        print(f"❌ {task_name} test failed: {e}")
-        return False
+        try:
+            await asyncio.wait_for(asyncio.gather(stream_to_log(process.stdout, log_file, tail),
+                                                  process.wait()), timeout)
+            if process.returncode == 0:
+                print(f"✅ {task_name} screenshots completed successfully")
+                result['status'] = 'success'
+            else:
+                print(f"⚠️  {task_name} test completed with warnings (exit code {process.returncode}, "
+                      f"log: {log_path})")
+                for line in list(tail)[-3:]:
+                    print(f"   {line}")
+                result['status'] = 'warnings'  # Still consider it successful for screenshots
+        except asyncio.TimeoutError:
+            print(f"⏰ {task_name} test timed out after {timeout:.0f}s (log: {log_path})")
+            result['status'] = 'timeout'
+        finally:
+            # Also reached when the pipeline is cancelled (Ctrl+C)
+            await stop_process_group(process)
+    
+    result['duration'] = round(time.time() - started, 1)
+    return result
 
-def cleanup_screenshots(task_name: str) -> Dict:
-    """Run OCR cleanup on screenshots for a task."""
-    screenshot_dir = f"cypress/screenshots/{task_name.replace('-', '_')}_complete.cy.js"
+def cleanup_screenshots(task_name: str, engine: CleanupEngine,
+                        screenshots_folder: str = SCREENSHOT_ROOT, all_profiles: bool = False,
+                        stop_event: Optional[threading.Event] = None) -> Dict:
+    """
+    Run OCR cleanup on screenshots for a task with the shared in-process engine.
     
-    if not os.path.exists(screenshot_dir):
+    Setting stop_event cancels the cleanup; no file is removed after that.
+    """
+    screenshot_dir = find_screenshot_dir(screenshots_folder, spec_path(task_name))
+    
+    if not screenshot_dir:
         print(f"⚠️  No screenshots found for {task_name}")
         return {"status": "no_screenshots"}
     
     print(f"🔍 Running OCR cleanup for {task_name}...")
     
     try:
-        # Run OCR cleanup
-        result = subprocess.run([
-            'python3', 'cleanup_screenshots_ocr.py', 
-            screenshot_dir, '--execute'
-        ], capture_output=True, text=True)
+        # Task names double as OCR profile names (see ocr_profiles.OCR_PROFILES)
+        result = engine.run(screenshot_dir, execute=True, verbose=False,
+                            ocr_profile=default_profile(task_name, all_profiles), stop_event=stop_event)
+        if result["status"] == "cancelled":
+            return {"status": "cancelled", "removed": result["removed"]}
+        if result["status"] != "success":
+            print(f"⚠️  {task_name} cleanup found no screenshots in {screenshot_dir}")
+            return {"status": result["status"]}
         
-        if result.returncode == 0:
-            # Parse the output to get statistics
-            output_lines = result.stdout.strip().split('\n')
-            stats = {}
-            for line in output_lines:
-                if 'Total screenshots:' in line:
-                    stats['total'] = int(line.split(':')[1].strip())
-                elif 'Unique groups:' in line:
-                    stats['unique'] = int(line.split(':')[1].strip())
-                elif 'Duplicates removed:' in line:
-                    stats['removed'] = int(line.split(':')[1].strip())
-            
-            print(f"✅ {task_name} cleanup complete: {stats.get('unique', '?')} unique from {stats.get('total', '?')} total")
-            return {"status": "success", "stats": stats}
-        else:
-            print(f"⚠️  {task_name} cleanup had issues: {result.stderr}")
-            return {"status": "partial", "error": result.stderr}
+        stats = {key: result[key] for key in ("total", "unique", "removed", "errors")}
+        print(f"✅ {task_name} cleanup complete: {stats['unique']} unique from {stats['total']} total "
+              f"({stats['removed']} duplicates removed)")
+        return {"status": "success", "stats": stats, "report": result["report_path"]}
     
     except Exception as e:
         print(f"❌ {task_name} cleanup failed: {e}")
         return {"status": "failed", "error": str(e)}
 
-def main():
+def load_task_durations(path: str = DURATIONS_FILE) -> Dict[str, float]:
+    """Wall-clock seconds each task took on previous runs."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_task_durations(durations: Dict[str, float], path: str = DURATIONS_FILE) -> None:
+    with open(path, 'w') as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+def schedule_tasks(tasks: List[str], durations: Dict[str, float]) -> List[str]:
+    """
+    Order tasks longest-expected-first so parallel workers finish together.
+    
+    Tasks without history are assumed to use their full Cypress timeout and
+    therefore start first.
+    """
+    return sorted(tasks, key=lambda task: durations.get(task, task_settings(task)['timeout']), reverse=True)
+
+async def process_task(task_name: str, engine: CleanupEngine, capture_slots: asyncio.Semaphore,
+                       cleanup_slots: asyncio.Semaphore, cleanup_executor: ThreadPoolExecutor,
+                       capture_timeout: Optional[float] = None, cleanup_timeout: float = CLEANUP_TIMEOUT,
+                       log_dir: str = TASK_LOG_DIR, all_profiles: bool = False) -> Dict:
+    """
+    Capture screenshots for one task, then run OCR cleanup on them.
+    
+    The capture slot is released before cleanup starts, so the next task's
+    browser run overlaps with this task's CPU-bound cleanup. Cleanup runs in
+    a worker thread (the engine's process pool does the OCR) and never
+    blocks the event loop. A cleanup that exceeds its timeout is cancelled
+    and reported as timed out once its thread has stopped touching the
+    screenshot folder.
+    """
+    loop = asyncio.get_running_loop()
+    async with capture_slots:
+        started = time.time()
+        print(f"\n{'='*20} {task_name.upper()} {'='*20}")
+        capture = await run_task_test(task_name, task_name, log_dir=log_dir, timeout=capture_timeout)
+    
+    result = {
+        "screenshots": "success" if capture['status'] in ('success', 'warnings') else "failed",
+        "capture": capture
+    }
+    if result["screenshots"] != "success":
+        result["cleanup"] = {"status": "skipped"}
+    else:
+        async with cleanup_slots:
+            cleanup_started = time.time()
+            stop_cleanup = threading.Event()
+            cleanup = loop.run_in_executor(cleanup_executor, cleanup_screenshots, task_name, engine,
+                                           capture['screenshots_folder'], all_profiles, stop_cleanup)
+            try:
+                # Shielded: on timeout the thread is stopped through the event, not abandoned
+                result["cleanup"] = await asyncio.wait_for(asyncio.shield(cleanup), cleanup_timeout)
+            except asyncio.TimeoutError:
+                print(f"⏰ {task_name} cleanup timed out after {cleanup_timeout:.0f}s, stopping it")
+                stop_cleanup.set()
+                outcome = await cleanup
+                if outcome["status"] == "cancelled":
+                    outcome = {"status": "timeout", "removed": outcome["removed"]}
+                result["cleanup"] = outcome
+            finally:
+                # Also stops the cleanup thread when the pipeline is cancelled (Ctrl+C)
+                stop_cleanup.set()
+            result["cleanup"]["duration"] = round(time.time() - cleanup_started, 1)
+    result["duration"] = round(time.time() - started, 1)
+    return result
+
+async def run_pipeline(tasks: List[str], engine: CleanupEngine, parallel: int = 1, cleanup_parallel: int = 1,
+                       capture_timeout: Optional[float] = None, cleanup_timeout: float = CLEANUP_TIMEOUT,
+                       log_dir: str = TASK_LOG_DIR, all_profiles: bool = False) -> Dict[str, Dict]:
+    """
+    Capture and clean up all tasks as one pipeline.
+    
+    Args:
+        tasks: Task names, in the order captures should start
+        engine: Shared cleanup engine (warm OCR workers and feature cache)
+        parallel: Cypress runs at once
+        cleanup_parallel: Cleanups at once
+        capture_timeout: Seconds per Cypress run (None uses each task's timeout)
+        cleanup_timeout: Seconds per cleanup
+        log_dir: Directory for the per-task Cypress logs
+        all_profiles: OCR every task with its profile, validated or not
+    
+    Returns:
+        Dictionary of task name -> result, in completion order
+    """
+    # Semaphores wake waiters in FIFO order, so captures start in the given order
+    capture_slots = asyncio.Semaphore(max(1, parallel))
+    cleanup_slots = asyncio.Semaphore(max(1, cleanup_parallel))
+    results = {}
+    
+    async def run(task_name: str) -> None:
+        started = time.time()
+        try:
+            results[task_name] = await process_task(task_name, engine, capture_slots, cleanup_slots,
+                                                    cleanup_executor, capture_timeout, cleanup_timeout,
+                                                    log_dir, all_profiles)
+        except Exception as e:
+            # One broken task must not abort the pipeline and lose every other result
+            print(f"❌ {task_name} failed: {e!r}")
+            duration = round(time.time() - started, 1)
+            results[task_name] = {
+                "screenshots": "failed",
+                "capture": {"status": "failed", "error": repr(e), "duration": duration},
+                "cleanup": {"status": "skipped"},
+                "duration": duration
+            }
+    
+    with ThreadPoolExecutor(max_workers=max(1, cleanup_parallel)) as cleanup_executor:
+        await asyncio.gather(*(run(task) for task in tasks))
+    return results
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Capture and clean up screenshots for all tasks")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="Number of Cypress runs to execute at once against the shared "
+                             "dev server (default: 1)")
+    parser.add_argument("--cleanup-parallel", type=int, default=1,
+                        help="Number of task cleanups to run at once; cleanups overlap with the "
+                             "captures of later tasks (default: 1)")
+    parser.add_argument("--capture-timeout", type=float, default=None,
+                        help="Seconds before a Cypress run is killed (default: the task's timeout "
+                             f"in TASKS, {DEFAULT_CAPTURE['timeout']} unless overridden)")
+    parser.add_argument("--cleanup-timeout", type=float, default=CLEANUP_TIMEOUT,
+                        help=f"Seconds to wait for the cleanup of one task (default: {CLEANUP_TIMEOUT})")
+    parser.add_argument("--log-dir", default=TASK_LOG_DIR,
+                        help=f"Where the Cypress output of each task is written (default: {TASK_LOG_DIR})")
+    parser.add_argument("--tasks", nargs="+", choices=list(TASKS), default=list(TASKS), metavar="TASK",
+                        help="Subset of tasks to run (default: all)")
+    parser.add_argument("--ocr-profiles", action="store_true",
+                        help="OCR each task with its profile from ocr_profiles.py even if the profile "
+                             "has not been validated (default: validated profiles only, otherwise "
+                             "the top half of each screenshot)")
+    parser.add_argument("--server", choices=["static", "dev"], default="static",
+                        help="Serve the prebuilt production bundle (static) or run webpack serve "
+                             "(dev) (default: static)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild the production bundle even if it is up to date")
+    parser.add_argument("--keep-server", action="store_true",
+                        help="Leave the server running afterwards so later runs can reuse it")
+    args = parser.parse_args(argv)
+    
     print("🎯 COMPREHENSIVE TASK SCREENSHOT CAPTURE")
     print("=" * 50)
     
     # Change to task-launcher directory
     os.chdir('task-launcher')
     
-    # Start dev server
-    server_process = start_dev_server()
+    # Start (or reuse) the server
+    server = TaskServer(mode=args.server, rebuild=args.rebuild, keep_running=args.keep_server)
+    server.start()
+    
+    # One cleanup engine for all tasks: OCR workers and the feature cache stay warm
+    engine = CleanupEngine(cache=FeatureCache())
     
     results = {}
-    successful_tasks = []
-    failed_tasks = []
+    durations = load_task_durations()
     
     try:
-        # Process each task
-        for task_url_param, task_config_name in TASKS.items():
-            print(f"\n{'='*20} {task_url_param.upper()} {'='*20}")
-            
-            # Run screenshot capture
-            success = run_task_test(task_url_param, task_url_param)
-            
-            if success:
-                # Run OCR cleanup
-                cleanup_result = cleanup_screenshots(task_url_param)
-                results[task_url_param] = {
-                    "screenshots": "success",
-                    "cleanup": cleanup_result
-                }
-                successful_tasks.append(task_url_param)
-            else:
-                results[task_url_param] = {
-                    "screenshots": "failed",
-                    "cleanup": {"status": "skipped"}
-                }
-                failed_tasks.append(task_url_param)
-            
-            # Small delay between tasks
-            time.sleep(3)
+        ordered_tasks = schedule_tasks(args.tasks, durations) if args.parallel > 1 else args.tasks
+        print(f"⚡ Running {len(ordered_tasks)} tasks: {args.parallel} Cypress run(s) and "
+              f"{args.cleanup_parallel} cleanup(s) at once (logs: {args.log_dir})")
+        results = asyncio.run(run_pipeline(ordered_tasks, engine, parallel=args.parallel,
+                                           cleanup_parallel=args.cleanup_parallel,
+                                           capture_timeout=args.capture_timeout,
+                                           cleanup_timeout=args.cleanup_timeout, log_dir=args.log_dir,
+                                           all_profiles=args.ocr_profiles))
     
     finally:
-        # Stop dev server
-        print("\n🛑 Stopping dev server...")
-        server_process.terminate()
-        try:
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server_process.kill()
+        server.stop()
+        engine.close()
+        
+        for task, result in results.items():
+            durations[task] = result["capture"]["duration"]
+        save_task_durations(durations)
+    
+    # Report in the TASKS order regardless of completion order
+    results = {task: results[task] for task in args.tasks if task in results}
+    successful_tasks = [task for task, result in results.items() if result["screenshots"] == "success"]
+    failed_tasks = [task for task, result in results.items() if result["screenshots"] != "success"]
     
     # Generate summary report
     print(f"\n{'='*50}")
@@ -260,7 +700,8 @@ def main():
         stats = results[task].get("cleanup", {}).get("stats", {})
         unique = stats.get("unique", "?")
         total = stats.get("total", "?")
-        print(f"   • {task}: {unique} unique screenshots from {total} total")
+        removed = stats.get("removed", "?")
+        print(f"   • {task}: {unique} unique screenshots from {total} total ({removed} removed)")
     
     if failed_tasks:
         print(f"\n❌ Failed tasks ({len(failed_tasks)}):")
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from cleanup_screenshots_ocr import analyze_screenshots, classify_blank_frame, image_thumbnail
+
+SIZE = (1000, 660)
+
+def classify(img: Image.Image):
+    return classify_blank_frame(img, image_thumbnail(img, 64))
+
+def text_screen(text: str, button: bool = True) -> Image.Image:
+    """White instruction screen with one line of text and, optionally, an OK button."""
+    img = Image.new('RGB', SIZE, 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((350, 250), text, fill='black', font=ImageFont.load_default(size=24))
+    if button:
+        draw.rounded_rectangle((460, 420, 540, 460), radius=6, outline='#888888', fill='#f0f0f0')
+        draw.text((488, 430), "OK", fill='black', font=ImageFont.load_default(size=18))
+    return img
+
+@pytest.mark.parametrize("text", ["Press OK to continue", "Which one is bigger?"])
+def test_sparse_text_screen_is_not_blank(text):
+    assert classify(text_screen(text)) is None
+    assert classify(text_screen(text, button=False)) is None
+
+def test_single_word_is_not_blank():
+    img = Image.new('RGB', SIZE, 'white')
+    ImageDraw.Draw(img).text((480, 320), "Go", fill='black')  # Small bitmap font
+    assert classify(img) is None
+
+def test_flat_frames_are_blank():
+    assert classify(Image.new('RGB', SIZE, 'white')) == 'blank'
+    assert classify(Image.new('RGB', SIZE, (40, 90, 160))) == 'blank'
+    assert classify(Image.new('RGB', SIZE, 'black')) == 'dark'
+
+def test_shade_noise_is_still_blank():
+    rng = np.random.default_rng(0)
+    pixels = np.clip(200 + rng.normal(0, 3, (SIZE[1], SIZE[0], 3)), 0, 255).astype(np.uint8)
+    assert classify(Image.fromarray(pixels)) == 'blank'
+
+def test_blank_groups_do_not_take_window_slots(tmp_path):
+    first, second = text_screen("Which one is bigger?"), text_screen("Press OK to continue")
+    ImageDraw.Draw(first).rectangle((100, 100, 400, 400), fill='#d04040')
+    ImageDraw.Draw(second).ellipse((500, 80, 900, 480), fill='#4060d0')
+    screens = [first, second, Image.new('RGB', SIZE, 'white'), Image.new('RGB', SIZE, 'black'), first]
+    for i, img in enumerate(screens):
+        img.save(tmp_path / f"{i:02d}.png")
+    analysis = analyze_screenshots(str(tmp_path), workers=1, window=2, blank_filter=True)
+    assert analysis['unique_groups'] == 4
+    # The two newest groups are blank/dark ones; the repeat is still found within the window
+    assert analysis['window']['window_matches'] == 1
+    assert analysis['window']['fallback_matches'] == 0
@@ -0,0 +1,29 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from cleanup_screenshots_ocr import CleanupEngine
+from golden_index import MANIFEST_FILE, VECTORS_FILE, GoldenIndex, build_index
+
+def frame(index: int) -> Image.Image:
+    img = Image.new('RGB', (320, 200), 'white')
+    ImageDraw.Draw(img).rectangle((20 + 40 * index, 40, 80 + 40 * index, 160), fill='black')
+    return img
+
+def test_skipped_frames_leave_no_extra_rows(tmp_path):
+    for task in ('trog', 'vocab'):
+        folder = tmp_path / 'golden' / task
+        folder.mkdir(parents=True)
+        for i in range(3):
+            frame(i).save(folder / f"{i}.png")
+        (folder / "broken.png").write_bytes(b"not a png")
+    index_dir = tmp_path / 'index'
+
+    with CleanupEngine(workers=1) as engine:
+        manifest = build_index(str(tmp_path / 'golden'), str(index_dir), engine)
+
+    assert len(manifest['errors']) == 2
+    vectors = np.load(str(index_dir / VECTORS_FILE))
+    assert vectors.shape[0] == len(manifest['frames']) == 6
+    assert sorted(p.name for p in index_dir.iterdir()) == sorted([MANIFEST_FILE, VECTORS_FILE])
+    index = GoldenIndex(str(index_dir))
+    assert index.matrix('vocab').vectors.shape[0] == 3
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from cleanup_screenshots_ocr import analyze_screenshots
+from ocr_backends import get_backend
+from ocr_profiles import OCR_PROFILES, VALIDATED_PROFILES, default_profile, get_profile
+
+SIZE = (1000, 660)
+PROMPTS = [
+    "Which cat is under the table?",
+    "Find the girl who is chasing a small dog",
+    "Show me: box on a chair",
+]
+
+def prompt_screen(prompt: str, prompt_y: int = 60, shift: int = 0) -> Image.Image:
+    """Sentence prompt above a row of four pictures, as on a trog/vocab trial."""
+    img = Image.new('RGB', SIZE, 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((120, prompt_y), prompt, fill='black', font=ImageFont.load_default(size=32))
+    for i, color in enumerate(('#d04040', '#40a040', '#4060d0', '#d0a020')):
+        left = 110 + i * 200 + shift
+        draw.rectangle((left, 380, left + 160, 540), fill=color)
+    return img
+
+def groups(result):
+    return sorted(sorted([group['representative']['name']] + [d['name'] for d in group['duplicates']])
+                  for group in result['groups'])
+
+def test_runner_defaults_to_top_half_crop():
+    for task in OCR_PROFILES:
+        assert default_profile(task) == (task if task in VALIDATED_PROFILES else None)
+        assert default_profile(task, all_profiles=True) == task
+    assert default_profile('not-a-task', all_profiles=True) is None
+
+@pytest.mark.parametrize("task", ['trog', 'vocab'])
+def test_prompt_in_top_half_is_kept(task):
+    # The default crop reads the top 50%; a prompt just above the middle must survive the profile
+    crop = np.asarray(get_profile(task).prepare(prompt_screen(PROMPTS[0], prompt_y=280)))
+    assert (crop < 128).any()
+
+@pytest.mark.skipif(not get_backend('auto').available(), reason="tesseract is not installed")
+@pytest.mark.parametrize("task", sorted(OCR_PROFILES))
+def test_profile_keeps_default_groups(task, tmp_path):
+    for i, prompt in enumerate(PROMPTS):
+        prompt_screen(prompt).save(tmp_path / f"{i}a.png")
+        prompt_screen(prompt, shift=2).save(tmp_path / f"{i}b.png")
+    default = analyze_screenshots(str(tmp_path), workers=1)
+    profiled = analyze_screenshots(str(tmp_path), workers=1, ocr_profile=task)
+    assert groups(profiled) == groups(default)
+    assert len(groups(default)) == len(PROMPTS)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Upload the golden-runs folder, transferring only new or changed files.
+
+The destination keeps a manifest object (_upload_manifest.json) with the
+SHA-256 and size of every uploaded file. Each run hashes the local tree
+(reusing the hashes in golden-runs/manifest.json written by
+rename_golden_runs.py when a file's size and mtime are unchanged), diffs
+it against the remote manifest and uploads the difference with a bounded
+thread pool. The remote manifest is checkpointed while uploading, so an
+interrupted run resumes with the files that were not transferred yet.
+
+Destinations are pluggable: gs://bucket/prefix uses Google Cloud Storage,
+anything else is treated as a local directory (handy for testing).
+"""
+
+import os
+import sys
+import argparse
+import json
+import mimetypes
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from feature_cache import file_content_hash
+
+try:
+    from google.cloud import storage as gcs
+except ImportError:  # Optional dependency, only needed for gs:// destinations
+    gcs = None
+
+REMOTE_MANIFEST = "_upload_manifest.json"
+LOCAL_MANIFEST = "manifest.json"  # Written by rename_golden_runs.py
+CHECKPOINT_EVERY = 50
+
+class StorageBackend:
+    """Destination for uploaded files, addressed by '/'-separated keys."""
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+    def read_text(self, key: str) -> Optional[str]:
+        """Contents of a small text object, or None if it does not exist."""
+        raise NotImplementedError
+
+    def write_text(self, key: str, text: str) -> None:
+        raise NotImplementedError
+
+    def upload(self, local_path: str, key: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+class LocalDirBackend(StorageBackend):
+    """Mirror into a local directory; files appear atomically under their final name."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def describe(self) -> str:
+        return str(self.root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def read_text(self, key: str) -> Optional[str]:
+        try:
+            return self._path(key).read_text()
+        except FileNotFoundError:
+            return None
+
+    def _replace(self, key: str, write) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A half-written .part file from an interrupted run is simply overwritten
+        part = path.with_name(path.name + '.part')
+        write(part)
+        os.replace(part, path)
+
+    def write_text(self, key: str, text: str) -> None:
+        self._replace(key, lambda part: part.write_text(text))
+
+    def upload(self, local_path: str, key: str) -> None:
+        self._replace(key, lambda part: shutil.copyfile(local_path, part))
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+class GCSBackend(StorageBackend):
+    """
+    Google Cloud Storage bucket/prefix.
+
+    Each upload thread keeps its own client, so its HTTP connections are
+    reused across uploads instead of being set up per file.
+    """
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        if gcs is None:
+            raise RuntimeError("google-cloud-storage is not installed (pip install google-cloud-storage)")
+        self.bucket_name = bucket
+        self.prefix = prefix.strip('/')
+        self.local = threading.local()
+
+    def describe(self) -> str:
+        return f"gs://{self.bucket_name}/{self.prefix}"
+
+    def _blob(self, key: str):
+        if not hasattr(self.local, 'bucket'):
+            self.local.bucket = gcs.Client().bucket(self.bucket_name)
+        name = f"{self.prefix}/{key}" if self.prefix else key
+        return self.local.bucket.blob(name)
+
+    def read_text(self, key: str) -> Optional[str]:
+        blob = self._blob(key)
+        if not blob.exists():
+            return None
+        return blob.download_as_text()
+
+    def write_text(self, key: str, text: str) -> None:
+        self._blob(key).upload_from_string(text, content_type='application/json')
+
+    def upload(self, local_path: str, key: str) -> None:
+        content_type = mimetypes.guess_type(local_path)[0] or 'application/octet-stream'
+        self._blob(key).upload_from_filename(local_path, content_type=content_type)
+
+    def delete(self, key: str) -> None:
+        self._blob(key).delete()
+
+def open_backend(destination: str) -> StorageBackend:
+    """gs://bucket/prefix → GCSBackend, anything else → LocalDirBackend."""
+    if destination.startswith('gs://'):
+        bucket, _, prefix = destination[len('gs://'):].partition('/')
+        return GCSBackend(bucket, prefix)
+    return LocalDirBackend(destination)
+
+def hash_local_tree(source: str, workers: int = 8) -> Dict[str, Dict]:
+    """
+    SHA-256 and size of every file under source, keyed by relative '/' path.
+
+    Hashes from the renamer's manifest are reused for files whose size and
+    mtime still match; everything else is read and hashed in a thread pool.
+    """
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(source):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.'):
+                continue  # Journals and temporary names of an interrupted rename
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            key = os.path.relpath(path, source).replace(os.sep, '/')
+            files[key] = {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    known = {}
+    try:
+        with open(os.path.join(source, LOCAL_MANIFEST)) as f:
+            for folder, entry in json.load(f).get('folders', {}).items():
+                for item in entry.get('files', []):
+                    known[f"{folder}/{item['name']}"] = item
+    except (OSError, ValueError):
+        pass
+
+    to_hash = []
+    for key, info in files.items():
+        item = known.get(key)
+        if item and item['size'] == info['size'] and item['mtime'] == info['mtime']:
+            info['sha256'] = item['sha256']
+        else:
+            to_hash.append(key)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for key, digest in zip(to_hash, executor.map(lambda k: file_content_hash(files[k]['path']), to_hash)):
+            files[key]['sha256'] = digest
+    return files
+
+def load_remote_manifest(backend: StorageBackend) -> Dict[str, Dict]:
+    text = backend.read_text(REMOTE_MANIFEST)
+    if not text:
+        return {}
+    return json.loads(text).get('objects', {})
+
+def save_remote_manifest(backend: StorageBackend, objects: Dict[str, Dict]) -> None:
+    backend.write_text(REMOTE_MANIFEST, json.dumps(
+        {'updated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'objects': objects}, indent=2, sort_keys=True))
+
+def diff_trees(local: Dict[str, Dict], remote: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """Split keys into new, changed, unchanged (local) and remote_only."""
+    diff = {'new': [], 'changed': [], 'unchanged': [], 'remote_only': []}
+    for key in sorted(local):
+        if key not in remote:
+            diff['new'].append(key)
+        elif remote[key].get('sha256') != local[key]['sha256']:
+            diff['changed'].append(key)
+        else:
+            diff['unchanged'].append(key)
+    diff['remote_only'] = sorted(set(remote) - set(local))
+    return diff
+
+def upload_golden_runs(source: str, backend: StorageBackend, workers: int = 8, dry_run: bool = False,
+                       delete: bool = False, force: bool = False) -> Dict:
+    """
+    Bring the destination in line with source, transferring only differences.
+
+    Args:
+        source: Local golden-runs folder
+        backend: Destination storage
+        workers: Concurrent uploads (and hashing threads)
+        dry_run: Only report the diff
+        delete: Also remove remote files that no longer exist locally
+        force: Ignore the remote manifest and upload everything
+
+    Returns:
+        Dictionary with the diff, uploaded/failed keys and byte count
+    """
+    local = hash_local_tree(source, workers)
+    remote = {} if force else load_remote_manifest(backend)
+    diff = diff_trees(local, remote)
+    pending = diff['new'] + diff['changed']
+    result = {'diff': diff, 'uploaded': [], 'failed': {}, 'deleted': [], 'bytes': 0}
+    if dry_run:
+        return result
+
+    objects = dict(remote)
+
+    def upload(key: str) -> str:
+        backend.upload(local[key]['path'], key)
+        return key
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(upload, key): key for key in pending}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result['failed'][key] = str(e)
+                    print(f"   ❌ {key}: {e}")
+                    continue
+                objects[key] = {'sha256': local[key]['sha256'], 'size': local[key]['size']}
+                result['uploaded'].append(key)
+                result['bytes'] += local[key]['size']
+                done = len(result['uploaded'])
+                if done % CHECKPOINT_EVERY == 0:
+                    # Checkpoint so an interrupted run resumes from here
+                    save_remote_manifest(backend, objects)
+                    print(f"   📤 {done}/{len(pending)} uploaded")
+
+        if delete:
+            for key in diff['remote_only']:
+                backend.delete(key)
+                objects.pop(key, None)
+                result['deleted'].append(key)
+    finally:
+        save_remote_manifest(backend, objects)
+    return result
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Upload only new or changed golden-runs files")
+    parser.add_argument("source", nargs="?", default="golden-runs",
+                        help="Local folder to upload (default: golden-runs)")
+    parser.add_argument("--dest", default="gs://levante-images-dev/golden-runs",
+                        help="gs://bucket/prefix or a local directory (default: gs://levante-images-dev/golden-runs)")
+    parser.add_argument("--workers", type=int, default=16,
+                        help="Concurrent uploads (default: 16)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Show what would be uploaded without transferring anything")
+    parser.add_argument("--delete", action="store_true",
+                        help="Remove remote files that no longer exist locally")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the remote manifest and upload every file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        print(f"❌ Directory {args.source} not found!")
+        sys.exit(1)
+
+    backend = open_backend(args.dest)
+    print(f"🚀 Syncing {args.source} → {backend.describe()}")
+    started = time.time()
+    result = upload_golden_runs(args.source, backend, workers=args.workers, dry_run=args.dry_run,
+                                delete=args.delete, force=args.force)
+
+    diff = result['diff']
+    print(f"📊 {len(diff['new'])} new, {len(diff['changed'])} changed, {len(diff['unchanged'])} unchanged, "
+          f"{len(diff['remote_only'])} only in destination")
+    if args.dry_run:
+        for status in ('new', 'changed', 'remote_only'):
+            for key in diff[status]:
+                print(f"   {status}: {key}")
+        print("🔍 DRY RUN - Nothing was uploaded")
+        return
+
+    print(f"✅ Uploaded {len(result['uploaded'])} files ({result['bytes']/1024/1024:.1f}MB) "
+          f"in {time.time() - started:.1f}s")
+    if result['deleted']:
+        print(f"🗑️  Deleted {len(result['deleted'])} remote files")
+    if result['failed']:
+        print(f"❌ {len(result['failed'])} uploads failed; rerun to retry them")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()